@@ -32,6 +32,19 @@ print mises.nodeLabels
 print mises.resultData
 #or, you can save them to a CSV file:
 mises.saveCSV()
+#or, to a binary file which is much smaller and faster to reload
+#(format='hdf5' is also available, if h5py is installed):
+fileName = mises.save()
+mises = IntPtVariable.load(fileName)
+
+
+# every fetch method also returns the results as a FieldResult, which can be
+# sliced by time, label, or component without copying resultData:
+disp   = NodalVariable(odbFile, 'U', setName)
+result = disp.fetchNodalOutput()
+print result.axes   # ('time', 'node', 'component')
+late   = result.selectTime(start=1.0).selectComponents('U2')
+print late.selectLabels([101, 102]).data
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -49,6 +62,104 @@ print peeq.resultData
 #or, you can save them to a CSV file:
 peeq.saveCSV()
 
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# if you want many quantities from the same (large) ODB, open it only once
+# with an OdbSession, and pass the session to each variable:
+
+from odbSessionClasses import OdbSession
+
+with OdbSession('C:\\Folder\\example.odb') as session:
+    mises = IntPtVariable(session.odbPath, 'MISES', setName, session=session)
+    mises.fetchNodalAverage()
+    peeq  = IntPtVariable(session.odbPath, 'PEEQ', setName, session=session)
+    peeq.fetchNodalAverage()
+# the ODB is closed when the "with" block ends
+
+# with useMetadata=True, the session scans the ODB once and writes a small
+# sidecar file (example_metadata.json) of its steps, frames, field outputs,
+# and sets. later runs check the sets and outputs, and find the frames,
+# from the sidecar instead of walking the ODB:
+with OdbSession('C:\\Folder\\example.odb', useMetadata=True) as session:
+    print session.metadata.setSize('NODE', setName)
+    mises = IntPtVariable(session.odbPath, 'MISES', setName, session=session)
+    mises.fetchNodalAverage()
+
+# several IP quantities that come from the same Abaqus output (e.g. MISES,
+# PRESS, and INV3 are all obtained from 'S') can be fetched in one pass:
+stress = fetch_intpt_variables(odbFile, ['MISES','PRESS','INV3'], setName)
+print stress['PRESS'].resultData / stress['MISES'].resultData
+
+# quantities derived from the stress (or strain) components are fetched the
+# same way, e.g. 'S11', 'MAXPRINCIPAL', 'TRIAXIALITY', 'LODE', or 'LEEQ'.
+# you can also define your own (see odbQuantityRegistry):
+stress = fetch_intpt_variables(odbFile, ['TRIAXIALITY','LODE'], setName)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# if the full history does not fit in memory, the frames can be streamed
+# one at a time instead. for example, the peak MISES at each node:
+
+mises = IntPtVariable(odbFile, 'MISES', setName)
+peak  = None
+for totalTime, nodeLabels, frameData in mises.iterFrames('fetchNodalAverage'):
+    if peak is None:
+        peak = frameData
+    else:
+        peak = numpy.maximum(peak, frameData)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# if you re-run a (plotting) script often, keep the fetched results in a
+# ResultCache. as long as the ODB file does not change, the next run loads
+# the results from the cache without opening the ODB:
+
+from odbResultCacheClasses import ResultCache
+
+cache = ResultCache('C:\\Folder\\odbCache')
+mises = IntPtVariable(odbFile, 'MISES', setName, cache=cache)
+mises.fetchNodalAverage()
+# to force the results of an ODB to be extracted again:
+cache.invalidate(odbFile)
+
+# the meshes of the instances can be fetched in one pass (with the ODB opened
+# once). with a cache, later runs load the meshes without the ODB:
+from odbInstanceMeshClasses import fetch_instance_meshes
+
+meshes = fetch_instance_meshes(odbFile, ['PART-1-1','PART-2-1'], cache=cache)
+print meshes['PART-1-1'].nodesCoords
+
+# an instance may mix element types. the connectivity of each type
+# is a (nele,nnpe) array, for vectorized work:
+for elemType,elements,elemConnect in meshes['PART-1-1'].typeBlocks():
+    print elemType, elements.shape, elemConnect.shape
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# to monitor a running analysis, fetch incrementally. only the frames that
+# were written to the ODB since the last fetch are read, and appended:
+
+import time
+
+peeq = IntPtVariable(odbFile, 'PEEQ', setName)
+disp = NodalVariable(odbFile, 'U', setName)
+for poll in range(0,10):
+    peeq.fetchNodalAverage(incremental=True)
+    disp.fetchNodalOutput(incremental=True)
+    print peeq.totalTime[-1], peeq.resultData[-1].max()
+    time.sleep(60)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# to view the results in ParaView, export the mesh of an instance and the
+# results of the variables as an XDMF time series. the frames are streamed
+# from the ODB one at a time, and the mesh is only written once:
+from odbInstanceMeshClasses import InstanceMesh
+from odbExportOperations import export_xdmf
+
+mesh = InstanceMesh(odbFile, 'PART-1-1')
+mesh.fetchMesh()
+mises = IntPtVariable(odbFile, 'MISES', setName)
+disp  = NodalVariable(odbFile, 'U', setName)
+export_xdmf('example', mesh, [mises, disp])
+# writes example.xdmf and example.h5 (requires h5py). without h5py, use:
+export_xdmf('example', mesh, [mises, disp], format='binary')
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # some things to keep in mind:
 #   * If you define your set using the geometry option in CAE,
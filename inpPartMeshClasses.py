@@ -207,8 +207,11 @@ class PartMesh(object):
         return
 
         
-    def saveCSV(self, saveDir=None):
-        """ saves CSV files to the requested directory """
+    def saveCSV(self, saveDir=None, compress=False):
+        """
+        saves CSV files to the requested directory.
+        If compress is True, the files are gzip compressed.
+        """
         #
         # determine save directory
         #
@@ -229,39 +232,11 @@ class PartMesh(object):
         inpName = os.path.basename(self.inpPath)
         inpName = os.path.splitext(inpName)[0]
         
-        # create file handles
-        dummy = saveDir + inpName + '_' + self.partName + '_nodesCoords.csv'
-        nodeFile = open(dummy,'w')
-        
-        dummy = saveDir + inpName + '_' + self.partName + '_elemConnect.csv'
-        elemFile = open(dummy,'w')
-        
-        # save to CSV
-        self.__saveArrayCSV(nodeFile, self.nodesCoords)
-        self.__saveArrayCSV(elemFile, self.elemConnect)
-        
-        # close file handles
-        nodeFile.close()
-        elemFile.close()
-        return
-        
-    def __saveArrayCSV(self, fhandle, array):
-        """ 
-        writes array to CSV, given a file handle 
-        written for node and elemConnect arrays...
-        because CSV rows are prepended with their # (i.e. node # or element #)
-        """
-        
-        #determine shape of array
-        nrow,ncol = array.shape
-        
-        for row in range(0,nrow):
-            #start a new line
-            line = str(row+1)
-            for col in range(0,ncol):
-                line += ', ' + str(array[row,col])
-            #end of line, write to file
-            line += '\n'
-            fhandle.write(line)
-        
+        # save to CSV. rows are prepended with their # (i.e. node # or element #)
+        for arrayName in ('nodesCoords', 'elemConnect'):
+            array = getattr(self, arrayName)
+            dummy = saveDir + inpName + '_' + self.partName + '_' + arrayName + '.csv'
+            saveFile = open_csv(dummy, compress, verbose=False)
+            write_csv_rows(saveFile, array, numpy.arange(1, len(array)+1))
+            saveFile.close()
         return
\ No newline at end of file
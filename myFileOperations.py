@@ -9,6 +9,18 @@ Set of common (Windows) file operations
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 import re
 import os
+import gzip
+import time
+import shutil
+import tempfile
+import numpy
+
+# CSV files are written in blocks of (about) this many values,
+# through a file buffer of this many bytes
+CSV_BLOCK_SIZE  = 100000
+CSV_BUFFER_SIZE = 1024**2
+# gzip level of compressed CSV files (fast, the size is only slightly larger)
+CSV_COMPRESS_LEVEL = 1
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -64,6 +76,12 @@ def check_recycle(name, verbose=True):
         except:
             pass
 
+def odb_file_path(odbPath):
+    """ returns the ODB path, with the .odb extension """
+    if odbPath.endswith('.odb'):
+        return odbPath
+    return odbPath + '.odb'
+
 def safe_filename(name):
     """
     function to strip illegal characters out of filenames
@@ -71,3 +89,127 @@ def safe_filename(name):
     """
     safe_name = re.sub('[<>:"/\|?*]', '', name)
     return safe_name
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def open_csv(name, compress=False, verbose=True):
+    """
+    deletes any old file, and opens a (buffered) CSV file for writing
+    input:
+        name     = file name, with extension
+        compress = optional input (default=False). If True, the file is
+                   gzip compressed, and '.gz' is appended to name
+        verbose  = optional input (default=True), see check_delete()
+    returns the file handle
+    """
+    if compress:
+        name += '.gz'
+    check_delete(name, verbose)
+    if compress:
+        return gzip.open(name, 'wb', CSV_COMPRESS_LEVEL)
+    return open(name, 'w', CSV_BUFFER_SIZE)
+
+def write_csv_rows(fhandle, data, rowLabels, fmt='%s', labelFmt='%s',
+                   blockSize=CSV_BLOCK_SIZE):
+    """
+    writes the rows of a (rank-2) array to a CSV file, each row
+    prepended with its label, i.e. lines of:
+        rowLabels[i], data[i,0], data[i,1], ...
+    the rows are formatted in blocks (one string operation per block),
+    and written through a large file buffer. a rank-1 data array is
+    written as a single column.
+    
+    by default, each value is written exactly as str(data[i,k]), and
+    most of the time is spent on that conversion (the shortest text
+    which reads back as the same number). this is only about 1.4x
+    faster than writing line by line (see benchmark_csv). a fixed fmt
+    (e.g. '%.6e') is formatted much faster, but changes the text.
+    input:
+        fhandle   = file handle (see open_csv)
+        data      = numpy array (may be memory-mapped, it is read in blocks)
+        rowLabels = sequence of the label of each row (e.g. totalTime)
+        fmt       = optional format of the values (e.g. '%.6e'). Default
+                    is '%s', i.e. the same as str() of each value
+        labelFmt  = optional format of the row labels (default '%s')
+        blockSize = optional number of values formatted at once
+    """
+    if data.ndim == 1:
+        data = data.reshape((len(data),1))
+    nrow,ncol = data.shape
+    if len(rowLabels) != nrow:
+        raise ValueError('there must be a label for each row!')
+    lineFmt = labelFmt + (', ' + fmt)*ncol + '\n'
+    
+    # numbers of rows per block
+    step = max(1, int(blockSize) // (ncol+1))
+    for start in range(0, nrow, step):
+        block = numpy.asarray(data[start:start+step])
+        # interleave the row labels and the values, and format the whole
+        # block at once. the values are kept as numpy scalars (not python
+        # floats, which str() rounds to 12 digits), so that each value is
+        # written exactly as str(data[i,k])
+        values = numpy.empty((len(block),ncol+1), dtype=object)
+        values[:,0]  = list(rowLabels[start:start+step])
+        values[:,1:] = [list(row) for row in block]
+        fhandle.write((lineFmt*len(block)) % tuple(values.ravel()))
+    return
+
+def benchmark_csv(numrows=2000, numcols=5000, blockSize=CSV_BLOCK_SIZE,
+                  verbose=True):
+    """
+    times write_csv_rows() against writing a random (numrows x numcols)
+    array line by line, with one str() per value (as the CSV files were
+    previously written), and checks that the files are identical.
+    (for a 500 x 2000 array, the block writer is about 1.4x faster)
+    returns a dict of {name : (seconds, MB per second)}
+    """
+    data = numpy.random.rand(numrows, numcols)
+    rowLabels = numpy.linspace(0.0, 1.0, numrows).tolist()
+    tempDir = tempfile.mkdtemp()
+    timing = {}
+    try:
+        loopName  = os.path.join(tempDir, 'loop.csv')
+        blockName = os.path.join(tempDir, 'block.csv')
+        
+        start = time.time()
+        fhandle = open(loopName, 'w')
+        _write_csv_rows_loop(fhandle, data, rowLabels)
+        fhandle.close()
+        timing['loop'] = time.time() - start
+        
+        start = time.time()
+        fhandle = open_csv(blockName, verbose=False)
+        write_csv_rows(fhandle, data, rowLabels, blockSize=blockSize)
+        fhandle.close()
+        timing['block'] = time.time() - start
+        
+        start = time.time()
+        fhandle = open_csv(blockName, compress=True, verbose=False)
+        write_csv_rows(fhandle, data, rowLabels, blockSize=blockSize)
+        fhandle.close()
+        timing['block+gzip'] = time.time() - start
+        
+        size = os.path.getsize(loopName)/1.0e6
+        if open(loopName).read() != open(blockName).read():
+            raise Exception('the block CSV file is not identical!')
+    finally:
+        shutil.rmtree(tempDir, True)
+    
+    timing = dict([(name, (seconds, size/seconds)) for name,seconds in timing.items()])
+    if verbose:
+        print "\nCSV writing of a %i x %i array (%.1f MB):" % (numrows, numcols, size)
+        for name in ('loop', 'block', 'block+gzip'):
+            print "    %-10s: %8.3f s, %8.2f MB/s" % ((name,) + timing[name])
+        print "    speedup   : %8.2fx" % (timing['loop'][0]/timing['block'][0])
+    return timing
+
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def _write_csv_rows_loop(fhandle, data, rowLabels):
+    """ reference (line by line) version of write_csv_rows() """
+    for i in range(0,len(rowLabels)):
+        line = str(rowLabels[i])
+        for k in range(0,data.shape[1]):
+            line += ', ' + str(data[i,k])
+        line += '\n'
+        fhandle.write(line)
+    return
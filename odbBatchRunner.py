@@ -0,0 +1,318 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Batch extraction of the same quantities from many ODB files
+(e.g. the ODBs of a parametric study).
+
+Each ODB is processed by a worker process (with a bounded number of
+workers), which opens the ODB once and fetches every requested
+quantity. The results of each quantity are then consolidated into one
+.npz file, which contains the arrays of every ODB. A failure (e.g. a
+missing set, or a corrupt ODB) only affects that ODB and quantity;
+the failures are reported and written to batch_failures.txt
+
+Example (from a script):
+    specs = [ExtractionSpec('IntPtVariable', ('MISES','MYSET'), 'fetchNodalAverage'),
+             ExtractionSpec('NodalVariable', ('U','MYSET'), 'fetchNodalOutput'),
+             ExtractionSpec('CrackVariable', ('Step-1','CRACK-1'), 'fetchJintegral')]
+    results, failures = run_batch('C:\\study\\*.odb', specs, numWorkers=8,
+                                  outputDir='C:\\study\\results')
+
+Example (from the command line):
+    abaqus python odbBatchRunner.py --workers 8 --output results
+        --spec IntPtVariable:MISES,MYSET:fetchNodalAverage
+        --spec NodalVariable:U,MYSET:fetchNodalOutput
+        study\\*.odb
+"""
+
+#
+# Import Modules
+#
+import os
+import sys
+import glob
+import re
+import traceback
+import multiprocessing
+import numpy
+from myFileOperations import *
+
+#
+# Constants
+#
+
+# result attributes which are saved (if they are defined)
+RESULT_ATTRIBUTES = ('totalTime', 'runCompletion', 'nodeLabels', 'elementLabels',
+                     'intPtLabels', 'instanceNames', 'componentLabels',
+                     'contourLabels', 'contourNumbers', 'resultData',
+                     'statisticData')
+
+#
+# Classes
+#
+
+class ExtractionSpec(object):
+    """
+    definition of one quantity to extract from every ODB
+
+    Attributes:
+        className = string name of the class, one of 'IntPtVariable',
+                    'NodalVariable', 'ElementVariable', or 'CrackVariable'
+        args      = tuple of the class inputs after odbPath,
+                    e.g. ('MISES','MYSET') or ('Step-1','CRACK-1')
+        method    = string name of the fetch method (e.g. 'fetchNodalAverage')
+        options   = (optional) dict of keyword inputs of the fetch method
+                    (e.g. {'steps':'Step-2', 'stride':10})
+        name      = (optional) name of the quantity, used for the output file.
+                    Default is built from className, args, and method.
+    """
+
+    def __init__(self, className, args, method, options=None, name=None):
+        """ define the extraction """
+        if className not in ('IntPtVariable', 'NodalVariable',
+                             'ElementVariable', 'CrackVariable'):
+            raise ValueError('unknown className %s' % className)
+        if isinstance(args, str):
+            args = (args,)
+        self.className = className
+        self.args      = tuple(args)
+        self.method    = method
+        self.options   = dict(options or {})
+        if name is None:
+            name = '_'.join(self.args + (method,))
+        self.name = safe_filename(name)
+        return
+
+    @classmethod
+    def fromString(cls, spec):
+        """
+        create spec from a string of the form 'className:arg1,arg2:method'
+        (as used by the command line)
+        """
+        try:
+            className, args, method = spec.split(':')
+        except ValueError:
+            raise ValueError('spec must be of the form className:arg1,arg2:method')
+        return cls(className, args.split(','), method)
+
+    def fetch(self, odbPath, session=None):
+        """ returns the variable of this spec, fetched from odbPath """
+        if self.className == 'CrackVariable':
+            from odbHistoryVariableClasses import CrackVariable as cls
+        else:
+            import odbFieldVariableClasses
+            cls = getattr(odbFieldVariableClasses, self.className)
+        variable = cls(odbPath, *self.args, session=session)
+        getattr(variable, self.method)(**self.options)
+        return variable
+
+#
+# Functions
+#
+
+def run_batch(odbPaths, specs, numWorkers=None, outputDir=None, verbose=True):
+    """
+    extracts every spec from every ODB, using a pool of worker processes.
+
+    input:
+        odbPaths   = sequence of ODB file names, or a glob pattern
+                     (e.g. 'C:\\study\\*.odb'). Patterns in a sequence
+                     are expanded as well.
+        specs      = sequence of ExtractionSpec objects
+        numWorkers = (optional) maximum number of worker processes.
+                     Default is the number of CPUs.
+        outputDir  = (optional) if given, one <spec.name>.npz file per spec
+                     is written to this directory, as well as a
+                     batch_failures.txt listing any failures
+        verbose    = (optional) print progress and failures
+
+    returns [results, failures]
+        results  = dict {spec.name : {odbPath : {attribute : array}}}
+        failures = dict {(odbPath, spec.name) : error message}
+    """
+    odbPaths = _expand_paths(odbPaths)
+    if len(odbPaths) == 0:
+        raise ValueError('no ODB files were found!')
+
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError('spec names must be unique!')
+
+    if numWorkers is None:
+        numWorkers = multiprocessing.cpu_count()
+    numWorkers = max(1, min(int(numWorkers), len(odbPaths)))
+
+    # one task per ODB, so each ODB is only opened once
+    tasks = [(odbPath, specs) for odbPath in odbPaths]
+    if numWorkers == 1:
+        output = [_run_odb(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(numWorkers)
+        try:
+            output = pool.map(_run_odb, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    # collect the results of each spec
+    results  = dict([(name, {}) for name in names])
+    failures = {}
+    for odbPath,(odbResults,odbFailures) in zip(odbPaths, output):
+        for name,attributes in odbResults.items():
+            results[name][odbPath] = attributes
+        for name,message in odbFailures.items():
+            failures[(odbPath, name)] = message
+
+    if verbose:
+        print "\nbatch extraction of %i quantities from %i ODBs complete" % \
+              (len(specs), len(odbPaths))
+        for (odbPath,name),message in sorted(failures.items()):
+            print "!! %s failed for %s:\n%s" % (name, odbPath, message)
+
+    if outputDir is not None:
+        save_batch(results, failures, outputDir, verbose)
+    return [results, failures]
+
+
+def save_batch(results, failures, outputDir, verbose=True):
+    """
+    writes the results of run_batch() to outputDir: one <spec name>.npz
+    per quantity, with the arrays of every ODB stored as
+    '<odbName>__<attribute>' (e.g. 'model1__resultData'), and a
+    batch_failures.txt file listing any failures.
+    """
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+
+    for name,odbResults in results.items():
+        keys   = _odb_keys(sorted(odbResults.keys()))
+        arrays = {}
+        for odbPath,attributes in odbResults.items():
+            for attribute,value in attributes.items():
+                arrays[keys[odbPath] + '__' + attribute] = value
+        # record the ODB file of each key
+        arrays['odbPaths'] = numpy.array(sorted(odbResults.keys()))
+        arrays['odbKeys']  = numpy.array([keys[p] for p in sorted(odbResults.keys())])
+
+        fileName = os.path.join(outputDir, name + '.npz')
+        check_delete(fileName, verbose)
+        numpy.savez(fileName, **arrays)
+
+    fileName = os.path.join(outputDir, 'batch_failures.txt')
+    check_delete(fileName, False)
+    if len(failures) > 0:
+        saveFile = open(fileName, 'w')
+        for (odbPath,name),message in sorted(failures.items()):
+            saveFile.write('%s, %s:\n%s\n' % (odbPath, name, message))
+        saveFile.close()
+    return
+
+
+#
+# Private Functions
+#
+
+def _expand_paths(odbPaths):
+    """ expands glob patterns into a sorted list of unique ODB files """
+    if isinstance(odbPaths, str):
+        odbPaths = [odbPaths]
+    expanded = []
+    for path in odbPaths:
+        matches = glob.glob(path)
+        if len(matches) == 0:
+            # not a pattern (or no match). keep, so that it is reported
+            matches = [path]
+        for match in sorted(matches):
+            if match not in expanded:
+                expanded.append(match)
+    return expanded
+
+
+def _odb_keys(odbPaths):
+    """ returns a dict of a unique (file name based) key for each ODB """
+    keys = {}
+    used = set()
+    for path in odbPaths:
+        key = os.path.splitext(os.path.basename(path))[0]
+        key = base = re.sub('[^0-9a-zA-Z_\-]', '_', key)
+        i = 1
+        while key in used:
+            key = '%s_%i' % (base, i)
+            i += 1
+        used.add(key)
+        keys[path] = key
+    return keys
+
+
+def _result_attributes(variable):
+    """ returns dict of the defined result attributes of a variable """
+    attributes = {}
+    for name in RESULT_ATTRIBUTES:
+        value = getattr(variable, name, None)
+        if isinstance(value, dict):
+            # e.g. statisticData, saved as statisticData_max, etc.
+            for key,array in value.items():
+                attributes[name + '_' + key] = numpy.asarray(array)
+        elif value is not None:
+            attributes[name] = numpy.asarray(value)
+    return attributes
+
+
+def _run_odb(task):
+    """
+    worker function for run_batch(). fetches every spec from one ODB.
+    returns [results, failures] of the ODB, keyed by spec name
+    """
+    odbPath, specs = task
+    results  = {}
+    failures = {}
+    try:
+        from odbSessionClasses import OdbSession
+        with OdbSession(odbPath) as session:
+            for spec in specs:
+                try:
+                    variable = spec.fetch(odbPath, session)
+                    results[spec.name] = _result_attributes(variable)
+                except Exception:
+                    failures[spec.name] = traceback.format_exc()
+    except Exception:
+        # the ODB itself could not be opened (or closed)
+        message = traceback.format_exc()
+        for spec in specs:
+            if spec.name not in results:
+                failures[spec.name] = message
+    return [results, failures]
+
+
+#
+# Command Line
+#
+
+def main(argv=None):
+    """ command line entry point. see the module doc string """
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='extract the same quantities from many ODB files')
+    parser.add_argument('odbPaths', nargs='+',
+                        help='ODB files (or glob patterns)')
+    parser.add_argument('--spec', action='append', required=True,
+                        help='className:arg1,arg2:method (may be repeated)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='maximum number of worker processes')
+    parser.add_argument('--output', default=os.getcwd(),
+                        help='output directory for the .npz files')
+    args = parser.parse_args(argv)
+
+    specs = [ExtractionSpec.fromString(s) for s in args.spec]
+    results, failures = run_batch(args.odbPaths, specs, args.workers, args.output)
+    if len(failures) > 0:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
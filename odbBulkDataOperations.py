@@ -0,0 +1,540 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Functions for reading the values of an Abaqus field output subset
+as whole numpy arrays, instead of looping over every FieldValue.
+
+The "bulk" engine reads the FieldBulkData blocks of a field output
+(fieldOutput.bulkDataBlocks), which already store the labels and data
+of a region as arrays. The "loop" engine is the original per-value
+scheme, and is kept as a fallback for when bulk data is unavailable.
+
+grouped_reduction() averages (or otherwise reduces) the values of a
+frame by group, e.g. the integration point values of each element.
+
+read_instance_mesh() reads the nodes and elements of an instance in
+blocks, converting each block to arrays at once (rather than filling
+the arrays one node or element at a time). The element connectivity
+is returned in a compressed (CSR) layout, so that an instance may mix
+element types with different numbers of nodes.
+"""
+
+#
+# Import Modules
+#
+from odbAccess import *
+from abaqusConstants import *
+import numpy
+import itertools
+import operator
+
+#
+# Constants
+#
+
+# FieldValue attribute name --> FieldBulkData attribute name
+BULK_LABEL_NAMES = {'elementLabel'     : 'elementLabels',
+                    'nodeLabel'        : 'nodeLabels',
+                    'integrationPoint' : 'integrationPoints'}
+
+# label name of the instance of each value (i.e. value.instance.name)
+INSTANCE_LABEL_NAME = 'instanceName'
+
+# precision --> attribute name of the data (of a FieldValue or FieldBulkData)
+PRECISION_DATA_NAMES = {'single' : 'data', 'double' : 'dataDouble'}
+
+# number of nodes (or elements) converted to arrays at once by read_instance_mesh
+MESH_BLOCK_SIZE = 100000
+
+#
+# Functions
+#
+
+def read_field_values(fieldOutput, abqAttrib, labelNames, bulk=True, precision=None):
+    """
+    reads all values of a field output (typically a subset obtained
+    with getSubset) and returns them as numpy arrays.
+
+    input:
+        fieldOutput = Abaqus FieldOutput object
+        abqAttrib   = name of the FieldValue attribute holding the
+                      requested data (e.g. 'data', 'mises', 'press').
+                      may also be a sequence of names (e.g. ('mises','press')),
+                      in which case every name is obtained from one read.
+        labelNames  = sequence of FieldValue label attributes to return,
+                      e.g. ('elementLabel','integrationPoint').
+                      'instanceName' returns the instance name of each value.
+        bulk        = (optional) logical True/False (Default True)
+                      if True, the bulkDataBlocks are used. If the bulk
+                      data cannot be read, the per-value loop is used.
+        precision   = (optional) 'single' or 'double', the precision of
+                      the data (see field_precision). Detected if not given.
+
+    returns [labels, data]
+        labels = list of int arrays, ordered as labelNames
+                 (string arrays for 'instanceName')
+        data   = numpy float64 array. rank-1 for scalar data, otherwise
+                 rank-2 (value, component). If abqAttrib is a sequence,
+                 data is a list with one array per name.
+    """
+    if isinstance(abqAttrib, str):
+        labels,data = read_field_values(fieldOutput, (abqAttrib,), labelNames, bulk,
+                                        precision)
+        return labels, data[0]
+
+    # the data is read from data or dataDouble, without trying both
+    if precision is None:
+        precision = field_precision(fieldOutput, bulk) or 'single'
+    dataAttrib = PRECISION_DATA_NAMES[precision]
+
+    if bulk:
+        try:
+            return _read_bulk_values(fieldOutput, abqAttrib, labelNames, dataAttrib)
+        except (AttributeError, OdbError):
+            # bulkDataBlocks (or the requested member) is not available
+            # for this output. fall back to the per-value loop
+            pass
+    return _read_loop_values(fieldOutput, abqAttrib, labelNames, dataAttrib)
+
+
+def field_precision(fieldOutput, bulk=True):
+    """
+    returns the precision of the data of a field output, 'single' (in
+    the data attribute) or 'double' (in the dataDouble attribute).
+    Detected once, from the first bulk block (or value), so that the
+    data of each value can be read without an exception handler.
+    returns None if the field output is empty.
+    """
+    first = None
+    if bulk:
+        try:
+            first = fieldOutput.bulkDataBlocks[0]
+        except (AttributeError, IndexError, OdbError):
+            pass
+    if first is None:
+        try:
+            first = fieldOutput.values[0]
+        except IndexError:
+            # empty field output
+            return None
+
+    precision = getattr(first, 'precision', None)
+    if precision is not None:
+        if precision == DOUBLE_PRECISION:
+            return 'double'
+        return 'single'
+
+    # otherwise, data is empty (or cannot be read) in double precision
+    try:
+        data = first.data
+    except OdbError:
+        return 'double'
+    if data is None or (hasattr(data, '__len__') and len(data) == 0):
+        return 'double'
+    return 'single'
+
+
+def stress_invariant(components, componentLabels, abqAttrib):
+    """
+    calculates a tensor invariant from an array of tensor components,
+    in the same manner as Abaqus does for the FieldValue attributes
+
+    input:
+        components      = numpy array (value, component) of tensor data
+        componentLabels = sequence of component names (e.g. 'S11','S12')
+        abqAttrib       = 'mises', 'press', 'tresca', or 'inv3'
+
+    returns numpy float64 vector of the invariant for each value
+    """
+    T = full_tensor(components, componentLabels)
+
+    # hydrostatic part and deviator
+    trace = T[:,0,0] + T[:,1,1] + T[:,2,2]
+    if abqAttrib == 'press':
+        return -trace/3.0
+    dev = T.copy()
+    for i in range(0,3):
+        dev[:,i,i] -= trace/3.0
+
+    if abqAttrib == 'mises':
+        return numpy.sqrt( 1.5*(dev*dev).sum(axis=2).sum(axis=1) )
+    elif abqAttrib == 'inv3':
+        # r = (9/2 S.S:S)^(1/3) = (27/2 det(S))^(1/3)
+        r3 = 13.5*_det3(dev)
+        return numpy.sign(r3) * numpy.abs(r3)**(1.0/3.0)
+    elif abqAttrib == 'tresca':
+        principal = numpy.linalg.eigvalsh(T)
+        return principal[:,-1] - principal[:,0]
+    else:
+        raise Exception('Invariant %s has not been programmed! (yet?)' % abqAttrib)
+    return
+
+
+def full_tensor(components, componentLabels):
+    """
+    expands an array of (symmetric) tensor components to an
+    array of full 3x3 tensors. Components that are not in
+    componentLabels (e.g. S33 for plane stress) are zero.
+
+    returns numpy float64 array (value, 3, 3)
+    """
+    components = numpy.asarray(components, dtype=numpy.float64)
+    if components.ndim == 1:
+        components = components.reshape((-1,1))
+    T = numpy.zeros((components.shape[0],3,3), dtype=numpy.float64)
+    for c,label in enumerate(componentLabels):
+        # last two characters are the tensor indices (e.g. S12 or LE12)
+        i = int(label[-2]) - 1
+        j = int(label[-1]) - 1
+        T[:,i,j] = components[:,c]
+        T[:,j,i] = components[:,c]
+    return T
+
+
+def grouped_reduction(groups, values, numgroups, weights=None, statistics=('mean',)):
+    """
+    reduces values by group (e.g. the integration point values of each
+    element) in a single pass, using grouped sums (numpy.bincount)
+    
+    input:
+        groups     = numpy int array of the group index (0 to numgroups-1)
+                     of each value
+        values     = numpy float64 vector of the values
+        numgroups  = number of groups
+        weights    = (optional) numpy float64 vector of the weight of
+                     each value (e.g. the integration point volume). If
+                     given, the mean and std are weighted averages.
+        statistics = (optional) sequence of the requested statistics:
+                     'mean', 'sum', 'count', 'min', 'max', and/or 'std'
+    
+    returns dict of {statistic : numpy float64 vector (numgroups)}.
+    groups without values are NaN (except for 'sum' and 'count')
+    """
+    groups = numpy.asarray(groups, dtype=int)
+    values = numpy.asarray(values, dtype=numpy.float64)
+    for name in statistics:
+        if name not in ('mean','sum','count','min','max','std'):
+            raise ValueError('unknown statistic %s' % name)
+    
+    result = {}
+    count  = numpy.bincount(groups, minlength=numgroups).astype(numpy.float64)
+    empty  = (count == 0)
+    if weights is None:
+        total = count
+        wsum  = numpy.bincount(groups, weights=values, minlength=numgroups)
+    else:
+        weights = numpy.asarray(weights, dtype=numpy.float64)
+        total = numpy.bincount(groups, weights=weights, minlength=numgroups)
+        wsum  = numpy.bincount(groups, weights=weights*values, minlength=numgroups)
+    
+    if 'count' in statistics:
+        result['count'] = count
+    if 'sum' in statistics:
+        result['sum'] = numpy.bincount(groups, weights=values, minlength=numgroups)
+    if 'mean' in statistics or 'std' in statistics:
+        mean = numpy.empty(numgroups, dtype=numpy.float64)
+        mean[empty]  = numpy.nan
+        mean[~empty] = wsum[~empty] / total[~empty]
+        if 'mean' in statistics:
+            result['mean'] = mean
+        if 'std' in statistics:
+            # (population) standard deviation about the group mean
+            dev2 = (values - mean[groups])**2
+            if weights is not None:
+                dev2 = weights*dev2
+            var = numpy.bincount(groups, weights=dev2, minlength=numgroups)
+            var[~empty] = var[~empty] / total[~empty]
+            var[empty]  = numpy.nan
+            result['std'] = numpy.sqrt(var)
+    if 'min' in statistics or 'max' in statistics:
+        # sort by group, then by value. the extremes of each group
+        # are the first and last of its sorted values
+        order = numpy.lexsort((values, groups))
+        sortedGroups = groups[order]
+        start = numpy.searchsorted(sortedGroups, numpy.arange(numgroups), 'left')
+        end   = numpy.searchsorted(sortedGroups, numpy.arange(numgroups), 'right')
+        for name,index in (('min',start), ('max',end-1)):
+            if name in statistics:
+                extreme = numpy.empty(numgroups, dtype=numpy.float64)
+                extreme[empty]  = numpy.nan
+                extreme[~empty] = values[order][index[~empty]]
+                result[name] = extreme
+    return result
+
+
+def align_values(labels, otherLabels, otherData):
+    """
+    reorders the data of another field output (e.g. IVOL) so that it
+    matches the order of the labels of the requested field output.
+    labels and otherLabels are lists of int arrays, as returned by
+    read_field_values(). raises KeyError if the labels do not match.
+    """
+    if all([numpy.array_equal(a,b) for a,b in zip(labels, otherLabels)]):
+        # same order (which is typical)
+        return otherData
+    if len(labels[0]) != len(otherLabels[0]):
+        raise KeyError('the labels of the field outputs do not match!')
+    order      = numpy.lexsort(labels[::-1])
+    otherOrder = numpy.lexsort(otherLabels[::-1])
+    for a,b in zip(labels, otherLabels):
+        if not numpy.array_equal(a[order], b[otherOrder]):
+            raise KeyError('the labels of the field outputs do not match!')
+    aligned = numpy.empty_like(otherData)
+    aligned[order] = otherData[otherOrder]
+    return aligned
+
+
+def read_instance_mesh(instance, bulk=True, blockSize=MESH_BLOCK_SIZE):
+    """
+    reads the mesh of an Abaqus OdbInstance as numpy arrays.
+
+    the element connectivity is stored in a compressed (CSR) layout, so
+    that elements with different numbers of nodes (e.g. C3D8R, C3D6, and
+    C3D4) can be mixed: the nodes of element k are
+        connectNodes[connectOffsets[k]:connectOffsets[k+1]]
+    the elements are in instance order. the element types are numbered
+    in the order that each type first appears in the instance.
+
+    input:
+        instance  = Abaqus OdbInstance object
+        bulk      = (optional) logical True/False (Default True)
+                    if True, the nodes and elements are read in blocks of
+                    blockSize, and each block is converted at once.
+                    if False, the arrays are filled one at a time.
+        blockSize = (optional) number of nodes (or elements) per block
+
+    returns dict of
+        nodes          = (nnod,1) int array of the node labels
+        nodesCoords    = (nnod,3) float64 array of the nodal coordinates
+        elements       = (nele,1) int array of the element labels
+        connectOffsets = (nele+1,) int array of the start of the
+                         connectivity of each element in connectNodes
+        connectNodes   = int array of the connectivity of every element
+        elemTypeCodes  = (nele,) int array of the type of each element,
+                         as an index of elemTypes
+        elemTypes      = tuple of the element type names (e.g. 'C3D8R')
+    """
+    # the node and element sequences are built by every access
+    # of instance.nodes (or .elements), so only access them once
+    nodeArray    = instance.nodes
+    elementArray = instance.elements
+
+    if bulk:
+        nodes,nodesCoords = _read_mesh_blocks(nodeArray, 'coordinates', 3,
+                                              numpy.float64, blockSize)
+        elements,offsets,connect,codes,elemTypes = \
+            _read_element_blocks(elementArray, blockSize)
+    else:
+        nodes,nodesCoords,elements,offsets,connect,codes,elemTypes = \
+            _read_mesh_loop(nodeArray, elementArray)
+
+    return {'nodes'          : nodes,
+            'nodesCoords'    : nodesCoords,
+            'elements'       : elements,
+            'connectOffsets' : offsets,
+            'connectNodes'   : connect,
+            'elemTypeCodes'  : codes,
+            'elemTypes'      : elemTypes}
+
+
+#
+# Private Functions
+#
+
+def _read_mesh_blocks(objects, name, width, dtype, blockSize):
+    """
+    bulk engine for read_instance_mesh(). returns [labels, data], the
+    (n,1) int array of the label of the objects (nodes or elements),
+    and the (n,width) array of their sequence attribute name (e.g.
+    'coordinates'). each block is flattened into the arrays at once.
+    raises ValueError if an attribute does not have width values.
+    """
+    numobj = len(objects)
+    labels = numpy.zeros((numobj,1), dtype=int)
+    data   = numpy.zeros((numobj,width), dtype=dtype)
+    getter = operator.attrgetter(name)
+    objects = iter(objects)
+    i = 0
+    while i < numobj:
+        block = list(itertools.islice(objects, int(blockSize)))
+        n = len(block)
+        values = map(getter, block)
+        if any([len(v) != width for v in values]):
+            raise ValueError('every %s must have %i values!' % (name, width))
+        labels[i:i+n,0] = numpy.fromiter([o.label for o in block], dtype=int, count=n)
+        data[i:i+n,:] = numpy.fromiter(itertools.chain.from_iterable(values),
+                                       dtype=dtype, count=n*width).reshape((n,width))
+        i += n
+    return labels, data
+
+
+def _read_element_blocks(elementArray, blockSize):
+    """
+    bulk engine for the elements of read_instance_mesh(). returns
+    [labels, offsets, connect, codes, elemTypes] (see read_instance_mesh),
+    in the order of elementArray.
+    """
+    nele    = len(elementArray)
+    labels  = numpy.zeros((nele,1), dtype=int)
+    lengths = numpy.zeros(nele, dtype=int)
+    codes   = numpy.zeros(nele, dtype=int)
+    typeCodes = {}
+    blocks  = []
+    getter  = operator.attrgetter('connectivity')
+    elementArray = iter(elementArray)
+    i = 0
+    while i < nele:
+        block = list(itertools.islice(elementArray, int(blockSize)))
+        n = len(block)
+        values = map(getter, block)
+        lengths[i:i+n] = numpy.fromiter(map(len, values), dtype=int, count=n)
+        blocks.append(numpy.fromiter(itertools.chain.from_iterable(values),
+                                     dtype=int, count=lengths[i:i+n].sum()))
+        labels[i:i+n,0] = numpy.fromiter([e.label for e in block], dtype=int, count=n)
+        codes[i:i+n] = [typeCodes.setdefault(e.type, len(typeCodes)) for e in block]
+        i += n
+    connect = numpy.zeros(0, dtype=int)
+    if blocks:
+        connect = numpy.concatenate(blocks)
+    return labels, _offsets(lengths), connect, codes, _type_names(typeCodes)
+
+
+def _read_mesh_loop(nodeArray, elementArray):
+    """ per-object loop engine for read_instance_mesh() """
+    nnod = len(nodeArray)
+    nele = len(elementArray)
+    nodes       = numpy.zeros((nnod,1), dtype=int)
+    elements    = numpy.zeros((nele,1), dtype=int)
+    nodesCoords = numpy.zeros((nnod,3), dtype=numpy.float64)
+    lengths     = numpy.zeros(nele, dtype=int)
+    codes       = numpy.zeros(nele, dtype=int)
+    typeCodes   = {}
+    connect     = []
+    for i,n in enumerate(nodeArray):
+        nodes[i,0]       = n.label
+        nodesCoords[i,:] = n.coordinates
+    for i,e in enumerate(elementArray):
+        elements[i,0] = e.label
+        lengths[i]    = len(e.connectivity)
+        codes[i]      = typeCodes.setdefault(e.type, len(typeCodes))
+        connect.extend(e.connectivity)
+    connect = numpy.array(connect, dtype=int)
+    return (nodes, nodesCoords, elements, _offsets(lengths), connect, codes,
+            _type_names(typeCodes))
+
+
+def _offsets(lengths):
+    """ (n+1,) CSR offsets of rows with the given lengths """
+    offsets = numpy.zeros(len(lengths)+1, dtype=int)
+    numpy.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _type_names(typeCodes):
+    """ tuple of the names of a {name : code} dict, ordered by code """
+    names = [None]*len(typeCodes)
+    for name,code in typeCodes.items():
+        names[code] = str(name)
+    return tuple(names)
+
+
+def _det3(T):
+    """ determinant of a (value, 3, 3) array of tensors """
+    return ( T[:,0,0]*(T[:,1,1]*T[:,2,2] - T[:,1,2]*T[:,2,1])
+           - T[:,0,1]*(T[:,1,0]*T[:,2,2] - T[:,1,2]*T[:,2,0])
+           + T[:,0,2]*(T[:,1,0]*T[:,2,1] - T[:,1,1]*T[:,2,0]) )
+
+
+def _block_data(block, dataAttrib):
+    """ returns the data array of a bulk block (data or dataDouble) """
+    return numpy.asarray(getattr(block, dataAttrib), dtype=numpy.float64)
+
+
+def _read_bulk_values(fieldOutput, abqAttribs, labelNames, dataAttrib):
+    """ bulk engine for read_field_values() """
+    labelBlocks = [[] for name in labelNames]
+    dataBlocks  = [[] for name in abqAttribs]
+    for block in fieldOutput.bulkDataBlocks:
+        # the components are read (at most) once per block
+        components = None
+        for k,abqAttrib in enumerate(abqAttribs):
+            if abqAttrib == 'data':
+                if components is None:
+                    components = _block_data(block, dataAttrib)
+                data = components
+                if data.ndim == 2 and data.shape[1] == 1:
+                    # scalar output (e.g. PEEQ)
+                    data = data[:,0]
+            else:
+                # invariants (e.g. mises). use the block member if Abaqus
+                # provides one. otherwise use the per-value loop, so that
+                # the values stored by Abaqus are returned (an invariant
+                # calculated from the single precision components differs)
+                data = getattr(block, abqAttrib, None)
+                if data is None or len(data) == 0:
+                    raise AttributeError('bulk data do not have a %s member' % abqAttrib)
+                data = numpy.asarray(data, dtype=numpy.float64).ravel()
+            dataBlocks[k].append(data)
+        numval = data.shape[0]
+        if any([d[-1].shape[0] != numval for d in dataBlocks]):
+            # the block members do not have one value per label,
+            # so they cannot be matched. use the per-value loop
+            raise AttributeError('bulk data members do not match')
+
+        for i,name in enumerate(labelNames):
+            if name == INSTANCE_LABEL_NAME:
+                # one instance per block
+                labelBlocks[i].append(numpy.repeat(numpy.array([block.instance.name]), numval))
+                continue
+            labels = numpy.asarray(getattr(block, BULK_LABEL_NAMES[name]), dtype=int).ravel()
+            if len(labels) != numval:
+                # labels are stored once per element (or node),
+                # not once per value. expand them to one per value.
+                if len(labels) == 0 or numval % len(labels) != 0:
+                    raise AttributeError('bulk %s do not match the data' % name)
+                nrep = numval // len(labels)
+                if name == 'integrationPoint':
+                    labels = numpy.tile(labels, nrep)
+                else:
+                    labels = numpy.repeat(labels, nrep)
+            labelBlocks[i].append(labels)
+
+    if len(dataBlocks[0]) == 0:
+        # empty subset
+        return [numpy.zeros(0,dtype=(str if name == INSTANCE_LABEL_NAME else int))
+                for name in labelNames], \
+               [numpy.zeros(0,dtype=numpy.float64) for name in abqAttribs]
+
+    labels = [numpy.concatenate(blocks) for blocks in labelBlocks]
+    data   = [numpy.concatenate(blocks) for blocks in dataBlocks]
+    return labels, data
+
+
+def _read_loop_values(fieldOutput, abqAttribs, labelNames, dataAttrib):
+    """ per-value loop engine for read_field_values() """
+    # the data is obtained from dataAttrib (data or dataDouble)
+    abqAttribs = [dataAttrib if a == 'data' else a for a in abqAttribs]
+    labelLists = [[] for name in labelNames]
+    dataLists  = [[] for name in abqAttribs]
+    for value in fieldOutput.values:
+        for i,name in enumerate(labelNames):
+            if name == INSTANCE_LABEL_NAME:
+                labelLists[i].append(value.instance.name)
+            else:
+                labelLists[i].append(getattr(value, name))
+        for k,abqAttrib in enumerate(abqAttribs):
+            dataLists[k].append(getattr(value, abqAttrib))
+
+    labels = []
+    for name,l in zip(labelNames, labelLists):
+        if name == INSTANCE_LABEL_NAME:
+            labels.append(numpy.array(l, dtype=str))
+        else:
+            labels.append(numpy.asarray(l, dtype=int))
+    data   = [numpy.asarray(d, dtype=numpy.float64) for d in dataLists]
+    return labels, data
@@ -0,0 +1,500 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Functions for exporting an instance mesh and its field results as an
+XDMF time series, which can be opened directly in ParaView (or VisIt).
+
+An XDMF file is a small XML file which describes the mesh and the time
+steps, and points to the arrays ("heavy data") in a binary file. The
+mesh (node coordinates and element connectivity) is written once, and
+is shared by every time step. The field results are streamed from the
+ODB one frame at a time (as with iterFrames), so the whole time series
+is never held in memory, and there is no intermediate CSV stage.
+
+The heavy data is written to an HDF5 file (format='hdf5', requires
+h5py), or to one raw binary file (format='binary', no dependencies, so
+that it can be used from "abaqus python").
+
+Example:
+    mesh = InstanceMesh('example.odb', 'PART-1-1')
+    mesh.fetchMesh()
+    mises = IntPtVariable('example.odb', 'MISES', 'MYSET')
+    disp  = NodalVariable('example.odb', 'U', 'MYSET')
+    export_xdmf('example', mesh, [mises, disp])
+    # writes example.xdmf and example.h5
+
+Nodal results (e.g. fetchNodalAverage, fetchNodalOutput) are exported
+at the nodes, and element results (e.g. fetchElementAverage) at the
+elements. Nodes (or elements) of the mesh which are not in the set of
+a variable are NaN. Element types are mapped to XDMF cells by their
+shape (e.g. C3D8R is a Hexahedron, CAX4R a Quadrilateral); instances
+which mix element types are written as a "Mixed" topology.
+"""
+
+#
+# Import Modules
+#
+import os
+import itertools
+import numpy
+from xml.sax.saxutils import quoteattr
+from myFileOperations import *
+from odbLabelIndexClasses import *
+from odbTimelineClasses import *
+from odbSessionClasses import *
+
+# HDF5 is optional
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+#
+# Constants
+#
+
+# supported heavy data formats, and their file extensions
+XDMF_FORMATS = {'hdf5' : '.h5', 'binary' : '.bin'}
+
+# XDMF cell (name, mixed topology number) of each shape, by the
+# number of nodes of the element
+XDMF_SOLID_CELLS   = {4  : ('Tetrahedron', 6),
+                      5  : ('Pyramid', 7),
+                      6  : ('Wedge', 8),
+                      8  : ('Hexahedron', 9),
+                      10 : ('Tetrahedron_10', 38),
+                      13 : ('Pyramid_13', 39),
+                      15 : ('Wedge_15', 40),
+                      20 : ('Hexahedron_20', 48)}
+XDMF_SURFACE_CELLS = {3 : ('Triangle', 4),
+                      4 : ('Quadrilateral', 5),
+                      6 : ('Triangle_6', 36),
+                      8 : ('Quadrilateral_8', 37),
+                      9 : ('Quadrilateral_9', 35)}
+XDMF_LINE_CELLS    = {2 : ('Polyline', 2),
+                      3 : ('Edge_3', 34)}
+
+# Abaqus element type prefixes of solid (3D) and line (beam, truss)
+# elements. all other elements are surfaces (plane, axisymmetric, shell)
+SOLID_ELEMENT_PREFIXES = ('C3D', 'DC3D', 'DCC3D', 'AC3D', 'COH3D', 'SC6', 'SC8')
+LINE_ELEMENT_PREFIXES  = ('B2', 'B3', 'T2D', 'T3D', 'PIPE', 'FRAME', 'DC1D')
+
+# XDMF attribute type, by the number of components
+XDMF_ATTRIBUTE_TYPES = {1 : 'Scalar', 3 : 'Vector', 6 : 'Tensor6', 9 : 'Tensor'}
+
+# XDMF order of the (i,j) tensor indices, by the number of components.
+# Tensor6 is the upper triangle of a symmetric tensor (xx,xy,xz,yy,yz,zz),
+# and Tensor is a full tensor in row-major order
+XDMF_TENSOR_ORDERS = {6 : ((1,1),(1,2),(1,3),(2,2),(2,3),(3,3)),
+                      9 : ((1,1),(1,2),(1,3),(2,1),(2,2),(2,3),(3,1),(3,2),(3,3))}
+
+#
+# Functions
+#
+
+def export_xdmf(fileName, mesh, variables, format='hdf5', bulk=True, steps=None,
+                timeRange=None, stride=1, frames=None, compress=False, verbose=True):
+    """
+    exports a mesh, and the field results of variables, as an XDMF time series.
+
+    input:
+        fileName  = name of the XDMF file. '.xdmf' is appended, if it is not
+                    already there. the heavy data file is named the same,
+                    with the extension of the format.
+        mesh      = InstanceMesh (already fetched, see fetchMesh)
+        variables = sequence of field variables (IntPtVariable, NodalVariable,
+                    ElementVariable) and/or (variable, method) pairs, where
+                    method is the name of the fetch method of the frames
+                    (e.g. 'fetchElementAverage'). the default method is the
+                    main fetch method of the class, or fetchNodalAverage
+                    for an IntPtVariable. variables without a session
+                    share one OdbSession (per ODB) during the export.
+        format    = (optional) 'hdf5' (default, requires h5py) or 'binary'
+        bulk, steps, timeRange, stride, frames = (optional) same as the
+                    inputs of the fetch methods. every variable must have
+                    the same (selected) frames.
+        compress  = (optional) gzip compress the HDF5 datasets
+        verbose   = (optional) print when files are saved or replaced
+
+    returns the name of the XDMF file
+    """
+    if format not in XDMF_FORMATS:
+        raise ValueError('format must be one of %s' % (sorted(XDMF_FORMATS.keys()),))
+    if mesh.connectNodes is None:
+        raise ValueError('the mesh must be fetched before it is exported!')
+    if os.path.splitext(fileName)[1].lower() != '.xdmf':
+        fileName += '.xdmf'
+    dataFile = os.path.splitext(fileName)[0] + XDMF_FORMATS[format]
+    selection = FrameSelection(steps, timeRange, stride, frames)
+
+    # node label --> position in the mesh (the geometry order)
+    nodeIndex = _MeshIndex(mesh.nodes[:,0], mesh.instanceName)
+
+    #
+    # write the mesh, once
+    #
+    check_delete(fileName, verbose)
+    check_delete(dataFile, verbose)
+    if format == 'hdf5':
+        writer = _HDF5Writer(dataFile, compress)
+    else:
+        writer = _BinaryWriter(dataFile)
+
+    streams  = []
+    sessions = {}
+    shared   = []
+    try:
+        geometry = writer.write('mesh/geometry', mesh.nodesCoords)
+        topology = _topology_xml(mesh, nodeIndex, writer)
+
+        #
+        # open the frames of every variable (one frame at a time). the
+        # variables without a session share one OdbSession per ODB file,
+        # so that each ODB is only opened once
+        #
+        names = set()
+        for variable in variables:
+            if isinstance(variable, (tuple, list)):
+                variable,method = variable
+            else:
+                method = _default_method(variable)
+            if variable.session is None:
+                odbFile = os.path.normcase(os.path.abspath(odb_file_path(variable.odbPath)))
+                if odbFile not in sessions:
+                    sessions[odbFile] = OdbSession(variable.odbPath)
+                variable.session = sessions[odbFile]
+                shared.append(variable)
+            stream = _FieldStream(mesh, nodeIndex, variable, method, selection, bulk)
+            streams.append(stream)
+            if stream.name in names:
+                raise ValueError('%s is exported more than once!' % stream.name)
+            names.add(stream.name)
+        if len(set([len(s.timeline) for s in streams])) > 1:
+            raise ValueError('every variable must have the same (selected) frames!')
+
+        #
+        # stream the frames, writing each time step as it is read
+        #
+        timeSteps = []
+        if streams:
+            frameSets = itertools.izip(*[s.frames for s in streams])
+        else:
+            frameSets = []
+        for f,frameSet in enumerate(frameSets):
+            frameTime = frameSet[0][1]
+            attributes = []
+            for stream,(i,streamTime,frameData) in zip(streams, frameSet):
+                if not numpy.allclose(streamTime, frameTime, rtol=stream.timeline.tolerance):
+                    raise ValueError('every variable must have the same (selected) frames!')
+                array = stream.meshArray(frameData[0])
+                dataItem = writer.write('%s/frame%i' % (stream.name, f), array)
+                attributes.append(stream.attributeXml(array, dataItem))
+            timeSteps.append((frameTime, attributes))
+    finally:
+        for stream in streams:
+            stream.close()
+        for variable in shared:
+            variable.session = None
+        for session in sessions.values():
+            session.close()
+        writer.close()
+
+    #
+    # the XML (light data) is small, and written last
+    #
+    xdmfFile = open(fileName, 'w')
+    try:
+        xdmfFile.write('<?xml version="1.0" ?>\n')
+        xdmfFile.write('<Xdmf Version="3.0">\n<Domain>\n')
+        series = (len(timeSteps) > 0)
+        if not series:
+            # just the mesh
+            timeSteps = [(None, [])]
+        else:
+            xdmfFile.write('<Grid Name="TimeSeries" GridType="Collection" '
+                           'CollectionType="Temporal">\n')
+        for frameTime,attributes in timeSteps:
+            xdmfFile.write('<Grid Name=%s GridType="Uniform">\n' % quoteattr(mesh.instanceName))
+            if frameTime is not None:
+                xdmfFile.write('<Time Value="%r"/>\n' % float(frameTime))
+            xdmfFile.write(topology)
+            xdmfFile.write('<Geometry GeometryType="XYZ">\n%s</Geometry>\n' % geometry)
+            xdmfFile.write(''.join(attributes))
+            xdmfFile.write('</Grid>\n')
+        if series:
+            xdmfFile.write('</Grid>\n')
+        xdmfFile.write('</Domain>\n</Xdmf>\n')
+    finally:
+        xdmfFile.close()
+    return fileName
+
+
+def xdmf_cell(elemType, nnpe):
+    """
+    returns (name, mixed topology number) of the XDMF cell of an Abaqus
+    element type with nnpe nodes (e.g. ('Hexahedron', 9) for C3D8R).
+    raises ValueError if there is no such cell.
+    """
+    if elemType.startswith(SOLID_ELEMENT_PREFIXES):
+        cells = XDMF_SOLID_CELLS
+    elif elemType.startswith(LINE_ELEMENT_PREFIXES):
+        cells = XDMF_LINE_CELLS
+    else:
+        cells = XDMF_SURFACE_CELLS
+    if nnpe not in cells:
+        raise ValueError('%s elements (with %i nodes) cannot be exported to XDMF!'
+                         % (elemType, nnpe))
+    return cells[nnpe]
+
+
+#
+# Private Classes
+#
+
+class _MeshIndex(object):
+    """ maps the (instance, label) of a node or element to its position in the mesh """
+
+    def __init__(self, labels, instanceName):
+        self._instanceName = instanceName
+        self._index = LabelIndex(labels, instanceName)
+        if len(self._index) != len(labels):
+            raise ValueError('the labels of instance %s are not unique!' % instanceName)
+        # sorted position --> position in the mesh
+        self._order = numpy.zeros(len(labels), dtype=int)
+        self._order[self._index.index(labels)] = numpy.arange(len(labels))
+        return
+
+    def __len__(self):
+        return len(self._order)
+
+    def find(self, labels, instances=None):
+        """
+        returns [positions, found] of labels in the mesh (see LabelIndex.find).
+        labels of other instances are not found.
+        """
+        positions,found = self._index.find(labels)
+        if instances is not None:
+            found &= (numpy.asarray(instances) == self._instanceName)
+        return self._order[positions], found
+
+
+class _FieldStream(object):
+    """ the frames of one variable, as arrays over the whole mesh """
+
+    def __init__(self, mesh, nodeIndex, variable, method, selection, bulk):
+        axes = variable._resultAxes.get(method)
+        if (axes is None) or (axes[1] not in ('node', 'element')) or \
+           (len(axes) > 2 and axes[2:] != ('component',)):
+            raise ValueError('%s results of %s cannot be exported!'
+                             % (method, variable.dataName))
+        self.name     = variable.dataName
+        self.variable = variable
+        if axes[1] == 'node':
+            self.center = 'Node'
+            meshIndex   = nodeIndex
+        else:
+            self.center = 'Cell'
+            meshIndex   = _MeshIndex(mesh.elements[:,0], mesh.instanceName)
+        self.size = len(meshIndex)
+
+        # open output database, and setup the problem
+        odb,mySet,timeline,plan = variable._openPlan(method, selection)
+        self._odb     = odb
+        self.timeline = timeline
+        self.frames   = None
+        try:
+            self.frames = variable._readFrames(odb, mySet, timeline, plan, [variable], bulk)
+
+            # position of each (node or element) of the set in the mesh
+            self._positions,self._found = meshIndex.find(plan['labels'],
+                                                         plan['attributes']['_instanceNames'])
+            if not self._found.any():
+                raise ValueError('the %s set %s is not in instance %s!'
+                                 % (self.name, variable.setName, mesh.instanceName))
+
+            # Abaqus orders tensor components as e.g. S11,S22,S33,S12,S13,S23
+            self._componentOrder = _tensor_order(plan['attributes'].get('_componentLabels'))
+        except:
+            # the ODB is closed (or left to its session) on any error
+            self.close()
+            raise
+        return
+
+    def meshArray(self, frameData):
+        """
+        returns the array of a frame over the mesh (NaN where the mesh
+        is not in the set). two components are padded to a (3D) vector,
+        and tensor components are put in the XDMF order.
+        """
+        data = frameData[self._found]
+        if self._componentOrder is not None:
+            data = data[:,self._componentOrder]
+        if data.ndim == 2 and data.shape[1] == 2:
+            data = numpy.hstack((data, numpy.zeros((len(data),1), dtype=data.dtype)))
+        array = numpy.empty((self.size,) + data.shape[1:], dtype=data.dtype)
+        array.fill(numpy.nan)
+        array[self._positions[self._found]] = data
+        return array
+
+    def attributeXml(self, array, dataItem):
+        """ returns the XML of the attribute of a frame array """
+        numcomp = 1
+        if array.ndim == 2:
+            numcomp = array.shape[1]
+        attributeType = XDMF_ATTRIBUTE_TYPES.get(numcomp, 'Matrix')
+        return ('<Attribute Name=%s AttributeType="%s" Center="%s">\n%s</Attribute>\n'
+                % (quoteattr(self.name), attributeType, self.center, dataItem))
+
+    def close(self):
+        """ closes the frame generator, and the ODB """
+        if self._odb is not None:
+            if self.frames is not None:
+                self.frames.close()
+            close_odb(self._odb, self.variable.session)
+            self._odb = None
+        return
+
+
+class _HDF5Writer(object):
+    """ writes the heavy data to an HDF5 file """
+
+    def __init__(self, fileName, compress=False):
+        if h5py is None:
+            raise ImportError('h5py is required to write HDF5 files! '
+                              '(or use format=\'binary\')')
+        self._fileName = fileName
+        self._compress = compress
+        self._h5File   = h5py.File(fileName, 'w')
+        return
+
+    def write(self, path, array):
+        """ writes array, and returns the XML of its DataItem """
+        if self._compress and array.size > 0:
+            self._h5File.create_dataset(path, data=array, compression='gzip')
+        else:
+            self._h5File.create_dataset(path, data=array)
+        return _data_item(array, 'Format="HDF"',
+                          os.path.basename(self._fileName) + ':/' + path)
+
+    def close(self):
+        self._h5File.close()
+        return
+
+
+class _BinaryWriter(object):
+    """ appends the heavy data to one raw (little-endian) binary file """
+
+    def __init__(self, fileName):
+        self._fileName = fileName
+        self._file     = open(fileName, 'wb')
+        return
+
+    def write(self, path, array):
+        """ writes array, and returns the XML of its DataItem """
+        seek = self._file.tell()
+        array.astype(array.dtype.newbyteorder('<')).tofile(self._file)
+        return _data_item(array, 'Format="Binary" Endian="Little" Seek="%i"' % seek,
+                          os.path.basename(self._fileName))
+
+    def close(self):
+        self._file.close()
+        return
+
+
+#
+# Private Functions
+#
+
+def _default_method(variable):
+    """ the default (exportable) fetch method of a variable """
+    method = variable._defaultFetch
+    if variable._resultAxes[method][1] not in ('node', 'element'):
+        method = 'fetchNodalAverage'
+    return method
+
+
+def _tensor_order(componentLabels):
+    """
+    returns the int array which puts the tensor components (e.g. S11,
+    S22, S33, S12, S13, S23) in the XDMF order, or None if the labels
+    are not the 6 (or 9) components of a 3D tensor
+    """
+    if componentLabels is None:
+        return None
+    target = XDMF_TENSOR_ORDERS.get(len(componentLabels))
+    if target is None:
+        return None
+    try:
+        # last two characters are the tensor indices (e.g. S12 or LE12)
+        indices = [(int(label[-2]), int(label[-1])) for label in componentLabels]
+    except (ValueError, IndexError):
+        return None
+    if len(componentLabels) == 6:
+        # symmetric, so S21 is the same as S12
+        indices = [(min(i,j), max(i,j)) for i,j in indices]
+    if sorted(indices) != sorted(target):
+        return None
+    return numpy.array([indices.index(ij) for ij in target], dtype=int)
+
+
+def _data_item(array, formatAttributes, location):
+    """ returns the XML of the DataItem of an array """
+    if array.dtype.kind == 'f':
+        numberType = 'Float'
+    else:
+        numberType = 'Int'
+    dimensions = ' '.join([str(n) for n in array.shape])
+    return ('<DataItem Dimensions="%s" NumberType="%s" Precision="%i" %s>%s'
+            '</DataItem>\n' % (dimensions, numberType, array.dtype.itemsize,
+                               formatAttributes, location))
+
+
+def _topology_xml(mesh, nodeIndex, writer):
+    """
+    writes the connectivity (as positions of the nodes in the geometry),
+    and returns the XML of the Topology
+    """
+    positions,found = nodeIndex.find(mesh.connectNodes)
+    if not found.all():
+        raise ValueError('the elements of instance %s have nodes which are not '
+                         'in the instance!' % mesh.instanceName)
+    positions = positions.astype(numpy.int32)
+    offsets   = mesh.connectOffsets
+    numele    = len(offsets) - 1
+    cells = [xdmf_cell(elemType, len(elemConnect[0]))
+             for elemType,elements,elemConnect in mesh.typeBlocks()]
+
+    if len(set(cells)) == 1:
+        # one cell type: a (nele,nnpe) array of the nodes
+        name = cells[0][0]
+        nnpe = offsets[1] - offsets[0]
+        dataItem = writer.write('mesh/topology', positions.reshape((numele, nnpe)))
+        nodesPerElement = ''
+        if name == 'Polyline':
+            nodesPerElement = ' NodesPerElement="%i"' % nnpe
+        return ('<Topology TopologyType="%s" NumberOfElements="%i"%s>\n%s</Topology>\n'
+                % (name, numele, nodesPerElement, dataItem))
+
+    #
+    # mixed cells: the nodes of each element are preceded by its cell
+    # number (and, for a Polyline, its number of nodes)
+    #
+    cellNumbers = numpy.array([number for name,number in cells], dtype=numpy.int32)
+    cellNumbers = cellNumbers[mesh.elemTypeCodes]
+    lengths = numpy.diff(offsets)
+    headers = numpy.where(cellNumbers == XDMF_LINE_CELLS[2][1], 2, 1)
+    starts  = numpy.zeros(numele, dtype=int)
+    numpy.cumsum((headers + lengths)[:-1], out=starts[1:])
+    mixed = numpy.zeros((headers + lengths).sum(), dtype=numpy.int32)
+    mixed[starts] = cellNumbers
+    mixed[starts[headers == 2] + 1] = lengths[headers == 2]
+    mixed[numpy.repeat(starts + headers - offsets[:-1], lengths) +
+          numpy.arange(len(positions))] = positions
+    dataItem = writer.write('mesh/topology', mixed)
+    return ('<Topology TopologyType="Mixed" NumberOfElements="%i">\n%s</Topology>\n'
+            % (numele, dataItem))
@@ -0,0 +1,297 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for the (array-backed) results of a fetch.
+
+Every fetch method of a field variable returns a FieldResult, which
+keeps the frame times and the labels as numpy arrays, and names the
+axes of the data (e.g. ('time', 'node', 'component') for a nodal
+variable, or ('time', 'intPt', 'element') for integration point data),
+so that the data of every fetch method can be selected the same way:
+
+    result = mises.fetchIntPtData()
+    late   = result.selectTime(start=1.0)          # frames with time >= 1.0
+    some   = result.selectLabels([10, 11, 12])     # elements 10-12
+    one    = disp.fetchNodalOutput().selectComponents('U2')
+
+Selections share the data of the original result (no copies are
+made) whenever the selected positions are a regular slice, e.g. a time
+range, a single label or component, or a range of labels (see
+selectLabelRange). Otherwise (e.g. labels in an arbitrary order), the
+selected data is copied. Labels are located with a binary search of
+the sorted labels (see LabelIndex), rather than a linear search.
+"""
+
+#
+# Import Modules
+#
+import numpy
+from odbLabelIndexClasses import *
+
+#
+# Classes
+#
+
+class FieldResult(object):
+    """
+    the results of a fetch, see the module doc string
+
+    Attributes:
+        name       = string name of the data (e.g. 'MISES')
+        time       = numpy float64 array of the total time of each frame
+        data       = numpy array of the data (resultData, or a view of it)
+        axes       = tuple of the name of each axis of data. the first
+                     axis is always 'time'
+        labelAxis  = name of the axis of the (node or element) labels
+        labels     = numpy int array of the labels along labelAxis
+        instances  = numpy string array of the instance of each label
+                     (or None, if unknown)
+        components = numpy string array of the component labels
+                     (or None, if there is no 'component' axis)
+
+    Methods:
+        axisLabels()
+        labelPositions()
+        select()
+        selectTime()
+        selectLabels()
+        selectLabelRange()
+        selectComponents()
+    """
+
+    __slots__ = ('_name', '_time', '_data', '_axes', '_axisLabels', '_labelAxis',
+                 '_instances', '_index')
+
+    def __init__(self, name, time, data, axes, axisLabels, labelAxis, instances=None):
+        """
+        create result. axisLabels is a dict of the labels of the axes
+        (other than 'time'), e.g. {'node' : nodeLabels, 'component' : ('U1','U2')}.
+        the data is not copied.
+        """
+        if len(axes) != numpy.ndim(data):
+            raise ValueError('there must be one axis name for every axis of data!')
+        if axes[0] != 'time':
+            raise ValueError('the first axis must be time!')
+        self._name       = name
+        self._time       = numpy.asarray(time, dtype=numpy.float64)
+        self._data       = data
+        self._axes       = tuple(axes)
+        self._axisLabels = dict([(axis, numpy.asarray(labels))
+                                 for axis,labels in axisLabels.items()])
+        self._labelAxis  = labelAxis
+        self._instances  = None
+        if instances is not None:
+            self._instances = numpy.asarray(instances, dtype=str)
+        # sorted label index, created when it is first needed
+        self._index = None
+        return
+
+    #
+    # Getters
+    #
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def time(self):
+        return self._time
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def axes(self):
+        return self._axes
+
+    @property
+    def labelAxis(self):
+        return self._labelAxis
+
+    @property
+    def labels(self):
+        return self._axisLabels[self._labelAxis]
+
+    @property
+    def instances(self):
+        return self._instances
+
+    @property
+    def components(self):
+        return self._axisLabels.get('component')
+
+    @property
+    def shape(self):
+        return self._data.shape
+
+    #
+    # Methods
+    #
+    def __len__(self):
+        """ number of frames """
+        return len(self._time)
+
+    def __repr__(self):
+        return '<FieldResult %s: axes %s, shape %s>' % (self.name, self.axes,
+                                                        self.shape)
+
+    def axisLabels(self, axis):
+        """ returns the labels of an axis (e.g. 'component') """
+        if axis == 'time':
+            return self._time
+        return self._axisLabels[axis]
+
+    def labelPositions(self, labels, instances=None):
+        """
+        returns numpy int array of the position of each (instance, label)
+        along labelAxis. instances may be omitted if the result only
+        contains one instance. raises KeyError if a label is not found.
+        """
+        if self._index is None:
+            self._index = _PositionIndex(self.labels, self._instances)
+        return self._index.positions(labels, instances)
+
+    def select(self, timeRange=None, labels=None, instances=None, components=None):
+        """
+        returns a FieldResult of the selected frames, labels, and/or
+        components (see selectTime, selectLabels, and selectComponents).
+        timeRange is a (start, end) tuple.
+        """
+        result = self
+        if timeRange is not None:
+            result = result.selectTime(*timeRange)
+        if labels is not None:
+            result = result.selectLabels(labels, instances)
+        if components is not None:
+            result = result.selectComponents(components)
+        return result
+
+    def selectTime(self, start=None, end=None):
+        """
+        returns a FieldResult of the frames with start <= time <= end
+        (either may be None, i.e. unbounded). always a view of the data.
+        """
+        first = 0
+        last  = len(self._time)
+        if start is not None:
+            first = numpy.searchsorted(self._time, start, side='left')
+        if end is not None:
+            last = numpy.searchsorted(self._time, end, side='right')
+        return self._take('time', slice(first, max(first, last)))
+
+    def selectLabels(self, labels, instances=None):
+        """
+        returns a FieldResult of the given (node or element) labels, in
+        the given order. instances is the instance name of each label
+        (may be omitted if the result only contains one instance).
+        """
+        return self._take(self._labelAxis, self.labelPositions(labels, instances))
+
+    def selectLabelRange(self, first, last, instance=None):
+        """
+        returns a FieldResult of the labels first <= label <= last (of
+        one instance, which may be omitted if there is only one).
+        a view of the data, if the labels are sorted (as they are for
+        every fetch over a set).
+        """
+        labels = self.labels
+        if instance is None:
+            if (self._instances is not None) and len(set(self._instances)) > 1:
+                raise ValueError('instance is required for a multi-instance result!')
+            inInstance = numpy.ones(len(labels), dtype=bool)
+        else:
+            inInstance = (self._instances == instance)
+        selected = numpy.nonzero(inInstance & (labels >= first) & (labels <= last))[0]
+        return self._take(self._labelAxis, selected)
+
+    def selectComponents(self, components):
+        """
+        returns a FieldResult of the given component label(s),
+        e.g. 'U2' or ('U1','U2'). the component axis is kept.
+        """
+        if self.components is None:
+            raise ValueError('%s does not have components!' % self.name)
+        if isinstance(components, str):
+            components = (components,)
+        names = self.components.tolist()
+        positions = []
+        for c in components:
+            if c not in names:
+                raise KeyError('component %s is not in the result!' % c)
+            positions.append(names.index(c))
+        return self._take('component', numpy.array(positions, dtype=int))
+
+    #
+    # Private Methods
+    #
+    def _take(self, axis, positions):
+        """
+        returns a FieldResult of the given positions (a slice, or an int
+        array) along axis. int arrays are converted to a slice when
+        they are regularly spaced, so that the data is a view.
+        """
+        if not isinstance(positions, slice):
+            positions = _as_slice(positions)
+
+        k = self._axes.index(axis)
+        index = [slice(None)]*len(self._axes)
+        index[k] = positions
+        data = self._data[tuple(index)]
+
+        time       = self._time
+        axisLabels = dict(self._axisLabels)
+        instances  = self._instances
+        if axis == 'time':
+            time = self._time[positions]
+        else:
+            axisLabels[axis] = self._axisLabels[axis][positions]
+            if (axis == self._labelAxis) and (instances is not None):
+                instances = instances[positions]
+        return FieldResult(self._name, time, data, self._axes, axisLabels,
+                           self._labelAxis, instances)
+
+
+class _PositionIndex(object):
+    """ maps (instance, label) to the position of a (unique) label array """
+
+    __slots__ = ('_index', '_order')
+
+    def __init__(self, labels, instances):
+        if instances is None:
+            instances = ''
+        self._index = LabelIndex(labels, instances)
+        if len(self._index) != len(labels):
+            raise ValueError('the labels of the result are not unique!')
+        # sorted position --> position in labels
+        self._order = numpy.zeros(len(labels), dtype=int)
+        self._order[self._index.index(labels, instances)] = numpy.arange(len(labels))
+        return
+
+    def positions(self, labels, instances=None):
+        return self._order[self._index.index(labels, instances)]
+
+
+#
+# Private Functions
+#
+
+def _as_slice(positions):
+    """
+    returns a slice equivalent to an int array of positions, if they
+    are regularly spaced (and increasing), otherwise the array itself.
+    """
+    positions = numpy.asarray(positions, dtype=int)
+    if len(positions) == 0:
+        return slice(0, 0)
+    if len(positions) == 1:
+        return slice(positions[0], positions[0] + 1)
+    step = positions[1] - positions[0]
+    if step > 0 and numpy.all(numpy.diff(positions) == step):
+        return slice(positions[0], positions[-1] + 1, step)
+    return positions
@@ -14,6 +14,7 @@ Contained in this file:
     * IntPtVariable class: represents an integration point variable (e.g. Mises, PEEQ, etc.)
     * NodalVariable class: represents a nodal variable (e.g. U, COORD, etc.)
     * ElementVariable class: represents an element variable (e.g. EVOL)
+    * fetch_intpt_variables(): fetches several IntPtVariables at once
 """
 
 #
@@ -21,8 +22,23 @@ Contained in this file:
 #
 from odbAccess import *
 from abaqusConstants import *
-import numpy, sys, re, os
+import numpy, sys, re, os, StringIO, tempfile
 from myFileOperations import *
+from odbBulkDataOperations import *
+from odbFieldResultClasses import *
+from odbLabelIndexClasses import *
+from odbQuantityRegistry import *
+from odbResultCacheClasses import *
+from odbResultFileOperations import *
+from odbSessionClasses import *
+from odbTimelineClasses import *
+
+#
+# Constants
+#
+
+# number of values read at once by the reductions (see NodalVariable.reduceNodes)
+REDUCTION_BLOCK_SIZE = 10000000
 
 #
 # Classes
@@ -30,23 +46,60 @@ from myFileOperations import *
 
 class fieldVariable(object):
     """ a base class for field variables; other classes inherit this class. """
+    
+    # attributes which define the variable (all others are results)
+    _definitionAttributes = ('_odbPath', '_dataName', '_setName',
+                             '_session', '_storageDir', '_cache', '_float32')
+    
+    # attributes which are derived from the results (and are not stored)
+    _derivedAttributes = ('_fieldResult',)
+    
+    # names of the axes of resultData, for each fetch method (see result)
+    _resultAxes = {}
+    
     #
     # Attributes (object initialization)
     #
-    def __init__(self, odbPath, dataName, setName):
+    def __init__(self, odbPath, dataName, setName, session=None, storageDir=None,
+                 cache=None, float32=False):
         """ return object with the desired attributes """
         # these attributes have properties (below) to protect the 
         # object from becoming unstable or broken
         self._odbPath  = odbPath
         self._dataName = dataName.upper() # must be upper-case
         self._setName  = setName.upper()  # must be upper-case
+        
+        # (optional) OdbSession which shares an open ODB
+        self.session = session
+        
+        # (optional) directory for out-of-core (memory-mapped) resultData
+        self.storageDir = storageDir
+        
+        # (optional) ResultCache of previously fetched results
+        self.cache = cache
+        
+        # (optional) store resultData as float32 if the ODB is single precision
+        self.float32 = float32
 
         # these are set by methods
         self._totalTime     = None
         self._nodeLabels    = None
         self._elementLabels = None
         self._intPtLabels   = None
+        self._instanceNames = None
         self._resultData    = None
+        self._statisticData = None
+        
+        # name of the last executed fetch method
+        self._methodFlag    = None
+        
+        # (stepName, frameIndex) of the last fetched frame, and the frame
+        # selection and options of the fetch (used by incremental fetches)
+        self._lastFrame     = None
+        self._fetchKey      = None
+        
+        # FieldResult of the resultData (see result)
+        self._fieldResult   = None
         return
     
     #
@@ -67,10 +120,61 @@ class fieldVariable(object):
     @property
     def intPtLabels(self):
         return self._intPtLabels
+    
+    @property
+    def instanceNames(self):
+        """
+        tuple of the instance name of each node (or element) label,
+        i.e. instanceNames[k] is the instance of nodeLabels[k]
+        """
+        return self._instanceNames
         
     @property
     def resultData(self):
         return self._resultData
+    
+    @property
+    def statisticData(self):
+        """ dict of additional statistics (e.g. 'max'), if requested """
+        return self._statisticData
+    
+    @property
+    def result(self):
+        """
+        FieldResult of the last fetch, which holds the times and labels
+        as numpy arrays, and shares (does not copy) resultData. None if
+        nothing has been fetched. the FieldResult is built once for each
+        fetch (i.e. for each resultData), and the same object is returned
+        until the results change, see odbFieldResultClasses.
+        """
+        if self._resultData is None:
+            return None
+        if (self._fieldResult is not None) and (self._fieldResult.data is self._resultData):
+            return self._fieldResult
+        axes = self._resultAxes[self._methodFlag]
+        axisLabels = {}
+        for k,axis in enumerate(axes[1:]):
+            axisLabels[axis] = self._axisLabels(axis, self._resultData.shape[k+1])
+        labelAxis = [axis for axis in axes if axis in ('node','element')][0]
+        self._fieldResult = FieldResult(self.dataName, self.totalTime, self._resultData,
+                                        axes, axisLabels, labelAxis, self.instanceNames)
+        return self._fieldResult
+    
+    @property
+    def abqAttrib(self):
+        """ 
+        name of the FieldValue attribute where the data is stored.
+        subclasses which store data elsewhere (e.g. mises) override this.
+        """
+        return 'data'
+    
+    @property
+    def quantity(self):
+        """
+        FieldQuantity which derives the data from abqAttrib (see
+        odbQuantityRegistry), or None if the data is used as-is.
+        """
+        return None
 
     #
     # Getters and Setters to protect Object
@@ -88,6 +192,53 @@ class fieldVariable(object):
         self.reset()
         return
 
+    @property
+    def session(self):
+        return self._session
+    
+    @session.setter
+    def session(self, session):
+        if (session is not None) and (not isinstance(session, OdbSession)):
+            raise TypeError('session must be an OdbSession (or None)!')
+        self._session = session
+        return
+
+    @property
+    def storageDir(self):
+        return self._storageDir
+    
+    @storageDir.setter
+    def storageDir(self, s):
+        if (s is not None) and (not isinstance(s,str)):
+            raise TypeError('storageDir must be a string (or None)!')
+        self._storageDir = s
+        return
+
+    @property
+    def cache(self):
+        return self._cache
+    
+    @cache.setter
+    def cache(self, cache):
+        if (cache is not None) and (not isinstance(cache, ResultCache)):
+            raise TypeError('cache must be a ResultCache (or None)!')
+        self._cache = cache
+        return
+
+    @property
+    def float32(self):
+        """
+        if True, resultData is stored as float32 (half the memory) when
+        the field output is single precision. double precision output
+        is always stored as float64, so that no precision is lost.
+        """
+        return self._float32
+    
+    @float32.setter
+    def float32(self, b):
+        self._float32 = bool(b)
+        return
+
     @property
     def odbName(self):
         """ returns odb file name (with file extensions) """
@@ -129,7 +280,12 @@ class fieldVariable(object):
         self._nodeLabels    = None
         self._elementLabels = None
         self._intPtLabels   = None
+        self._instanceNames = None
         self._resultData    = None
+        self._statisticData = None
+        self._lastFrame     = None
+        self._fetchKey      = None
+        self._fieldResult   = None
         return
     
     def _open_odb_check_keys(self,setType):
@@ -142,12 +298,25 @@ class fieldVariable(object):
         
         returns [odb, mySet]
         """
+        
+        #with the sidecar metadata of the session, the set and keyName
+        #are checked before the output database is opened
+        metadata = self._metadata()
+        if metadata is not None:
+            if setType.upper() in ('NODE','ELEMENT') and \
+               not metadata.hasSet(setType, self.setName):
+                msg = 'Assembly level %s set named %s does' \
+                      'not exist in the output database %s !' \
+                        % (setType, self.setName, self.odbPath)
+                raise KeyError(msg)
+            if not metadata.hasField(self.keyName):
+                print '\n\n%s output request is not defined for ' \
+                      'all (or any?) steps!\n\n' % (self.keyName)
+                raise Exception
     
         #open the output database in read-only mode
-        if self.odbPath.endswith('.odb'):
-            odb = openOdb(self.odbPath, readOnly=True)
-        else:
-            odb = openOdb(self.odbPath + '.odb', readOnly=True)
+        #(or use the ODB of the session, if there is one)
+        odb = open_odb(self.odbPath, self.session)
 
         
         #
@@ -155,16 +324,19 @@ class fieldVariable(object):
         #
         try:
             #open the node or element set
-            if setType.upper() == 'NODE':
-                mySet = odb.rootAssembly.nodeSets[self.setName]
-            elif setType.upper() == 'ELEMENT':
-                mySet = odb.rootAssembly.elementSets[self.setName]
-            else:
+            if setType.upper() not in ('NODE','ELEMENT'):
                 print "\n\n!! unknown setType defined !!\n\n"
                 raise Exception
+            elif self.session is not None and self.session.ownsOdb(odb):
+                #the session caches the set lookup
+                mySet = self.session.getSet(setType, self.setName)
+            elif setType.upper() == 'NODE':
+                mySet = odb.rootAssembly.nodeSets[self.setName]
+            else:
+                mySet = odb.rootAssembly.elementSets[self.setName]
         except KeyError:
             # close odb file
-            odb.close()
+            close_odb(odb, self.session)
             # alert user the requested set does not exist...
             msg = 'Assembly level %s set named %s does' \
                   'not exist in the output database %s !' \
@@ -174,36 +346,603 @@ class fieldVariable(object):
         #
         # check if keyName is a requested output
         #
+        if metadata is not None:
+            # already checked
+            return [odb, mySet]
         testStep = odb.steps.keys()[-1]
         if odb.steps[testStep].frames[-1].fieldOutputs.has_key(self.keyName) == 0:
             print '\n\n%s output request is not defined for ' \
                   'all (or any?) steps!\n\n' % (self.keyName)
-            odb.close()
+            close_odb(odb, self.session)
             raise Exception
         
         return [odb, mySet]
     
+    def _metadata(self):
+        """
+        returns the OdbMetadata of the session (see OdbSession.useMetadata),
+        or None if there is no session, or it does not use metadata
+        """
+        if self.session is None or not self.session.isSessionFile(self.odbPath):
+            return None
+        return self.session.metadata
+    
+    def _labelIndex(self, mySet, setType):
+        """
+        returns the LabelIndex of the (instance, label) of every node
+        (setType 'NODE') or element (setType 'ELEMENT') in mySet,
+        over all of the instances of the set
+        """
+        if setType.upper() == 'NODE':
+            return LabelIndex.fromSetMembers(mySet.nodes)
+        return LabelIndex.fromSetMembers(mySet.elements)
+    
+    def _timeline(self, odb, selection=None):
+        """
+        given an odb, return the FrameTimeline of its unique
+        frames (redundant frames between steps are excluded).
+        all fetch methods iterate over this timeline.
+        
+        selection is an optional FrameSelection. If given, only
+        the selected frames are in the returned timeline.
+        
+        the full timeline is cached by the session, if there is one.
+        """
+        if self.session is not None and self.session.ownsOdb(odb):
+            timeline = self.session.timeline()
+        else:
+            timeline = FrameTimeline.fromOdb(odb)
+        
+        if selection is not None:
+            timeline = selection.apply(timeline)
+        return timeline
+    
+    def _timelineAfter(self, odb, selection, lastFrame):
+        """
+        given an odb, return the FrameTimeline of the selected frames
+        which come after lastFrame, a (stepName, frameIndex) of a
+        previously fetched frame. the timeline is empty if there are no
+        new frames. the selection is applied to the full timeline, so
+        that (e.g.) a stride continues from the previous fetch.
+        
+        returns None if lastFrame is not a frame of the odb
+        """
+        if self.session is not None and self.session.ownsOdb(odb):
+            # the session timeline was built when the ODB was first read,
+            # and frames may have been written since
+            self.session.refresh()
+        timeline = self._timeline(odb)
+        stepName,frameIndex = lastFrame
+        last = [i for i in range(len(timeline)-1,-1,-1)
+                if timeline.stepNames[i] == stepName and
+                   timeline.frameIndices[i] == frameIndex]
+        if len(last) == 0:
+            return None
+        
+        indices = numpy.arange(len(timeline))
+        if selection is not None:
+            indices = selection.indices(timeline)
+        return timeline.subset(indices[indices > last[0]])
+    
+    def _noFramesMessage(self, selection=None):
+        """
+        returns the error message for a fetch of set setName without any
+        frames, which names the FrameSelection (if any)
+        """
+        if selection is None:
+            selection = FrameSelection()
+        return ('there are no frames to fetch for set %s of %s (selection: %s)!'
+                % (self.setName, self.odbName, selection))
+    
     def _numframes(self, odb):
         """
-        given an odb, loop through STEPs, obtaining
-        the total number of FRAMEs in the analysis.
+        given an odb, return the total number of FRAMEs in the analysis.
         
         does not include redundant frames.
         useful for preallocating numpy arrays.
         """
-
-        totalTime = []
-        #loop steps and frames
-        for step in odb.steps.values():
-            for frame in step.frames:
-                time = step.totalTime + frame.frameValue
-                if time not in totalTime:
-                    totalTime.append(time)
+        return len(self._timeline(odb))
+    
+    def _resultDtype(self, precision):
+        """
+        returns the numpy dtype of resultData, given the precision of
+        the field output ('single', 'double', or None if unknown)
+        """
+        if self.float32 and precision == 'single':
+            return numpy.float32
+        return numpy.float64
+    
+    def _allocateResult(self, shape, method, dtype=numpy.float64):
+        """
+        returns a zero-filled numpy array (float64, by default) for resultData.
+        
+        If storageDir is defined, the array is instead a memory-mapped
+        .npy file in storageDir (named after the ODB, set, dataName, and
+        fetch method), so that frames are written to disk as they are
+        read, and memory use does not depend on the number of frames.
+        The file can be reloaded later with numpy.load(fileName, mmap_mode='r')
+        
+        Every array is a new file (with a unique suffix), so that an
+        existing file is never truncated while it is still mapped, e.g.
+        by the previous resultData of this (or another) variable, which
+        stays valid until the new results are set. Files of previous
+        fetches are not deleted.
+        """
+        if self.storageDir is None:
+            return numpy.zeros(shape, dtype=dtype)
+        
+        if not os.path.isdir(self.storageDir):
+            os.makedirs(self.storageDir)
+        
+        odbName = os.path.splitext(os.path.basename(self.odbName))[0]
+        prefix  = safe_filename(odbName + '_' + self.setName + '_' + 
+                                self.dataName + '_' + method + '_')
+        fd,fileName = tempfile.mkstemp(suffix='.npy', prefix=prefix, dir=self.storageDir)
+        os.close(fd)
+        return numpy.lib.format.open_memmap(fileName, mode='w+', dtype=dtype,
+                                            shape=shape)
+    
+    def _axisLabels(self, axis, size):
+        """ returns the labels of an axis of resultData (see result) """
+        if axis == 'node':
+            return self.nodeLabels
+        elif axis == 'element':
+            return self.elementLabels
+        elif axis == 'intPt':
+            return self.intPtLabels
+        elif axis == 'component':
+            return self.componentLabels
+        # e.g. the (local) node number of each element node
+        return numpy.arange(1, size+1)
+    
+    def _queryKey(self, selection=None, options=None):
+        """
+        returns a string which identifies the frame selection and
+        options of a fetch. an incremental fetch only appends to the
+        results of a fetch with the same query.
+        """
+        if selection is not None:
+            selection = selection.key
+        if options:
+            options = tuple(sorted(options.items()))
+        return repr((selection, options))
+    
+    def _cacheKey(self, method, selection=None, options=None):
+        """ returns the ResultCache key of a fetch method (None if no cache) """
+        if self.cache is None:
+            return None
+        if selection is not None:
+            selection = selection.key
+        if self.float32:
+            # float32 results are kept apart from the float64 results
+            method += ':float32'
+        return self.cache.key(self.odbPath, self.__class__.__name__, self.dataName,
+                              self.setName, method, selection, options)
+    
+    def _loadCache(self, key):
+        """
+        sets the results from the cache. returns True if key was
+        in the cache, otherwise False (and nothing is set).
+        """
+        if key is None:
+            return False
+        attributes = self.cache.load(key)
+        if attributes is None:
+            return False
+        self._setResults(attributes)
+        return True
+    
+    def _storeCache(self, key):
+        """ stores the results in the cache """
+        if key is None:
+            return
+        self.cache.store(key, self._results())
+        return
+    
+    def _results(self):
+        """ returns dict of the (private) result attributes """
+        return dict([(name, value) for name,value in self.__dict__.items()
+                     if name not in self._definitionAttributes + self._derivedAttributes])
+    
+    def _setResults(self, attributes):
+        """ sets a dict of (private) result attributes, see _results() """
+        for name,value in attributes.items():
+            setattr(self, name, value)
+        if self.storageDir is not None and self._resultData is not None:
+            # keep resultData out-of-core, as requested
+            resultData = self._allocateResult(attributes['_resultData'].shape,
+                                              self._methodFlag,
+                                              attributes['_resultData'].dtype)
+            resultData[:] = attributes['_resultData']
+            resultData.flush()
+            self._resultData = resultData
+        return
+    
+    def _planners(self):
+        """
+        returns a dict of the fetch methods of this class, as
+            {method name : (setType, planFunction)}
+        where planFunction(odb, mySet, timeline, **options) returns the
+        plan dict of the fetch method (see _fetchGroup). defined by subclasses.
+        """
+        raise NotImplementedError('fetch methods are defined by subclasses')
+    
+    def _openPlan(self, method, selection=None, options=None, lastFrame=None):
+        """
+        opens the output database and sets up a fetch method.
+        options is an optional dict of keyword inputs of the planFunction.
+        the caller must close the ODB with close_odb().
+        
+        lastFrame is an optional (stepName, frameIndex). If given, only
+        the selected frames after lastFrame are in the timeline (see
+        _timelineAfter). If there are none (or lastFrame is not in the
+        ODB), the returned timeline is empty (or None) and plan is None.
+        
+        returns [odb, mySet, timeline, plan]
+        """
+        setType,planner = self._planners()[method]
+        
+        # open output database and obtain mySet
+        odb,mySet = self._open_odb_check_keys(setType)
+        
+        # obtain the unique (selected) frames
+        if lastFrame is None:
+            timeline = self._timeline(odb, selection)
+            if len(timeline) == 0:
+                close_odb(odb, self.session)
+                raise ValueError(self._noFramesMessage(selection))
+        else:
+            try:
+                timeline = self._timelineAfter(odb, selection, lastFrame)
+            except:
+                close_odb(odb, self.session)
+                raise
+            if (timeline is None) or (len(timeline) == 0):
+                return [odb, mySet, timeline, None]
+        
+        # setup the problem
+        try:
+            plan = planner(odb, mySet, timeline, **(options or {}))
+        except:
+            close_odb(odb, self.session)
+            raise
+        return [odb, mySet, timeline, plan]
+    
+    def _readFrames(self, odb, mySet, timeline, plan, variables, bulk=True):
+        """
+        generator which reads the frames of the timeline one at a time.
+        yields (f, frameTime, frameData) for each frame, where frameData
+        is a list of the frame arrays, one for each of the variables.
+        """
+        # the attribute of each variable is read (once) from each frame,
+        # and derived quantities are then calculated from its components
+        abqAttribs = [v.abqAttrib for v in variables]
+        quantities = [v.quantity for v in variables]
+        derived    = any([(q is not None) and (q.function is not None) for q in quantities])
+        
+        # the precision of the field output (and of the weights) is only
+        # detected once, from the first frame with values
+        plan['precision'] = None
+        weightPrecision   = None
+        
+        for f,(stepName,frameIndex,frameTime) in enumerate(timeline):
+            frame = odb.steps[stepName].frames[frameIndex]
+            
+            # obtain a subset of the field output (based on mySet)
+            # this subset will only contain keyName data
+            if plan['position'] is None:
+                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
+                    region=mySet)
+            else:
+                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
+                    position=plan['position'],region=mySet)
+            
+            # obtain all the data for this frame, as arrays
+            if plan['precision'] is None:
+                plan['precision'] = field_precision(myFieldOutput, bulk)
+            labels,data = read_field_values(myFieldOutput, abqAttribs,
+                                            plan['labelNames'], bulk, plan['precision'])
+            if derived:
+                componentLabels = myFieldOutput.componentLabels
+                data = [d if q is None else q.evaluate(d, componentLabels)
+                        for q,d in zip(quantities, data)]
+            
+            if plan.get('weightKey') is None:
+                yield f, frameTime, [plan['frameArray'](labels, d) for d in data]
+                continue
+            
+            # weights of each value (e.g. IVOL), from the same frame
+            weightOutput = frame.fieldOutputs[plan['weightKey']].getSubset(
+                position=plan['position'],region=mySet)
+            if weightPrecision is None:
+                weightPrecision = field_precision(weightOutput, bulk)
+            weightLabels,weights = read_field_values(weightOutput, 'data',
+                                                     plan['labelNames'], bulk,
+                                                     weightPrecision)
+            weights = align_values(labels, weightLabels, weights)
+            yield f, frameTime, [plan['frameArray'](labels, d, weights) for d in data]
+    
+    def _collectFrames(self, odb, mySet, timeline, plan, variables, method, bulk=True,
+                       outOfCore=True, selection=None):
+        """
+        reads the frames of the timeline for a group of variables (see
+        _fetchGroup). If outOfCore, the arrays are allocated with
+        _allocateResult, otherwise they are in memory.
+        
+        selection is the optional FrameSelection of the timeline, which
+        is named in the error raised if the timeline is empty.
+        
+        returns [resultData, statisticData], lists with the resultData
+        array and the dict of statistic arrays of each variable
+        """
+        numframes  = len(timeline)
+        if numframes == 0:
+            raise ValueError(self._noFramesMessage(selection))
+        statistics = plan.get('statistics', ())
+        shape = (numframes,) + plan['frameShape']
+        
+        #
+        # iterate through the frames of the timeline, saving the info as applicable
+        # (the data of every variable is read together)
+        #
+        resultData = None
+        for f,frameTime,frameData in self._readFrames(odb, mySet, timeline, plan,
+                                                      variables, bulk):
+            if resultData is None:
+                # initialize (in memory, or memory-mapped if storageDir is
+                # defined), once the precision of the output is known
+                dtypes = [v._resultDtype(plan['precision']) for v in variables]
+                if outOfCore:
+                    resultData = [v._allocateResult(shape, method, dtype)
+                                  for v,dtype in zip(variables, dtypes)]
+                    statisticData = [dict([(name, v._allocateResult(shape, method + '_' + name,
+                                                                     dtype))
+                                           for name in statistics])
+                                     for v,dtype in zip(variables, dtypes)]
+                else:
+                    resultData = [numpy.zeros(shape, dtype=dtype) for dtype in dtypes]
+                    statisticData = [dict([(name, numpy.zeros(shape, dtype=dtype))
+                                           for name in statistics]) for dtype in dtypes]
+            
+            # save frame values to resultData
+            for i in range(0,len(variables)):
+                if statistics:
+                    frameData[i],frameStatistics = frameData[i]
+                    for name in statistics:
+                        statisticData[i][name][f] = frameStatistics[name]
+                resultData[i][f] = frameData[i]
+        
+        # write memory-mapped results to disk
+        for r in resultData + [d for sd in statisticData for d in sd.values()]:
+            if isinstance(r, numpy.memmap):
+                r.flush()
+        return [resultData, statisticData]
+    
+    def _fetchGroup(self, method, variables, bulk=True, selection=None, options=None,
+                    incremental=False):
+        """
+        fetches the field output for a group of variables (of the same class)
+        which share the same odbPath, setName, and keyName (e.g. MISES, PRESS,
+        and INV3 are all obtained from 'S'). Each frame of the field output is
+        read from the ODB only once, and the results are set on every variable.
+        
+        method is the name of the fetch method (e.g. 'fetchNodalAverage').
+        selection is an optional FrameSelection of the frames to fetch.
+        options is an optional dict of keyword inputs of the planFunction.
+        If incremental is True, and the variables already hold the results
+        of the same fetch, only the frames after the last fetched frame are
+        read and appended (see _appendGroup).
+        
+        The fetch method is defined by a "plan" dict, which contains:
+            position   = Abaqus output position (e.g. INTEGRATION_POINT),
+                         or None for the default position of the output
+            labelNames = FieldValue labels required to arrange the data
+            frameShape = shape of the resultData for a single frame
+            frameArray = function(labels, data) which returns the array
+                         of a single frame
+            labels     = labels of the last axis of the frame array
+                         (e.g. the sorted node labels)
+            attributes = dict of attributes to set (e.g. '_nodeLabels')
+        and optionally:
+            weightKey  = keyName of a field output (e.g. 'IVOL') read at
+                         the same position, which is passed to frameArray
+                         as a third input (the weight of each value)
+            statistics = tuple of the names of additional statistics. If
+                         defined, frameArray returns (frameData, dict of
+                         {name : statistic array}), and the statistics
+                         are set as statisticData
+        """
+        for v in variables:
+            if (v.keyName != self.keyName) or (v.setName != self.setName):
+                raise ValueError('variables must share the same keyName and setName!')
         
-        return len(totalTime)
+        cacheKeys = [v._cacheKey(method, selection, options) for v in variables]
+        
+        # append the new frames to the previous results, if possible
+        if incremental and self._appendGroup(method, variables, bulk, selection,
+                                             options, cacheKeys):
+            return
+        
+        # results in the cache are loaded without opening the ODB
+        if all([v._loadCache(k) for v,k in zip(variables, cacheKeys)]):
+            return
+        
+        # open output database, and setup the problem
+        odb,mySet,timeline,plan = self._openPlan(method, selection, options)
+        try:
+            resultData,statisticData = self._collectFrames(odb, mySet, timeline, plan,
+                                                           variables, method, bulk,
+                                                           selection=selection)
+        finally:
+            # all data from the frames has been collected (or an error occurred)
+            # close output database
+            close_odb(odb, self.session)
+        
+        # set the proper attributes
+        for i,v in enumerate(variables):
+            v._totalTime  = tuple(timeline.totalTime)
+            v._resultData = resultData[i]
+            v._statisticData = statisticData[i] or None
+            for name,value in plan['attributes'].items():
+                setattr(v, name, value)
+            
+            # flag that this method has been executed
+            v._methodFlag = method
+            v._lastFrame  = (timeline.stepNames[-1], int(timeline.frameIndices[-1]))
+            v._fetchKey   = v._queryKey(selection, options)
+            v._storeCache(cacheKeys[i])
+        return
+    
+    def _appendGroup(self, method, variables, bulk=True, selection=None, options=None,
+                     cacheKeys=None):
+        """
+        incremental fetch of a group of variables (see _fetchGroup). If
+        every variable holds the results of the same fetch (method, frame
+        selection, and options), only the frames written to the ODB after
+        the last fetched frame are read, and they are appended to the
+        results. The frames which were already fetched are not read again,
+        so the cost only depends on the number of new frames.
+        
+        returns True if the results are up to date, or False if they could
+        not be appended to (e.g. a different fetch, or a re-run ODB which
+        does not contain the last fetched frame), and a full fetch is needed.
+        """
+        queryKey = self._queryKey(selection, options)
+        for v in variables:
+            if (v._methodFlag != method) or (v._fetchKey != queryKey) or \
+               (v._lastFrame is None) or (v._lastFrame != variables[0]._lastFrame):
+                return False
+        
+        # open output database, and setup the problem for the new frames
+        odb,mySet,timeline,plan = self._openPlan(method, selection, options,
+                                                 variables[0]._lastFrame)
+        try:
+            if timeline is None:
+                # the last fetched frame is no longer in the ODB
+                return False
+            if len(timeline) == 0:
+                # no new frames
+                return True
+            for v in variables:
+                if v.resultData.shape[1:] != plan['frameShape']:
+                    # e.g. the set has changed
+                    return False
+            
+            resultData,statisticData = self._collectFrames(odb, mySet, timeline, plan,
+                                                           variables, method, bulk,
+                                                           outOfCore=False,
+                                                           selection=selection)
+        finally:
+            close_odb(odb, self.session)
+        
+        # append the new frames
+        for i,v in enumerate(variables):
+            v._totalTime  = v.totalTime + tuple(timeline.totalTime)
+            v._resultData = _append_frames(v._resultData, resultData[i])
+            if v._statisticData is not None:
+                v._statisticData = dict([(name, _append_frames(v._statisticData[name],
+                                                               statisticData[i][name]))
+                                         for name in v._statisticData])
+            v._lastFrame = (timeline.stepNames[-1], int(timeline.frameIndices[-1]))
+            if cacheKeys is not None:
+                v._storeCache(cacheKeys[i])
+        return True
+    
+    def iterFrames(self, method=None, bulk=True, steps=None, timeRange=None,
+                   stride=1, frames=None):
+        """
+        generator which fetches the field output one frame at a time,
+        instead of preallocating (and filling) resultData for all frames.
+        Only one frame is held in memory at a time, so this can be used to
+        reduce (or write, or plot) results that would not fit in memory.
+        
+        method is the name of the fetch method which defines the frame
+        arrays (e.g. 'fetchNodalAverage'). Default is the main fetch method
+        of the class. bulk, steps, timeRange, stride, and frames are the
+        same optional inputs as the fetch methods.
+        
+        yields (totalTime, labels, frameData) for each frame, where:
+            totalTime = the frame time
+            labels    = numpy int array of the (node or element) labels
+                        of the last axis of frameData
+            frameData = numpy float64 array of the frame, which is exactly
+                        resultData[i] of the corresponding fetch method.
+        
+        the object attributes are not modified.
+        """
+        if method is None:
+            method = self._defaultFetch
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        
+        # open output database, and setup the problem
+        odb,mySet,timeline,plan = self._openPlan(method, selection)
+        
+        # the ODB is closed when the generator is exhausted (or discarded)
+        try:
+            for f,frameTime,frameData in self._readFrames(odb, mySet, timeline, plan,
+                                                          [self], bulk):
+                yield frameTime, plan['labels'], frameData[0]
+        finally:
+            close_odb(odb, self.session)
+        return
+    
+    def save(self, fileName=None, format='npz', compress=False, verbose=True):
+        """
+        saves the results (totalTime, labels, componentLabels, resultData,
+        etc.) to one binary file, which can be loaded with load() without
+        the ODB. The arrays are written as a whole, and each one is stored
+        under its attribute name (see odbResultFileOperations).
+        
+        fileName is optional. Default is named after the ODB, set, and
+        dataName (like saveCSV). format is 'npz' (default) or 'hdf5'
+        (requires h5py). If compress is True, the arrays are compressed.
+        
+        returns the name of the saved file
+        """
+        if self.resultData is None:
+            raise Exception('there are no results to save! (fetch them first)')
+        
+        if fileName is None:
+            odbName  = os.path.splitext(self.odbName)[0]
+            fileName = safe_filename(odbName + '_' + self.setName + '_' + self.dataName)
+        
+        # results are saved without the leading underscore, and along
+        # with the definition of the variable
+        attributes = dict([(name.lstrip('_'), value)
+                           for name,value in self._results().items()])
+        attributes['className'] = self.__class__.__name__
+        attributes['odbPath']   = self.odbPath
+        attributes['dataName']  = self.dataName
+        attributes['setName']   = self.setName
+        attributes['float32']   = self.float32
+        return save_results(fileName, attributes, format, compress, verbose)
+    
+    @classmethod
+    def load(cls, fileName, session=None, storageDir=None, cache=None):
+        """
+        returns the variable saved (by save()) in fileName, with all of
+        its results. The ODB is not opened. The object can be used as if
+        it had been fetched, e.g. a fetch with incremental=True continues
+        from the last saved frame.
+        
+        session, storageDir, and cache are the optional inputs of the class.
+        may be called from the specific class, or from fieldVariable.
+        """
+        attributes = load_results(fileName)
+        varClass = globals().get(attributes.pop('className'))
+        if (varClass is None) or (not issubclass(varClass, cls)):
+            raise TypeError('%s does not contain a %s!' % (fileName, cls.__name__))
+        
+        variable = varClass(attributes.pop('odbPath'), attributes.pop('dataName'),
+                            attributes.pop('setName'), session=session,
+                            storageDir=storageDir, cache=cache,
+                            float32=attributes.pop('float32', False))
+        variable._setResults(dict([('_' + name, value)
+                                   for name,value in attributes.items()]))
+        return variable
     
     def _saveOdbFieldDataCSV(self, dataTitle=None, dataSet=None, 
-                            verbose=True, customFileName=None):
+                            verbose=True, customFileName=None, compress=False):
         """
         saves an ODB data array to a CSV file
         dependencies: re, sys, os, numpy
@@ -223,6 +962,9 @@ class fieldVariable(object):
         verbose is an optional input (default true) which defines where there will be
         a "verbose" output to the command window or not. If True, it will tell you
         when files are saved or replaced.
+        
+        compress is an optional input (default False). If True, the file
+        is gzip compressed (and '.gz' is appended to the file name).
         """
         #assign dataTitle and dataSet if not defined
         if dataTitle is None:
@@ -251,6 +993,12 @@ class fieldVariable(object):
         else:
             raise Exception("Labels are undefined!")
         
+        #labels are only unique within an instance, so
+        #prepend the instance name if there are several
+        if self.instanceNames is not None and len(set(self.instanceNames)) > 1:
+            labels = ['%s.%i' % (inst, label) for inst,label
+                      in zip(self.instanceNames, labels)]
+        
 
         #assign file name to save
         if customFileName is None:
@@ -267,40 +1015,19 @@ class fieldVariable(object):
         #ensure filename is safe to write
         saveFileName = safe_filename(saveFileName)
 
-        #delete any pre-existing file
-        check_delete(saveFileName, verbose)
-
-        #open file with write permissions
-        saveFile = open(saveFileName,'w')
+        #delete any pre-existing file, and open with write permissions
+        saveFile = open_csv(saveFileName, compress, verbose)
 
         #write labels line and empty line
         #line1 set already (see above)
-        line2 = '"frame (below):"'
-        for label in labels:
-            line1 += ', ' + str(label)
-            line2 += ', ' + '""'
-        line1 += '\n'
-        line2 += '\n'
+        line1 += ''.join([', ' + str(label) for label in labels]) + '\n'
+        line2  = '"frame (below):"' + ', ""'*len(labels) + '\n'
         saveFile.write(line1)
         saveFile.write(line2)
 
-        #begin writing dataSet, prepend lines with totalTime:
-        for i in range(0,len(self.totalTime)):
-            #for all frames
-            line = str(self.totalTime[i])
-
-            for k in range(0,len(labels)):
-                #for all labels (node or element)
-                
-                #need try/except for if there is only 1 label (vector array)
-                try:
-                    line += ', ' + str(dataSet[i,k])
-                except IndexError:
-                    line += ', ' + str(dataSet[i])
-            line += '\n'
-
-            #write line for this frame
-            saveFile.write(line)
+        #write dataSet in blocks, prepend lines with totalTime
+        #(a vector dataSet is written as a single column)
+        write_csv_rows(saveFile, dataSet, self.totalTime)
 
         #end program
         saveFile.close()
@@ -313,14 +1040,30 @@ class IntPtVariable(fieldVariable):
     
     Attributes:
         odbPath  = string name of ODB file/location
-        dataName = string name of the data (e.g. 'MISES')
+        dataName = string name of the data (e.g. 'MISES'). any quantity
+                   of the registry, e.g. 'S11', 'MAXPRINCIPAL', 'TRIAXIALITY',
+                   'LODE', or 'LEEQ' (see odbQuantityRegistry)
         setName = string of the requested node set
+        session  = (optional) OdbSession sharing an open ODB
+        storageDir = (optional) directory name. If defined, resultData is
+                     stored out-of-core in a memory-mapped .npy file
+        cache    = (optional) ResultCache. If defined, fetched results are
+                   stored in the cache, and a repeated fetch (of an unchanged
+                   ODB) is loaded from the cache without opening the ODB
         
     Dependent Attributes (automatically calculated):
         keyName   = string name of hierarchical Abaqus output (e.g. 'S')
                     depends on setting of dataName
         abqAttrib = string name of data storage location
                     depends on setting of dataName
+        quantity  = FieldQuantity of dataName (from the registry)
+    
+    The set may span several instances. Every fetch method sorts the
+    labels by (instance, label), and also sets:
+        instanceNames = tuple of the instance name of each node (or element)
+                        label, i.e. instanceNames[e] is the instance of
+                        elementLabels[e]. Values are never averaged across
+                        instances.
     
     Attributes set by fetchNodalExtrap():
         totalTime = tuple of frame values for abaqus run 
@@ -365,6 +1108,15 @@ class IntPtVariable(fieldVariable):
                         Access is: resultData[i,ip,e]
     """
     
+    # fetch method used by iterFrames() (by default)
+    _defaultFetch = 'fetchIntPtData'
+    
+    # names of the axes of resultData, for each fetch method
+    _resultAxes = {'fetchNodalExtrap'    : ('time', 'elementNode', 'element'),
+                   'fetchNodalAverage'   : ('time', 'node'),
+                   'fetchIntPtData'      : ('time', 'intPt', 'element'),
+                   'fetchElementAverage' : ('time', 'element')}
+    
     #
     # Dependent Properties (set depending on dataName)
     #
@@ -377,17 +1129,7 @@ class IntPtVariable(fieldVariable):
         "main" output variable is actually stress, which has a 
         keyName of 'S' in the output.
         """
-        if self.dataName == 'PEEQ':
-            return 'PEEQ'
-        elif self.dataName == 'MISES':
-            return 'S'
-        elif self.dataName == 'PRESS':
-            return 'S'
-        elif self.dataName == 'INV3':
-            return 'S'
-        else:
-            raise Exception('That dataName has not been programmed! (yet?)')
-        return
+        return self.quantity.keyName
     
     @property
     def abqAttrib(self):
@@ -396,449 +1138,370 @@ class IntPtVariable(fieldVariable):
         location where our field output data values are stored
         in the abaqus ODB structure
         """
-        if self.dataName == 'PEEQ':
-            return 'data'
-        elif self.dataName == 'MISES':
-            return 'mises'
-        elif self.dataName == 'PRESS':
-            return 'press'
-        elif self.dataName == 'INV3':
-            return 'inv3'
-        else:
-            raise Exception('That dataName has not been programmed! (yet?)')
-        return
+        return self.quantity.abqAttrib
+    
+    @property
+    def quantity(self):
+        """
+        the registered FieldQuantity of dataName, which defines the
+        keyName and abqAttrib, and (for derived quantities such as
+        'TRIAXIALITY') the function of the components (see odbQuantityRegistry)
+        """
+        return get_quantity(self.dataName)
 
     #
     # Name Mangled Methods
     #
-    def __fetchElementLabels(self, myElemSet):
-        """ return a tuple of sorted element labels """
-        elementLabels = [e.label for e in myElemSet.elements[0]]
-        elementLabels.sort()
-        return tuple(elementLabels)
-    
-    def __fetchNodeLabels(self, myNodeSet):
-        """ returns a tuple of sorted node labels """
-        nodeLabels = [n.label for n in myNodeSet.nodes[0]]
-        nodeLabels.sort()
-        return tuple(nodeLabels)
-        
-    #
-    # Methods
-    #
-    def fetchNodalExtrap(self):
-        """ fetch integration point field output at the node locations
-        (for the desired element set) using extrapolation techniques.
-        Since we are requesting IP field output at the nodes, 
-        ABAQUS will extrapolate using basis functions. This function
-        does NOT perform any averaging at all. The nodal values for 
-        each element are stored, according to the ABAQUS node 
-        numbering scheme.
-        
-        this method sets the following attributes:
-            totalTime
-            elementLabels
-            nodeLabels
-            resultData
+    def __planNodalExtrap(self, odb, myElemSet, timeline):
+        """ 
+        setup for fetchNodalExtrap(). returns a plan dict (see _fetchGroup)
         """
-        # open output database and obtain myElemSet
-        odb,myElemSet = self._open_odb_check_keys('ELEMENT')
-        
         #
         # figure out details on how big the problem is
         #
         
+        # (instance, label) of the elements in the set, over all instances
+        elementIndex  = self._labelIndex(myElemSet, 'ELEMENT')
+        elementLabels = elementIndex.labels
         # number of elements in set:
-        numele = len(myElemSet.elements[0])
+        numele = len(elementIndex)
         # assuming all elements are the same, number of nodes per elem
-        nnpe = len(myElemSet.elements[0][0].connectivity)
-        # obtain numframes
-        numframes = self._numframes(odb)
-        
-        #
-        # obtain element labels
-        #
-        elementLabels = self.__fetchElementLabels(myElemSet)
+        setElements = [e for instElements in myElemSet.elements for e in instElements]
+        nnpe = len(setElements[0].connectivity)
         
         #
         # nodeLabels will essentially be the element connectivity
         #
         nodeLabels = numpy.zeros((numele,nnpe),dtype=int)
+        nodeLabels[elementIndex.index([e.label for e in setElements],
+                                      [e.instanceName for e in setElements]),:] = \
+            [e.connectivity for e in setElements]
         
-        for e in myElemSet.elements[0]:
-            nodeLabels[elementLabels.index(e.label),:] = e.connectivity
+        #
+        # (element, node) --> slot table. each (element index, node label)
+        # pair is combined into a single int64 key, and the keys are sorted
+        # so that a frame of labels can be located with one searchsorted.
+        # the slot is the flat index of [n,e] in the frame array. the
+        # element index is unique over all instances (so are the keys).
+        #
+        keyBase  = numpy.int64(nodeLabels.max()) + 1
+        pairKeys = (numpy.arange(numele,dtype=numpy.int64)[numpy.newaxis,:]*keyBase +
+                    nodeLabels.T.astype(numpy.int64)).ravel()
+        keyOrder = numpy.argsort(pairKeys, kind='mergesort')
+        pairKeys = pairKeys[keyOrder]
+        
+        def frameArray(labels, data):
+            """ arrange the data of one frame as [n,e] """
+            inst,e,n = labels
+            eindex,found = elementIndex.find(e, inst)
+            keys  = eindex.astype(numpy.int64)*keyBase + n
+            keys[~found] = -1
+            index = numpy.searchsorted(pairKeys, keys)
+            index[index == len(pairKeys)] = 0
+            if not numpy.array_equal(pairKeys[index], keys):
+                raise KeyError('output contains an (element, node) pair '
+                               'which is not in the element set!')
             
+            # insert the corresponding data directly to the frame,
+            # in one vectorized assignment
+            frameData = numpy.zeros(nnpe*numele,dtype=numpy.float64)
+            frameData[keyOrder[index]] = data
+            return frameData.reshape((nnpe,numele))
+        
+        return {'position'   : ELEMENT_NODAL,
+                'labelNames' : (INSTANCE_LABEL_NAME,'elementLabel','nodeLabel'),
+                'frameShape' : (nnpe,numele),
+                'frameArray' : frameArray,
+                'labels'     : elementLabels,
+                'attributes' : {'_nodeLabels'    : nodeLabels,
+                                '_elementLabels' : tuple(elementLabels),
+                                '_instanceNames' : elementIndex.instances}}
+    
+    def __planNodalAverage(self, odb, myNodeSet, timeline):
+        """ 
+        setup for fetchNodalAverage(). returns a plan dict (see _fetchGroup)
+        """
         #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
+        # figure out which nodes are in myNodeSet, and sort them
+        #
+        nodeIndex  = self._labelIndex(myNodeSet, 'NODE')
+        nodeLabels = nodeIndex.labels
+        numnod = len(nodeIndex)
+        
+        def frameArray(labels, data):
+            """ average the data of one frame at each node """
+            inst,n = labels
+            #position of each value's (instance, node) in the set. values at
+            #nodes outside of the set are not averaged, and values are
+            #never averaged across instances.
+            nindex,found = nodeIndex.find(n, inst)
+            
+            #average the nodal values so that there is one field data value 
+            #per node in the frame.
+            return grouped_reduction(nindex[found], data[found], numnod)['mean']
+        
+        return {'position'   : ELEMENT_NODAL,
+                'labelNames' : (INSTANCE_LABEL_NAME,'nodeLabel'),
+                'frameShape' : (numnod,),
+                'frameArray' : frameArray,
+                'labels'     : nodeLabels,
+                'attributes' : {'_nodeLabels'    : tuple(nodeLabels),
+                                '_instanceNames' : nodeIndex.instances}}
+    
+    def __planIntPtData(self, odb, myElemSet, timeline):
+        """ 
+        setup for fetchIntPtData(). returns a plan dict (see _fetchGroup)
+        """
+        #
+        # figure out details on how big the problem is
         #
-
-        # initialize
-        totalTime   = []
-        resultData  = numpy.zeros((numframes,nnpe,numele),dtype=numpy.float64)
         
-        # loop steps
-        for step in odb.steps.values():
-
-            # loop frames (step increments)
-            for frame in step.frames:
-                # calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                # check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    # this is a duplicate. continue to next frame
-                    continue
-                else:
-                    # this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-
-                # obtain a subset of the field output (based on myElemSet)
-                # this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
-                    position=ELEMENT_NODAL,region=myElemSet)
-                
-                # obtain all the data for this frame
-                for value in myFieldOutput.values:
-                    # element number is stored in value.elementLabel
-                    e      = value.elementLabel
-                    # this corresponds to an index of:
-                    eindex = elementLabels.index(e)
-                    
-                    # node point number is stored in value.nodeLabel
-                    n      = value.nodeLabel
-                    # this corresponds to an index of:
-                    nindex = numpy.where( nodeLabels[eindex,:] == n )[0][0]
-                    
-                    # insert the corresponding data directly to resultData.
-                    # unfortunately, a similar technique employed in fetchIntPtData
-                    # cannot be used, due to the way that Abaqus saves this type of
-                    # extrapolated data, and the massive memory hit to preallocating
-                    # an instance nnod x nele array. If SciPy is included in future
-                    # releases of Abaqus, sparse matrices could be used.
-                    resultData[len(totalTime)-1, nindex, eindex] = \
-                                numpy.float64( getattr(value, self.abqAttrib) )
+        # figure out how many integration points there are (total)
+        # from the last frame that will be fetched (or from the sidecar
+        # metadata, if it has already been recorded)
+        metadata = self._metadata()
+        numips = None
+        if metadata is not None:
+            # the number depends on the element types of the set
+            elemTypes = set([e.type for instElements in myElemSet.elements
+                             for e in instElements])
+            numips = metadata.intPoints(self.keyName, self.setName, elemTypes)
+        if numips is None:
+            testFrame = timeline.getFrame(odb, -1)
+            testFrameData = testFrame.fieldOutputs[self.keyName].getSubset(
+                                region=myElemSet,position=INTEGRATION_POINT)
+            numips = len(testFrameData.values) #there is a value for every int point in the region
+            if metadata is not None:
+                metadata.recordIntPoints(self.keyName, self.setName, elemTypes, numips)
+        
+        # get a list of all elements in the set (over all instances)
+        elementIndex  = self._labelIndex(myElemSet, 'ELEMENT')
+        elementLabels = elementIndex.labels
         
-        # set the proper attributes
-        self._totalTime     = tuple(totalTime)
-        self._nodeLabels    = nodeLabels
-        self._elementLabels = elementLabels
-        self._resultData    = resultData
+        # figure out how many elements and IPs per element there are in the set itself
+        numel = len(elementIndex)            #num elements
+        nipe  = numips/numel                 #num integration pts per elem
+        intPtLabels = tuple(range(1,nipe+1)) #list of all IP numbers
         
-        # flag that this method has been executed
-        self.__methodFlag = 'fetchNodalExtrap'
+        def frameArray(labels, data):
+            """ arrange the data of one frame as [ip,e] """
+            inst,e,ip = labels
+            eindex,found = elementIndex.find(e, inst)
+            # set the data directly into the frame
+            frameData = numpy.zeros((nipe,numel),dtype=numpy.float64)
+            frameData[ip[found]-1,eindex[found]] = data[found]
+            return frameData
+        
+        return {'position'   : INTEGRATION_POINT,
+                'labelNames' : (INSTANCE_LABEL_NAME,'elementLabel','integrationPoint'),
+                'frameShape' : (nipe,numel),
+                'frameArray' : frameArray,
+                'labels'     : elementLabels,
+                'attributes' : {'_intPtLabels'   : intPtLabels,
+                                '_elementLabels' : elementLabels,
+                                '_instanceNames' : elementIndex.instances}}
+    
+    def __planElementAverage(self, odb, myElemSet, timeline, weighting=None,
+                             statistics=None):
+        """ 
+        setup for fetchElementAverage(). returns a plan dict (see _fetchGroup)
+        """
+        #
+        # figure out which elements are in myElemSet, and sort them
+        #
+        elementIndex  = self._labelIndex(myElemSet, 'ELEMENT')
+        elementLabels = elementIndex.labels
+        numele = len(elementIndex)
         
-        # all data from the steps and frames has been collected!
-        # close output database
-        odb.close()
-        return
+        #
+        # averaging options
+        #
+        if weighting not in (None, 'volume'):
+            raise ValueError('weighting must be None or \'volume\'')
+        statistics = tuple(statistics or ())
+        for name in statistics:
+            if name not in ('min','max','std'):
+                raise ValueError('statistics must be \'min\', \'max\', and/or \'std\'')
+        
+        weightKey = None
+        if weighting == 'volume':
+            # integration point volume is used as the weight
+            weightKey = 'IVOL'
+            if not timeline.getFrame(odb, -1).fieldOutputs.has_key(weightKey):
+                raise KeyError('IVOL output is required for volume weighting!')
+        
+        def frameArray(labels, data, weights=None):
+            """ average the int. pt. data of one frame in each element """
+            inst,e = labels[0:2]
+            #element index of each int. pt. value, so that the values
+            #can be reduced (summed) by element in one pass
+            eindex,found = elementIndex.find(e, inst)
+            if weights is not None:
+                weights = weights[found]
+            reduced = grouped_reduction(eindex[found], data[found], numele,
+                                        weights, ('mean',) + statistics)
+            if not statistics:
+                return reduced['mean']
+            return reduced['mean'], reduced
+        
+        plan = {'position'   : INTEGRATION_POINT,
+                'labelNames' : (INSTANCE_LABEL_NAME,'elementLabel'),
+                'frameShape' : (numele,),
+                'frameArray' : frameArray,
+                'labels'     : elementLabels,
+                'attributes' : {'_elementLabels' : tuple(elementLabels),
+                                '_instanceNames' : elementIndex.instances}}
+        if weightKey is not None:
+            # int. pt. numbers are required to match IVOL to the data
+            plan['labelNames'] = (INSTANCE_LABEL_NAME,'elementLabel','integrationPoint')
+            plan['weightKey']  = weightKey
+        if statistics:
+            plan['statistics'] = statistics
+        return plan
+    
+    #
+    # Methods
+    #
+    def _planners(self):
+        """ fetch methods of this class (see fieldVariable._planners) """
+        return {'fetchNodalExtrap'    : ('ELEMENT', self.__planNodalExtrap),
+                'fetchNodalAverage'   : ('NODE',    self.__planNodalAverage),
+                'fetchIntPtData'      : ('ELEMENT', self.__planIntPtData),
+                'fetchElementAverage' : ('ELEMENT', self.__planElementAverage)}
+    
+    def fetchNodalExtrap(self, bulk=True, steps=None, timeRange=None, stride=1, frames=None,
+                         incremental=False):
+        """ fetch integration point field output at the node locations
+        (for the desired element set) using extrapolation techniques.
+        Since we are requesting IP field output at the nodes, 
+        ABAQUS will extrapolate using basis functions. This function
+        does NOT perform any averaging at all. The nodal values for 
+        each element are stored, according to the ABAQUS node 
+        numbering scheme.
         
-    def fetchNodalAverage(self):
-        """ fetch the average nodal point field output
-        for the desired node set. Return an average
-        for each node in the set.
+        bulk is an optional input (default True). If True, each frame
+        is read as whole arrays from the ODB bulk data blocks. If False,
+        (or if bulk data is unavailable) each value is read individually.
+        
+        steps, timeRange, stride, and frames are optional inputs which
+        select the frames to fetch (by default, all frames are fetched).
+        see FrameSelection for their definitions. Only the selected
+        frames are read from the ODB.
+        
+        incremental is an optional input (default False). If True, and
+        the object already holds the results of the same fetch (e.g. of a
+        running analysis, whose ODB is still growing), only the frames
+        after the last fetched (step, frame) are read, and they are
+        appended to the results. Otherwise, all frames are fetched.
         
         this method sets the following attributes:
             totalTime
+            elementLabels
             nodeLabels
             resultData
-        """
-        #open output database and obtain myNodeSet
-        odb,myNodeSet = self._open_odb_check_keys('NODE')
         
-        #
-        # figure out which nodes are in myNodeSet, and sort them
-        #
-        nodeLabels = self.__fetchNodeLabels(myNodeSet)
-        numnod = len(nodeLabels)
-        #convert to array for logical indexing (required in averaging scheme)
-        nodeLabels = numpy.asarray(nodeLabels,dtype=int)
-        
-        #
-        # determine the total number of nodes in the instance where the set is defined on
-        #
-        i_numnod = len( odb.rootAssembly.instances[myNodeSet.instanceNames[0]].nodes )
+        returns the FieldResult of the fetch (see fieldVariable.result),
+        with axes ('time', 'elementNode', 'element')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchNodalExtrap', [self], bulk, selection,
+                         incremental=incremental)
+        return self.result
         
-        #
-        # obtain numframes
-        #
-        numframes = self._numframes(odb)
-
-        #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
-        #
-
-        #initialize
-        totalTime  = []
-        resultData = numpy.zeros((numframes,numnod),dtype=numpy.float64)
-                
+    def fetchNodalAverage(self, bulk=True, steps=None, timeRange=None, stride=1, frames=None,
+                          incremental=False):
+        """ fetch the average nodal point field output
+        for the desired node set. Return an average
+        for each node in the set.
         
-        #loop steps
-        for step in odb.steps.values():
-
-            #loop frames (step increments)
-            for frame in step.frames:
-                #calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                #check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    #this is a duplicate. continue to next frame
-                    continue
-                else:
-                    #this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-
-                #initialize arrays.
-                #these are used as temporary storage for 
-                #averaging nodal results in the current frame.
-                frameData   = numpy.zeros((i_numnod,1),dtype=numpy.float64)
-                nValPerNode = numpy.zeros((i_numnod,1),dtype=numpy.float64)
-                
-                #obtain a subset of the field output (based on myNodeSet)
-                #this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
-                    position=ELEMENT_NODAL,region=myNodeSet)
-                
-                #loop through all data values for this frame
-                for value in myFieldOutput.values:
-                    #sum the data into frameData, while keeping track of the
-                    #number of sums with nValPerNode.
-                    
-                    #node number is stored in value.nodeLabel
-                    #nodal data is stored in value.(abqAttrib)
-                    frameData[value.nodeLabel-1,0]   += getattr(value, self.abqAttrib)
-                    nValPerNode[value.nodeLabel-1,0] += 1.0
-                
-                #average the nodal values so that there is one field data value 
-                #per node in the frame, and save frame values to resultData.
-                #note that the default numpy array divide is element-wise (like ./ in MATLAB)
-                resultData[len(totalTime)-1,:] = frameData[nodeLabels-1,0] / nValPerNode[nodeLabels-1,0]
-
-        #set the proper attributes
-        self._totalTime  = tuple(totalTime)
-        self._nodeLabels = tuple(nodeLabels)
-        self._resultData = resultData
+        bulk, steps, timeRange, stride, frames, and incremental are
+        optional inputs, see fetchNodalExtrap()
         
-        #flag that this method has been executed
-        self.__methodFlag = 'fetchNodalAverage'
+        this method sets the following attributes:
+            totalTime
+            nodeLabels
+            resultData
         
-        #all data from the steps and frames has been collected!
-        #close output database
-        odb.close()
-        return
+        returns the FieldResult of the fetch, with axes ('time', 'node')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchNodalAverage', [self], bulk, selection,
+                         incremental=incremental)
+        return self.result
     
-    def fetchIntPtData(self):
+    def fetchIntPtData(self, bulk=True, steps=None, timeRange=None, stride=1, frames=None,
+                       incremental=False):
         """ fetch the ingegration point field output
         for the desired element set. Return the values for
         each integration point in each element in the set 
         
+        bulk, steps, timeRange, stride, frames, and incremental are
+        optional inputs, see fetchNodalExtrap()
+        
         this methods sets the following attributes:
             totalTime
             intPtLabels
             resultData
-        """
-        
-        #open output database and obtain myElemSet
-        odb,myElemSet = self._open_odb_check_keys('ELEMENT')
-        
-        #
-        # figure out details on how big the problem is
-        #
-        
-        # figure out how many integration points there are (total)
-        testStep = odb.steps.keys()[-1]
-        testFrameData = odb.steps[testStep].frames[-1].fieldOutputs[self.keyName].getSubset(
-                            region=myElemSet,position=INTEGRATION_POINT)
-        numips = len(testFrameData.values) #there is a value for every int point in the region
-        
-        # determine the total number of elements in the instance where the set is defined on
-        i_numel = len( odb.rootAssembly.instances[myElemSet.instanceNames[0]].elements )
-        
-        # figure out how many elements and IPs per element there are in the set itself
-        numel = len(myElemSet.elements[0])   #num elements
-        nipe  = numips/numel                 #num integration pts per elem
-        intPtLabels = tuple(range(1,nipe+1)) #list of all IP numbers
-        
-        # get a list of all elements in the set
-        elementLabels = self.__fetchElementLabels(myElemSet)
-        # convert to array so we can use logical indexing
-        elementLabels = numpy.asarray(elementLabels,dtype=int)
-        
-        # determine out how many frames there are
-        numframes = self._numframes(odb)
-
-        #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
-        #
-
-        #initialize
-        totalTime  = []
-        resultData = numpy.zeros((numframes,nipe,numel),dtype=numpy.float64)
-                
-        #loop steps
-        for step in odb.steps.values():
-
-            #loop frames (step increments)
-            for frame in step.frames:
-                #calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                #check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    #this is a duplicate. continue to next frame
-                    continue
-                else:
-                    #this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-
-                # create temporary storage array
-                frameData = numpy.zeros((nipe,i_numel),dtype=numpy.float64)
-                
-                #obtain a subset of the field output (based on myElemSet)
-                #this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
-                    position=INTEGRATION_POINT,region=myElemSet)
-                
-                #obtain all the data for this frame
-                for value in myFieldOutput.values:
-                    #element number is stored in value.elementLabel
-                    e  = value.elementLabel
-                    #integration point number is stored in value.integrationPoint
-                    ip = value.integrationPoint
-                    # set the data into temporary storage array
-                    frameData[ip-1,e-1] = numpy.float64( getattr(value, self.abqAttrib) )
-                
-                # save to resultData
-                resultData[len(totalTime)-1,:,:] = frameData[:,elementLabels-1]
-        
-        #set the proper attributes
-        self._totalTime     = tuple(totalTime)
-        self._intPtLabels   = intPtLabels
-        self._elementLabels = elementLabels
-        self._resultData    = resultData
-        
-        #flag that this method has been executed
-        self.__methodFlag = 'fetchIntPtData'
         
-        #all data from the steps and frames has been collected!
-        #close output database
-        odb.close()
-        return
-        
-    def fetchElementAverage(self):
+        returns the FieldResult of the fetch, with axes ('time', 'intPt', 'element')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchIntPtData', [self], bulk, selection,
+                         incremental=incremental)
+        return self.result
+        
+    def fetchElementAverage(self, bulk=True, steps=None, timeRange=None, stride=1,
+                            frames=None, weighting=None, statistics=None,
+                            incremental=False):
         """ fetch the integration point field output
         for the desired element set. Return an average
         for each element in the set.
         
+        bulk, steps, timeRange, stride, frames, and incremental are
+        optional inputs, see fetchNodalExtrap()
+        
+        weighting is an optional input (default None). If 'volume', the
+        average is weighted by the integration point volume (IVOL output
+        must be requested in the analysis).
+        
+        statistics is an optional sequence of additional statistics of
+        the int. pt. values in each element, any of 'min', 'max', and 'std'
+        (e.g. statistics=('max',)). They are calculated in the same pass,
+        and saved in statisticData (a dict of arrays shaped as resultData).
+        
         this method sets the following attributes:
             totalTime
             elementLabels
             resultData
-            
-        *** NOTE: 
-        this method still uses an old and slow averaging scheme.
-        needs to be updated to the new scheme... 
-        see fetchNodalAverage() for newer scheme.
-        """
-
-        #open output database and obtain myElemSet
-        odb,myElemSet = self._open_odb_check_keys('ELEMENT')
+            statisticData (if statistics are requested)
         
-        #
-        # figure out which elements are in myElemSet, and sort them
-        #
-        elementLabels = self.__fetchElementLabels(myElemSet)
-        numele = int(len(elementLabels))
-
-        #
-        # obtain numframes
-        #
-        numframes = self._numframes(odb)
-
-        #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
-        #
-
-        #initialize
-        totalTime  = []
-        resultData = numpy.zeros((numframes,numele),dtype=numpy.float64)
-                
-        #loop steps
-        for step in odb.steps.values():
-
-            #loop frames (step increments)
-            for frame in step.frames:
-                #calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                #check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    #this is a duplicate. continue to next frame
-                    continue
-                else:
-                    #this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-
-                #initialize frame array.
-                #this is used as temporary storage for 
-                #averaging integration point results in the current frame
-                frameData      = numpy.zeros((numele,2),dtype=numpy.float64)
-                frameData[:,0] = numpy.float64(elementLabels) #this is included for debugging
-                
-                #obtain a subset of the field output (based on myElemSet)
-                #this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(
-                    position=INTEGRATION_POINT,region=myElemSet)
-                
-                #obtain all the nodal data for this frame
-                tempElems = [];
-                tempData  = [];
-                for value in myFieldOutput.values:
-                    #element number is stored in value.elementLabel
-                    tempElems.append(value.elementLabel)
-                    #int. pt. data is stored in value.(abqAttrib)
-                    tempData.append(numpy.float64( 
-                                    getattr(value, self.abqAttrib) ))
-
-
-                #average the int. pt. values so that there is
-                #one field data value per node in the frame
-                for i in range(0,len(elementLabels)):
-                    #for all element labels
-                    ip_data = []
-                    for k in range(0,len(tempElems)):
-                        if elementLabels[i] == tempElems[k]:
-                            #pick up all data belonging to element
-                            ip_data.append(tempData[k])
-                    #save average to frameData
-                    frameData[i,1] = numpy.mean(ip_data, dtype=numpy.float64)
-
-                #save frame values to result
-                resultData[len(totalTime)-1,:] = frameData[:,1]
-
-        #set the proper attributes
-        self._totalTime = tuple(totalTime)
-        self._elementLabels = tuple(elementLabels)
-        self._resultData    = resultData
-        
-        #flag that this method has been executed
-        self.__methodFlag = 'fetchElementAverage'
-        
-        #all data from the steps and frames has been collected!
-        #close output database
-        odb.close()
-        return
+        returns the FieldResult of the fetch, with axes ('time', 'element')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchElementAverage', [self], bulk, selection,
+                         {'weighting' : weighting, 'statistics' : statistics},
+                         incremental)
+        return self.result
         
-    def saveCSV(self, verbose=True):
-        """ save a CSV file of data """
-        if self.__methodFlag == 'fetchIntPtData':
+    def saveCSV(self, verbose=True, compress=False):
+        """
+        save a CSV file of data. If compress is True, the
+        files are gzip compressed (see _saveOdbFieldDataCSV)
+        """
+        if self._methodFlag == 'fetchIntPtData':
             for i in self.intPtLabels:
                 self._saveOdbFieldDataCSV(dataTitle=(self.dataName + '_IP' + str(i)),
-                                      dataSet=self.resultData[:,i-1,:], verbose=verbose)
+                                      dataSet=self.resultData[:,i-1,:], verbose=verbose,
+                                      compress=compress)
         
-        elif self.__methodFlag == 'fetchNodalData':
+        elif self._methodFlag == 'fetchNodalExtrap':
             numele,nnpe = self.nodeLabels.shape
             for i in range(0,nnpe):
                 self._saveOdbFieldDataCSV(dataTitle=(self.dataName + '_NOD' + str(i)),
-                                      dataSet=self.resultData[:,i,:], verbose=verbose)
+                                      dataSet=self.resultData[:,i,:], verbose=verbose,
+                                      compress=compress)
         else:
-            self._saveOdbFieldDataCSV(verbose=verbose)
+            self._saveOdbFieldDataCSV(verbose=verbose, compress=compress)
         return
 
 
@@ -850,6 +1513,12 @@ class NodalVariable(fieldVariable):
         odbPath  = string name of ODB file/location
         dataName = string name of the data (e.g. 'U')
         setName = string of the requested node set
+        session  = (optional) OdbSession sharing an open ODB
+        storageDir = (optional) directory name. If defined, resultData is
+                     stored out-of-core in a memory-mapped .npy file
+        cache    = (optional) ResultCache. If defined, fetched results are
+                   stored in the cache, and a repeated fetch (of an unchanged
+                   ODB) is loaded from the cache without opening the ODB
     
     Attributes set by fetchNodalAverage():
         totalTime = list of frame values for abaqus run 
@@ -861,18 +1530,38 @@ class NodalVariable(fieldVariable):
         resultData    = numpy float64 array of the actual field 
                         output data (e.g. 'U', 'COORD', etc.)
                         in the form of [frame, node, dimension]
+        instanceNames = tuple of the instance name of each node label
+                        (the set may span several instances)
+    
+    Reductions (see reduceNodes) return new NodalVariable objects, e.g.
+    the total reaction force and the average displacement of the set.
     """
     
+    # reductions of reduceNodes(), and the prefix of their componentLabels
+    _reductionPrefixes = {'sum'          : 'summed',
+                          'mean'         : 'average',
+                          'min'          : 'min',
+                          'max'          : 'max',
+                          'weightedMean' : 'weightedAverage'}
+    
     #
     # Attributes (object initialization)
     #
-    def __init__(self, odbPath, dataName, setName):
+    # fetch method used by iterFrames() (by default)
+    _defaultFetch = 'fetchNodalOutput'
+    
+    # names of the axes of resultData, for each fetch method
+    _resultAxes = {'fetchNodalOutput' : ('time', 'node', 'component')}
+    
+    def __init__(self, odbPath, dataName, setName, session=None, storageDir=None,
+                 cache=None, float32=False):
         """ return object with desired attributes """
         
         # initialize field variable
-        fieldVariable.__init__(self, odbPath, dataName, setName)
+        fieldVariable.__init__(self, odbPath, dataName, setName, session, storageDir,
+                               cache, float32)
         #add new attribute
-        self.__componentLabels = None
+        self._componentLabels = None
         
         return
     
@@ -888,131 +1577,191 @@ class NodalVariable(fieldVariable):
         return self._componentLabels
     
     #
-    # Methods
+    # Name Mangled Methods
     #
-    def fetchNodalOutput(self):
-        """ obtains the nodal output for the defined set """
-        
-
-        #open output database and obtain myElemSet
-        odb,myNodeSet = self._open_odb_check_keys('NODE')
-        
+    def __planNodalOutput(self, odb, myNodeSet, timeline):
+        """ 
+        setup for fetchNodalOutput(). returns a plan dict (see _fetchGroup)
+        """
         #
         # obtain the componentLabels so that we know what the values
         # in the ODB array mean. This will also be used to meaningfully
         # name the saved data
         #
-        testStep = odb.steps.keys()[-1]
-        components = odb.steps[testStep].frames[0]. \
-                     fieldOutputs[self.keyName].componentLabels
+        components = timeline.getFrame(odb, -1).fieldOutputs[self.keyName].componentLabels
         numdim = len(components)
         
         #
         # determine size of the problem
         #
         
-        # figure out which nodes are in myNodeSet, and sort them
-        nodeLabels = [n.label for n in myNodeSet.nodes[0]]
-        nodeLabels.sort()
+        # figure out which nodes are in myNodeSet (all instances), and sort them
+        nodeIndex  = self._labelIndex(myNodeSet, 'NODE')
+        nodeLabels = nodeIndex.labels
         # number of nodes in myNodeSet
-        numnod = int(len(nodeLabels))
-        # to use nodeLabels in logical indexing, convert to numpy array
-        nodeLabels = numpy.asarray(nodeLabels,dtype=int)
+        numnod = len(nodeIndex)
+        
+        def frameArray(labels, data):
+            """ arrange the data of one frame as [node, dimension] """
+            inst,n = labels
+            # we cannot be sure what order the nodes are in, so
+            # locate each (instance, node) in the (sorted) set labels
+            nindex,found = nodeIndex.find(n, inst)
+            frameData = numpy.zeros((numnod,numdim),dtype=numpy.float64)
+            frameData[nindex[found],:] = data.reshape((len(n),numdim))[found]
+            return frameData
+        
+        return {'position'   : None,
+                'labelNames' : (INSTANCE_LABEL_NAME,'nodeLabel'),
+                'frameShape' : (numnod,numdim),
+                'frameArray' : frameArray,
+                'labels'     : nodeLabels,
+                'attributes' : {'_nodeLabels'      : tuple(nodeLabels),
+                                '_instanceNames'   : nodeIndex.instances,
+                                '_componentLabels' : tuple(components)}}
+    
+    def _planners(self):
+        """ fetch methods of this class (see fieldVariable._planners) """
+        return {'fetchNodalOutput' : ('NODE', self.__planNodalOutput)}
+    
+    #
+    # Methods
+    #
+    def fetchNodalOutput(self, bulk=True, steps=None, timeRange=None, stride=1, frames=None,
+                         incremental=False):
+        """ 
+        obtains the nodal output for the defined set 
         
-        # determine the total number of nodes in the instance where the set is defined on
-        i_numnod = len( odb.rootAssembly.instances[myNodeSet.instanceNames[0]].nodes )
+        bulk is an optional input (default True). If True, each frame
+        is read as whole arrays from the ODB bulk data blocks. If False,
+        (or if bulk data is unavailable) each value is read individually.
         
-        #
-        # obtain numframes
-        #
-        numframes = self._numframes(odb)
-
-        #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
-        #
-
-        #initialize
-        totalTime  = []
-        resultData = numpy.zeros( (numframes,numnod,numdim), dtype=numpy.float64 )
+        steps, timeRange, stride, and frames are optional inputs which
+        select the frames to fetch (by default, all frames are fetched).
+        see FrameSelection for their definitions.
         
-        #loop steps
-        for step in odb.steps.values():
-
-            #loop frames (step increments)
-            for frame in step.frames:
-                #calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                #check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    #this is a duplicate. continue to next frame
-                    continue
-                else:
-                    #this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-
-                #obtain a subset of the field output (based on myNodeSet)
-                #this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(region=myNodeSet)
-                
-                # initialize an array to temporarily store data for this frame.
-                # necessary since we cannot be sure what order the nodes are in.
-                # preallocate full i_numnod size for convenience of indexing.
-                frameData = numpy.zeros((i_numnod,numdim),dtype=numpy.float64)
-                
-                #retrieve all the nodal data for this frame
-                for value in myFieldOutput.values:
-                    #for all values in the frame
-                    try:
-                        #analysis is single precision, so data is stored
-                        #as a vector in value.data
-                        frameData[value.nodeLabel-1,:] = value.data
-                    except OdbError:
-                        #analysis is double precision, so data is stored
-                        #as a vector in value.dataDouble
-                        frameData[value.nodeLabel-1,:] = value.dataDouble
-
-                # save frameData to resultData
-                resultData[len(totalTime)-1,:,:] = frameData[nodeLabels-1,:]
-
-        #save to attributes
-        self._totalTime       = tuple(totalTime)
-        self._nodeLabels      = tuple(nodeLabels)
-        self._resultData      = resultData
-        self._componentLabels = tuple(components)
-        
-        #all data from the steps and frames has been collected!
-        #close output database
-        odb.close()
-        return
+        incremental is an optional input (default False). If True, only
+        the frames after the last fetched frame are read and appended,
+        see IntPtVariable.fetchNodalExtrap()
+        
+        returns the FieldResult of the fetch (see fieldVariable.result),
+        with axes ('time', 'node', 'component')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchNodalOutput', [self], bulk, selection,
+                         incremental=incremental)
+        return self.result
 
+    def reduceNodes(self, reductions=('sum','mean'), weights=None,
+                    blockSize=REDUCTION_BLOCK_SIZE):
+        """
+        reduces the data across all nodes (but not frames), e.g. the
+        total reaction force 'RF', or the average displacement 'U' of a
+        surface. Every requested reduction is calculated in one pass
+        over resultData (which is read in blocks of frames, so it may be
+        memory-mapped), and the results of this object are not modified.
+        
+        input:
+            reductions = sequence of any of 'sum', 'mean', 'min', 'max',
+                         'weightedMean', and 'norm'. 'norm' is not a
+                         reduction across the nodes, but the magnitude
+                         of the vector (components) at each node.
+            weights    = numpy array of the weight of each node (e.g. its
+                         tributary area), either (node) or (frame, node).
+                         Required for 'weightedMean'.
+            blockSize  = (optional) number of values read at once
+        
+        returns a dict of {reduction : NodalVariable}. Each reduced
+        variable has one node (nodeLabels = (-1,)), with resultData in the
+        form of [frame, 0, dimension], and the reduction is prepended to
+        its componentLabels (e.g. 'summedRF1'). The 'norm' variable has
+        resultData in the form of [frame, node, 0], and componentLabels
+        of ('norm' + dataName,).
+        """
+        if self.resultData is None:
+            raise Exception('there are no results to reduce! (fetch them first)')
+        for name in reductions:
+            if (name not in self._reductionPrefixes) and (name != 'norm'):
+                raise ValueError('unknown reduction %s' % name)
+        
+        numframes,numnod,numdim = self.resultData.shape
+        if 'weightedMean' in reductions:
+            if weights is None:
+                raise ValueError('weights are required for weightedMean!')
+            weights = numpy.asarray(weights, dtype=numpy.float64)
+            if weights.shape not in ((numnod,), (numframes,numnod)):
+                raise ValueError('weights must be (node) or (frame, node)!')
+        
+        # initialize
+        reduced = {}
+        for name in reductions:
+            if name == 'norm':
+                reduced[name] = numpy.zeros((numframes,numnod,1), dtype=numpy.float64)
+            else:
+                reduced[name] = numpy.zeros((numframes,1,numdim), dtype=numpy.float64)
+        
+        # one pass over blocks of frames
+        step = max(1, int(blockSize) // max(1, numnod*numdim))
+        for f in range(0, numframes, step):
+            data = numpy.asarray(self.resultData[f:f+step])
+            if 'sum' in reductions or 'mean' in reductions:
+                total = data.sum(axis=1)
+                if 'sum' in reductions:
+                    reduced['sum'][f:f+step,0,:] = total
+                if 'mean' in reductions:
+                    reduced['mean'][f:f+step,0,:] = total/numnod
+            if 'min' in reductions:
+                reduced['min'][f:f+step,0,:] = data.min(axis=1)
+            if 'max' in reductions:
+                reduced['max'][f:f+step,0,:] = data.max(axis=1)
+            if 'weightedMean' in reductions:
+                w = weights
+                if w.ndim == 2:
+                    w = w[f:f+step]
+                w = w.reshape((-1,numnod,1))
+                reduced['weightedMean'][f:f+step,0,:] = \
+                    (w*data).sum(axis=1) / w.sum(axis=1)
+            if 'norm' in reductions:
+                reduced['norm'][f:f+step,:,0] = numpy.sqrt((data*data).sum(axis=2))
+        
+        # new objects of the reduced results
+        variables = {}
+        for name in reductions:
+            if name == 'norm':
+                variables[name] = self._reducedCopy(reduced[name], self.nodeLabels,
+                                                    ('norm' + self.dataName,),
+                                                    self.instanceNames)
+            else:
+                prefix = self._reductionPrefixes[name]
+                variables[name] = self._reducedCopy(reduced[name], (-1,),
+                    tuple([prefix + c for c in self.componentLabels]))
+        return variables
+    
+    def _reducedCopy(self, resultData, nodeLabels, componentLabels, instanceNames=None):
+        """ returns a new NodalVariable with the given (reduced) results """
+        variable = NodalVariable(self.odbPath, self.dataName, self.setName,
+                                 session=self.session)
+        variable._setResults(self._results())
+        variable._resultData      = resultData
+        variable._nodeLabels      = nodeLabels
+        variable._componentLabels = componentLabels
+        variable._instanceNames   = instanceNames
+        variable._statisticData   = None
+        # not the results of a fetch, so it cannot be continued incrementally
+        variable._lastFrame       = None
+        variable._fetchKey        = None
+        return variable
+    
     def sumNodalOutput(self):
         """ 
         sums the data across all nodes (but not frames).
         This is useful, for example, if you wish to get the
         total reaction force 'RF' for the node set.
+        
+        the results of this object are replaced by the sum. see
+        reduceNodes() to obtain a new object instead.
         """
-        #determine size of problem
-        numframes = len(self.totalTime)
-        numdim    = len(self.componentLabels)
-        
-        #rename componentLabels to indicate they are summed
-        componentLabels = []
-        for i in range(0,numdim):
-            componentLabels.append('summed' + self.componentLabels[i])
-        componentLabels = tuple(componentLabels)
-        
-        #initialize array
-        resultData = numpy.zeros((numframes,1,numdim),dtype=numpy.float64)
-        
-        #perform the sum
-        for dim in range(0,numdim):
-            for frame in range(0,numframes):
-                for n in range(0,len(self.nodeLabels)):
-                    resultData[frame,0,dim] += self.resultData[frame,n,dim]
-        #save
-        self._resultData = resultData
-        self._nodeLabels = (-1,)
-        self._componentLabels = componentLabels
+        self.__replaceResults(self.reduceNodes(('sum',))['sum'])
         return
     
     def avgNodalOutput(self):
@@ -1020,36 +1769,30 @@ class NodalVariable(fieldVariable):
         averages the data across all nodes (but not frames).
         This is useful, for example, if you wish to get the
         average displacement of a surface (node set)
-        """
-        #determine size of problem
-        numframes = len(self.totalTime)
-        numdim    = len(self.componentLabels)
-        
-        #rename componentLabels to indicate they are averaged
-        componentLabels = []
-        for i in range(0,numdim):
-            componentLabels.append('average' + self.componentLabels[i])
-        componentLabels = tuple(componentLabels)
-        
-        #initialize array
-        resultData = numpy.zeros((numframes,1,numdim),dtype=numpy.float64)
         
-        #perform the average
-        for dim in range(0,numdim):
-            for frame in range(0,numframes):
-                resultData[frame,0,dim] = numpy.mean( self.resultData[frame,:,dim] )
-
-        #save
-        self._resultData = resultData
-        self._nodeLabels = (-1,)
-        self._componentLabels = componentLabels
+        the results of this object are replaced by the average. see
+        reduceNodes() to obtain a new object instead.
+        """
+        self.__replaceResults(self.reduceNodes(('mean',))['mean'])
         return
     
-    def saveCSV(self, verbose=True):
-        """ save a CSV file of the data """
+    def __replaceResults(self, reduced):
+        """ replaces the results of this object with a reduced variable """
+        self._resultData      = reduced.resultData
+        self._nodeLabels      = reduced.nodeLabels
+        self._componentLabels = reduced.componentLabels
+        self._instanceNames   = reduced.instanceNames
+        return
+    
+    def saveCSV(self, verbose=True, compress=False):
+        """
+        save a CSV file of the data. If compress is True, the
+        files are gzip compressed (see _saveOdbFieldDataCSV)
+        """
         for i in range(0,len(self.componentLabels)):
             self._saveOdbFieldDataCSV(dataTitle=self.componentLabels[i],
-                                      dataSet=self.resultData[:,:,i], verbose=verbose)
+                                      dataSet=self.resultData[:,:,i], verbose=verbose,
+                                      compress=compress)
         return
 
 
@@ -1063,6 +1806,13 @@ class ElementVariable(fieldVariable):
     convenience, since that's all I need.
     """
     
+    # fetch method used by iterFrames() (by default)
+    _defaultFetch = 'fetchElementVolume'
+    
+    # names of the axes of resultData, for each fetch method
+    _resultAxes = {'fetchElementVolume'        : ('time', 'element'),
+                   'fetchInitialElementVolume' : ('time', 'element')}
+    
     @property
     def keyName(self):
         """ 
@@ -1073,10 +1823,54 @@ class ElementVariable(fieldVariable):
         else:
             raise Exception('Unknown dataName assignment!')
         return
-        
     
-    def fetchInitialElementVolume(self):
-        """ obtain the initial (frame 0) EVOL """
+    #
+    # Name Mangled Methods
+    #
+    def __planElementVolume(self, odb, myElemSet, timeline):
+        """ 
+        setup for fetchElementVolume(). returns a plan dict (see _fetchGroup)
+        """
+        # figure out which elements are in myElemSet (all instances), and sort them
+        elementIndex  = self._labelIndex(myElemSet, 'ELEMENT')
+        elementLabels = elementIndex.labels
+        # number of elems in myElemSet
+        numele = len(elementIndex)
+        
+        def frameArray(labels, data):
+            """ arrange the data of one frame as [element] """
+            inst,e = labels
+            # we cannot be sure what order the elements are in, so
+            # locate each (instance, element) in the (sorted) set labels
+            eindex,found = elementIndex.find(e, inst)
+            frameData = numpy.zeros(numele, dtype=numpy.float64)
+            frameData[eindex[found]] = data[found]
+            return frameData
+        
+        return {'position'   : None,
+                'labelNames' : (INSTANCE_LABEL_NAME,'elementLabel'),
+                'frameShape' : (numele,),
+                'frameArray' : frameArray,
+                'labels'     : elementLabels,
+                'attributes' : {'_elementLabels' : tuple(elementLabels),
+                                '_instanceNames' : elementIndex.instances}}
+    
+    def _planners(self):
+        """ fetch methods of this class (see fieldVariable._planners) """
+        return {'fetchElementVolume' : ('ELEMENT', self.__planElementVolume)}
+    
+    #
+    # Methods
+    #
+    
+    def fetchInitialElementVolume(self, bulk=True):
+        """
+        obtain the initial (frame 0) EVOL
+        
+        bulk is an optional input (default True), see fetchElementVolume()
+        
+        returns the FieldResult, with axes ('time', 'element')
+        """
         
         #open output database and obtain myElemSet
         odb,myElemSet = self._open_odb_check_keys('ELEMENT')
@@ -1084,11 +1878,7 @@ class ElementVariable(fieldVariable):
         #
         # figure out which elements are in myElemSet, and sort them
         #
-        elementLabels = []
-        for e in myElemSet.elements[0]: #for some reason, this is a 1-element tuple...
-            elementLabels.append(e.label)
-        elementLabels.sort()
-        numele = int(len(elementLabels))
+        numele = len(self._labelIndex(myElemSet, 'ELEMENT'))
 
         #
         # Open up Step 1 Frame 1, and save EVOL
@@ -1099,113 +1889,194 @@ class ElementVariable(fieldVariable):
         firstFrame   = odb.steps[firstStep].frames[0]
         initialField = firstFrame.fieldOutputs[self.keyName].getSubset(region=myElemSet)
         
-        #obtain the data
-        tempData      = []
-        elementLabels = []
-        for value in initialField.values:
-            #element number is stored in value.elementLabel
-            elementLabels.append(value.elementLabel)
-            # EVOL is stored in data or dataDouble
-            try:
-                tempData.append(numpy.float64( value.data ))
-            except OdbError:
-                tempData.append(numpy.float64( value.dataDouble ))
+        #obtain the data (EVOL is stored in data or dataDouble,
+        #depending on the precision of the ODB)
+        precision = field_precision(initialField, bulk)
+        [instanceNames,elementLabels],data = read_field_values(initialField, 'data',
+                                                (INSTANCE_LABEL_NAME, 'elementLabel'),
+                                                bulk, precision)
 
         #save data as a numpy array
-        resultData = numpy.zeros((1,numele),dtype=numpy.float64)
-        resultData[0,:] = tempData
+        resultData = numpy.zeros((1,numele),dtype=self._resultDtype(precision))
+        resultData[0,:] = data.reshape(-1)
         
         #save to self
-        self._elementLabels = tuple(elementLabels)
+        self._elementLabels = tuple(elementLabels.tolist())
+        self._instanceNames = tuple([str(name) for name in instanceNames])
         self._resultData    = resultData
         self._totalTime     = (0,)
+        self._methodFlag    = 'fetchInitialElementVolume'
         
         #close output database and return
-        odb.close()
-        return
+        close_odb(odb, self.session)
+        return self.result
         
-    def fetchElementVolume(self):
-        """ obtain the EVOL for all frames """
-        
-        # open output database and obtain myElemSet
-        odb,myElemSet = self._open_odb_check_keys('ELEMENT')
-        
-        #
-        # determine size of the problem
-        #
-        
-        # figure out which elements are in myElemSet, and sort them
-        elementLabels = [e.label for e in myElemSet.elements[0]]
-        elementLabels.sort()
-        # number of elems in myElemSet
-        numele = int(len(elementLabels))
-        # to use elemLabels in logical indexing, convert to numpy array
-        elementLabels = numpy.asarray(elementLabels,dtype=int)
-        
-        # determine the total number of nodes in the instance where the set is defined on
-        i_numele = len( odb.rootAssembly.instances[myElemSet.instanceNames[0]].elements )
+    def fetchElementVolume(self, bulk=True, steps=None, timeRange=None, stride=1, frames=None,
+                           incremental=False):
+        """ 
+        obtain the EVOL for all frames 
         
-        #
-        # obtain numframes
-        #
-        numframes = self._numframes(odb)
+        bulk is an optional input (default True). If True, each frame
+        is read as whole arrays from the ODB bulk data blocks. If False,
+        (or if bulk data is unavailable) each value is read individually.
         
-        #
-        # iterate through the STEPs and FRAMEs, saving the info as applicable
-        #
+        steps, timeRange, stride, and frames are optional inputs which
+        select the frames to fetch (by default, all frames are fetched).
+        see FrameSelection for their definitions.
         
-        # initialize
-        totalTime  = []
-        resultData = numpy.zeros( (numframes,numele), dtype=numpy.float64 )
+        incremental is an optional input (default False). If True, only
+        the frames after the last fetched frame are read and appended,
+        see IntPtVariable.fetchNodalExtrap()
         
-        # loop steps
-        for step in odb.steps.values():
-
-            # loop frames (step increments)
-            for frame in step.frames:
-                # calculate the "time" of this specific frame
-                frameTime = step.totalTime + frame.frameValue
-                # check to see if this is a duplicate frame (happens between steps)
-                if frameTime in totalTime:
-                    # this is a duplicate. continue to next frame
-                    continue
-                else:
-                    # this is not a duplicate; save to totalTime
-                    totalTime.append(frameTime)
-                
-                # obtain a subset of the field output (based on myNodeSet)
-                # this subset will only contain keyName data
-                myFieldOutput = frame.fieldOutputs[self.keyName].getSubset(region=myElemSet)
+        returns the FieldResult of the fetch (see fieldVariable.result),
+        with axes ('time', 'element')
+        """
+        selection = FrameSelection(steps, timeRange, stride, frames)
+        self._fetchGroup('fetchElementVolume', [self], bulk, selection,
+                         incremental=incremental)
+        return self.result
 
-                # initialize an array to temporarily store data for this frame.
-                # necessary since we cannot be sure what order the elements are in.
-                # preallocate full i_numele size for convenience of indexing.
-                frameData = numpy.zeros((1,i_numele), dtype=numpy.float64)
-                
-                # retrieve all the element data for this frame
-                for value in myFieldOutput.values:
-                    # for all values in the frame
-                    # element number is stored in value.elementLabel
-                    try:
-                        # analysis is single precision, so data is stored in value.data
-                        frameData[0,value.elementLabel-1] = numpy.float64(value.data)
-                    except OdbError:
-                        # analysis is double precision
-                        frameData[0,value.elementLabel-1] = value.dataDouble
-                
-                # save frameData to resultData
-                resultData[len(totalTime)-1,:] = frameData[0,elementLabels-1]
-                
-        # save to self
-        self._elementLabels = tuple(elementLabels)
-        self._resultData    = resultData
-        self._totalTime     = tuple(totalTime)
-        
-        # close output database and return
-        odb.close()
+    def saveCSV(self, verbose=True, compress=False):
+        """
+        save CSV file of the data. If compress is True, the
+        file is gzip compressed (see _saveOdbFieldDataCSV)
+        """
+        self._saveOdbFieldDataCSV(verbose=verbose, compress=compress)
         return
 
-    def saveCSV(self, verbose=True):
-        """ save CSV file of the data """
-        self._saveOdbFieldDataCSV(verbose=verbose)
-        return
+
+#
+# Functions
+#
+
+def fetch_intpt_variables(odbPath, dataNames, setName, method='fetchNodalAverage',
+                          bulk=True, session=None, steps=None, timeRange=None,
+                          stride=1, frames=None, storageDir=None, cache=None,
+                          previous=None, float32=False):
+    """
+    fetches several integration point variables for the same set.
+    The dataNames are grouped by their keyName, and the field output
+    of each keyName is read only once per frame. For example, MISES,
+    PRESS, and INV3 are all obtained from one pass over the 'S' output.
+    
+    input:
+        odbPath   = string name of ODB file/location
+        dataNames = sequence of dataNames (e.g. ['MISES','PRESS','INV3'])
+        setName   = string of the requested set
+        method    = (optional) name of the IntPtVariable fetch method
+                    (default 'fetchNodalAverage')
+        bulk      = (optional) see IntPtVariable.fetchNodalExtrap()
+        session   = (optional) OdbSession sharing an open ODB. If not
+                    given, a session is used for the duration of this call.
+        steps, timeRange, stride, frames = (optional) frame selection,
+                    see FrameSelection
+        storageDir = (optional) directory for out-of-core resultData
+        cache     = (optional) ResultCache of fetched results
+        previous  = (optional) dict returned by a previous call. If given,
+                    its variables are fetched incrementally, i.e. only the
+                    frames written to the ODB since the previous call are
+                    read, and appended (see IntPtVariable.fetchNodalExtrap)
+        float32   = (optional) store resultData as float32, if the ODB is
+                    single precision (see fieldVariable.float32)
+    
+    returns a dict of fetched IntPtVariable objects, keyed by dataName
+    """
+    # one ODB open for all of the groups
+    if session is None:
+        with OdbSession(odbPath) as session:
+            return fetch_intpt_variables(odbPath, dataNames, setName,
+                                         method, bulk, session, steps,
+                                         timeRange, stride, frames, storageDir,
+                                         cache, previous, float32)
+    
+    # group the variables by their keyName
+    variables = {}
+    groups    = {}
+    for dataName in dataNames:
+        if (previous is not None) and (dataName.upper() in previous):
+            # continue from the previous results
+            v = previous[dataName.upper()]
+            v.session = session
+        else:
+            v = IntPtVariable(odbPath, dataName, setName, session=session,
+                              storageDir=storageDir, cache=cache, float32=float32)
+        if v.dataName in variables:
+            # duplicate request
+            continue
+        variables[v.dataName] = v
+        groups.setdefault(v.keyName, []).append(v)
+    
+    # fetch each group with a single pass over the frames
+    selection = FrameSelection(steps, timeRange, stride, frames)
+    for group in groups.values():
+        group[0]._fetchGroup(method, group, bulk, selection,
+                             incremental=(previous is not None))
+    return variables
+
+
+#
+# Private Functions
+#
+
+def _append_frames(array, frameData):
+    """
+    returns array with frameData (an array of frames) appended along the
+    first axis. A memory-mapped .npy array (see storageDir) is extended
+    in place on disk, so that the existing frames are not rewritten.
+    """
+    if not isinstance(array, numpy.memmap) or not getattr(array, 'filename', None):
+        return numpy.concatenate((numpy.asarray(array), frameData))
+    
+    array.flush()
+    return numpy.load(_append_npy(array.filename, frameData), mmap_mode='r+')
+
+def _append_npy(fileName, frameData):
+    """
+    appends frameData to the (first axis of the) array in a .npy file.
+    returns the name of the file with the appended array: the same file,
+    if the frames could be appended in place, otherwise a new file in the
+    same directory (the original file may still be memory-mapped, so it
+    is not overwritten).
+    """
+    npyFile = open(fileName, 'r+b')
+    try:
+        version = numpy.lib.format.read_magic(npyFile)
+        if version == (1,0):
+            readHeader = numpy.lib.format.read_array_header_1_0
+        else:
+            readHeader = numpy.lib.format.read_array_header_2_0
+        shape,fortranOrder,dtype = readHeader(npyFile)
+        offset = npyFile.tell()
+        
+        # header with the new number of frames
+        shape  = (shape[0] + len(frameData),) + tuple(shape[1:])
+        header = {'descr' : numpy.lib.format.dtype_to_descr(dtype),
+                  'fortran_order' : False, 'shape' : shape}
+        headerFile = StringIO.StringIO()
+        numpy.lib.format.write_array_header_1_0(headerFile, header)
+        header = headerFile.getvalue()
+        if not header.startswith(numpy.lib.format.MAGIC_PREFIX):
+            # older numpy versions write the magic string separately
+            header = numpy.lib.format.magic(1,0) + header
+        
+        if (version == (1,0)) and (not fortranOrder) and (len(header) == offset):
+            # write the new frames at the end, and then update the header
+            npyFile.seek(0, 2)
+            npyFile.write(numpy.ascontiguousarray(frameData, dtype=dtype).tostring())
+            npyFile.seek(0)
+            npyFile.write(header)
+            return fileName
+    finally:
+        npyFile.close()
+    
+    # the header does not fit, copy the frames to a new file
+    array = numpy.load(fileName, mmap_mode='r')
+    fd,newName = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(fileName),
+                                  prefix=os.path.splitext(os.path.basename(fileName))[0] + '_')
+    os.close(fd)
+    newArray = numpy.lib.format.open_memmap(newName, mode='w+', dtype=dtype, shape=shape)
+    newArray[:len(array)] = array
+    newArray[len(array):] = frameData
+    newArray.flush()
+    del newArray, array
+    return newName
@@ -17,6 +17,10 @@ import numpy
 import sys
 import re
 from myFileOperations import *
+from odbFieldResultClasses import *
+from odbSessionClasses import *
+from odbResultCacheClasses import *
+from odbResultFileOperations import *
 
 #
 # Classes
@@ -38,7 +42,7 @@ class CrackVariable(object):
     #
     # Attributes (+ object initialization)
     #
-    def __init__(self, odbPath, stepName, crackName):
+    def __init__(self, odbPath, stepName, crackName, session=None, cache=None):
         """ return object with the desired attributes """
         
         # these attributes have properties (below) to protect the 
@@ -46,6 +50,12 @@ class CrackVariable(object):
         self._odbPath   = odbPath
         self._stepName  = stepName
         self._crackName = crackName.upper()
+        
+        # (optional) OdbSession which shares an open ODB
+        self.session = session
+        
+        # (optional) ResultCache of previously fetched results
+        self.cache = cache
     
         # these are set by getJintegral().
         # they are also pseudo-private because we don't want
@@ -55,6 +65,9 @@ class CrackVariable(object):
         self._contourLabels  = None
         self._contourNumbers = None
         self._resultData     = None
+        
+        # FieldResult of the resultData (see result)
+        self._fieldResult    = None
         return
         
     #
@@ -74,6 +87,28 @@ class CrackVariable(object):
         self.reset()
         return
 
+    @property
+    def session(self):
+        return self._session
+    
+    @session.setter
+    def session(self, session):
+        if (session is not None) and (not isinstance(session, OdbSession)):
+            raise TypeError('session must be an OdbSession (or None)!')
+        self._session = session
+        return
+
+    @property
+    def cache(self):
+        return self._cache
+    
+    @cache.setter
+    def cache(self, cache):
+        if (cache is not None) and (not isinstance(cache, ResultCache)):
+            raise TypeError('cache must be a ResultCache (or None)!')
+        self._cache = cache
+        return
+
     @property
     def stepName(self):
         return self._stepName
@@ -124,6 +159,24 @@ class CrackVariable(object):
     def resultData(self):
         return self._resultData
     
+    @property
+    def result(self):
+        """
+        FieldResult of the J-integral, with axes ('time', 'contour'),
+        where time is the runCompletion and the labels are the contour
+        numbers. shares (does not copy) resultData. None if not fetched.
+        the FieldResult is built once for each fetch.
+        """
+        if self._resultData is None:
+            return None
+        if (self._fieldResult is not None) and (self._fieldResult.data is self._resultData):
+            return self._fieldResult
+        contours = numpy.array([int(n) for n in self.contourNumbers], dtype=int)
+        self._fieldResult = FieldResult(self.crackName, self.runCompletion, self._resultData,
+                                        ('time', 'contour'), {'contour' : contours},
+                                        'contour')
+        return self._fieldResult
+    
     
     #
     # Methods
@@ -136,17 +189,32 @@ class CrackVariable(object):
         self._contourLabels  = None
         self._contourNumbers = None
         self._resultData     = None
+        self._fieldResult    = None
         return
 
     
     def fetchJintegral(self):
-        """ obtains the J-integral values for the crack """
+        """
+        obtains the J-integral values for the crack.
+        returns the FieldResult (see result)
+        """
+        
+        # results in the cache are loaded without opening the ODB
+        resultNames = ('_description', '_runCompletion', '_contourLabels',
+                       '_contourNumbers', '_resultData')
+        cacheKey = None
+        if self.cache is not None:
+            cacheKey = self.cache.key(self.odbPath, 'CrackVariable', self.stepName,
+                                      self.crackName, 'fetchJintegral')
+            attributes = self.cache.load(cacheKey)
+            if attributes is not None:
+                for name in resultNames:
+                    setattr(self, name, attributes[name])
+                return self.result
         
         # open the output database in read-only mode
-        if self.odbPath.endswith('.odb'):
-            odb = openOdb(self.odbPath, readOnly=True)
-        else:
-            odb = openOdb(self.odbPath + '.odb', readOnly=True)
+        # (or use the ODB of the session, if there is one)
+        odb = open_odb(self.odbPath, self.session)
         
         # define description string (per ABAQUS, and for user-info)
         description = 'J-integral'
@@ -216,14 +284,71 @@ class CrackVariable(object):
         self._contourLabels  = tuple(contourLabels)
         self._contourNumbers = tuple(contourNumbers)
         self._resultData     = resultData
-        return
         
-    def saveCSV(self):
+        # close output database
+        close_odb(odb, self.session)
+        
+        if cacheKey is not None:
+            self.cache.store(cacheKey, dict([(name, getattr(self, name))
+                                             for name in resultNames]))
+        return self.result
+        
+    def save(self, fileName=None, format='npz', compress=False, verbose=True):
+        """
+        saves the results (runCompletion, contour labels, resultData, etc.)
+        to one binary file, which can be loaded with load() without the ODB.
+        
+        fileName is optional. Default is named after the ODB and crack
+        (like saveCSV). format is 'npz' (default) or 'hdf5' (requires h5py).
+        If compress is True, the arrays are compressed.
+        
+        returns the name of the saved file
+        """
+        if self.resultData is None:
+            raise Exception('there are no results to save! (fetch them first)')
+        
+        if fileName is None:
+            odbName  = os.path.splitext(self.odbPath)[0]
+            fileName = safe_filename(odbName + '_' + self.description +
+                                     '_' + self.crackName)
+        
+        attributes = {'className'      : self.__class__.__name__,
+                      'odbPath'        : self.odbPath,
+                      'stepName'       : self.stepName,
+                      'crackName'      : self.crackName,
+                      'description'    : self.description,
+                      'runCompletion'  : self.runCompletion,
+                      'contourLabels'  : self.contourLabels,
+                      'contourNumbers' : self.contourNumbers,
+                      'resultData'     : self.resultData}
+        return save_results(fileName, attributes, format, compress, verbose)
+    
+    @classmethod
+    def load(cls, fileName, session=None, cache=None):
+        """
+        returns the CrackVariable saved (by save()) in fileName, with all
+        of its results. The ODB is not opened.
+        """
+        attributes = load_results(fileName)
+        if attributes.get('className') != cls.__name__:
+            raise TypeError('%s does not contain a %s!' % (fileName, cls.__name__))
+        
+        variable = cls(attributes['odbPath'], attributes['stepName'],
+                       attributes['crackName'], session=session, cache=cache)
+        variable._description    = attributes['description']
+        variable._runCompletion  = attributes['runCompletion']
+        variable._contourLabels  = attributes['contourLabels']
+        variable._contourNumbers = attributes['contourNumbers']
+        variable._resultData     = attributes['resultData']
+        return variable
+        
+    def saveCSV(self, compress=False):
         """
         saves resultData to a CSV file
 
         formatted so that each contour (contourLabels) is a column,
-        and each frame value (runCompletion) is a row
+        and each frame value (runCompletion) is a row.
+        If compress is True, the file is gzip compressed.
         """
         odbName = os.path.splitext(self.odbPath)[0]
         saveFileName = (odbName + '_' + self.description +
@@ -231,36 +356,18 @@ class CrackVariable(object):
         #ensure filename is safe to write
         saveFileName = safe_filename(saveFileName)
 
-        #delete any pre-existing file
-        check_delete(saveFileName)
-
-        #open file with write permissions
-        saveFile = open(saveFileName,'w')
+        #delete any pre-existing file, and open with write permissions
+        saveFile = open_csv(saveFileName, compress)
 
         #write contour name and number
-        line1 = '""'
-        line2 = '""'
-        for i in range(0,len(self.contourLabels)):
-            line1 += ', ' + self.contourLabels[i]
-            line2 += ', ' + self.contourNumbers[i]
-        line1 += '\n'
-        line2 += '\n'
+        line1 = '""' + ''.join([', ' + label for label in self.contourLabels]) + '\n'
+        line2 = '""' + ''.join([', ' + number for number in self.contourNumbers]) + '\n'
         saveFile.write(line1)
         saveFile.write(line2)
 
-        #begin writing resultData, prepend lines with runCompletion:
-        for i in range(0,len(self.runCompletion)):
-            #for all frames
-            line = str(self.runCompletion[i])
-
-            for k in range(0,len(self.contourLabels)):
-                #for all contours
-                line += ', ' + str(self.resultData[i,k])
-            line += '\n'
-
-            #write line for this frame
-            saveFile.write(line)
+        #write resultData in blocks, prepend lines with runCompletion
+        write_csv_rows(saveFile, self.resultData, self.runCompletion)
 
         #end program
         saveFile.close()
-        return
\ No newline at end of file
+        return
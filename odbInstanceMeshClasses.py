@@ -6,6 +6,16 @@ UC Davis
 File that contains a class for representing/retrieving 
 mesh information for an instance in the assembly of 
 an ABAQUS odb file.
+
+The meshes of several instances can be fetched with one ODB open
+with fetch_instance_meshes().
+
+The element connectivity is stored in a compressed (CSR) layout, so an
+instance may mix element types (e.g. C3D8R, C3D6, and C3D4):
+    mesh.connectNodes[mesh.connectOffsets[k]:mesh.connectOffsets[k+1]]
+are the nodes of element k. The elements are kept in instance order,
+and typeBlock() returns the elements of one type with their (nele,nnpe)
+connectivity, for vectorized work on that type.
 """
 
 #
@@ -16,6 +26,9 @@ from abaqusConstants import *
 import os
 import numpy
 from myFileOperations import *
+from odbBulkDataOperations import *
+from odbSessionClasses import *
+from odbResultCacheClasses import *
 
 #
 # object
@@ -24,7 +37,7 @@ class InstanceMesh(object):
     """ 
     mesh for a named instance in the Abaqus assembly
     
-    only works if all elements in the instance have the same number of nodes
+    the instance may mix element types (see the module doc string)
 
     Attributes:
         odbPath      = string of ODB file path name. 
@@ -34,28 +47,47 @@ class InstanceMesh(object):
                        You can also utilize partial matching, with the exactKey flag. Be very careful.
         exactKey     = (optional) logical True/False (Default True)
                        determines if partial matching is used
+        session      = (optional) OdbSession sharing an open ODB
+        cache        = (optional) ResultCache. If defined, a repeated fetchMesh()
+                       (of an unchanged ODB) is loaded without opening the ODB.
+                       the mesh is cached uncompressed, so that it loads quickly.
 
     Attributes set by fetchMesh():
         nodes       = numpy array vector of all node numbers
         nodesCoords = numpy array of the nodal coordinates
                       (e.g. nodesCoords[0] is the coordinates of node 1)
-        elements    = numpy array vector of all element numbers
+        elements       = numpy array vector of all element numbers
+        connectOffsets = numpy array of the start of the connectivity of each
+                         element in connectNodes (length is number of elements + 1)
+        connectNodes   = numpy array vector of the connectivity of every element
+        elemTypeCodes  = numpy array of the type of each element, as an
+                         index of elemTypes
+        elemTypes      = tuple of the element types (e.g. ('C3D8R', 'C3D6'))
+
+    Dependent Attributes:
         elemConnect = numpy array of the nodal connectivity for an element
-                      (e.g. elemConnect[0] is the connectivity of element 1)
-        elemType    = string of the type of element (e.g. 'CAX8R')
-                      assumes that all elements are the same type. invalid otherwise.
+                      (e.g. elemConnect[0] is the connectivity of element 1).
+                      a view of connectNodes. None if the elements do not
+                      all have the same number of nodes.
+        elemType    = string of the type of element (e.g. 'CAX8R'), or None
+                      if the instance mixes element types.
         
     Methods:
         fetchMesh()
+        typeBlock()
+        typeBlocks()
         saveCSV()
     """
     
-    def __init__(self, odbPath, instanceName, exactKey=True):
+    def __init__(self, odbPath, instanceName, exactKey=True, session=None,
+                 cache=None):
         """ create object with requested attributes """
         
         # set by input parameters
         self.odbPath      = odbPath
         self.instanceName = instanceName.upper()
+        self.session      = session
+        self.cache        = cache
         
         # this is set as a name-mangled attribute (see below)
         self.exactKey = exactKey
@@ -63,9 +95,14 @@ class InstanceMesh(object):
         # set by methods (read-only)
         self._nodes       = None
         self._nodesCoords = None
-        self._elements    = None
+        self._elements       = None
+        self._connectOffsets = None
+        self._connectNodes   = None
+        self._elemTypeCodes  = None
+        self._elemTypes      = None
+        
+        # set from the connectivity (see _setConnectivity)
         self._elemConnect = None
-        self._elemType    = None
         return
     
     # properties for read-only attributes
@@ -81,13 +118,31 @@ class InstanceMesh(object):
     def elements(self):
         return self._elements
     
+    @property
+    def connectOffsets(self):
+        return self._connectOffsets
+    
+    @property
+    def connectNodes(self):
+        return self._connectNodes
+    
+    @property
+    def elemTypeCodes(self):
+        return self._elemTypeCodes
+    
+    @property
+    def elemTypes(self):
+        return self._elemTypes
+    
     @property
     def elemConnect(self):
         return self._elemConnect
         
     @property
     def elemType(self):
-        return self._elemType
+        if (self._elemTypes is None) or (len(self._elemTypes) != 1):
+            return None
+        return self._elemTypes[0]
     
     # name mangled properties
     @property
@@ -108,15 +163,36 @@ class InstanceMesh(object):
         return self.odbPath.split('\\')[-1]
         
 
-    def fetchMesh(self):
-        """ obtain the mesh information """
+    def fetchMesh(self, bulk=True):
+        """
+        obtain the mesh information
+        
+        bulk is an optional input (default True). If True, the nodes and
+        elements are read in blocks (see read_instance_mesh), which is
+        much faster for large instances. If False, they are read one at a time.
+        """
+        #
+        # results in the cache are loaded without opening the ODB
+        #
+        resultNames = ('_nodes', '_nodesCoords', '_elements', '_connectOffsets',
+                       '_connectNodes', '_elemTypeCodes', '_elemTypes')
+        cacheKey = None
+        if self.cache is not None:
+            cacheKey = self.cache.key(self.odbPath, 'InstanceMesh', self.instanceName,
+                                      self.exactKey, 'fetchMesh', 'CSR',
+                                      'instanceOrder')
+            attributes = self.cache.load(cacheKey)
+            if attributes is not None:
+                for name in resultNames:
+                    setattr(self, name, attributes[name])
+                self._setConnectivity()
+                return
+        
         #
         # open the output database in read-only mode
+        # (or use the ODB of the session, if there is one)
         #
-        if self.odbPath.endswith('.odb'):
-            odb = openOdb(self.odbPath, readOnly=True)
-        else:
-            odb = openOdb(self.odbPath + '.odb', readOnly=True)
+        odb = open_odb(self.odbPath, self.session)
             
         #
         # figure out what our instance dictionary key is
@@ -143,58 +219,71 @@ class InstanceMesh(object):
         try:
             myInstance = odb.rootAssembly.instances[iKey]
         except KeyError:
-            odb.close()
+            close_odb(odb, self.session)
             msg = "instance " + str(iKey) + " is not defined in the assembly !\n"
             raise KeyError(msg)
         
-        # 
-        # determine the size of the problem
-        #
-        nnod = len( myInstance.nodes )     #number of nodes
-        nele = len( myInstance.elements )  #number of elements
-        nnpe = len( myInstance.elements[0].connectivity ) #number of nodes per element
-        
-        #
-        # obtain element type (assume instance is all the same type)
-        #
-        elemType = myInstance.elements[0].type
-        
         #
-        # preallocate arrays
+        # obtain node and element information/data
         #
-        nodes       = numpy.zeros((nnod,1), dtype=int)
-        elements    = numpy.zeros((nele,1), dtype=int)
-        nodesCoords = numpy.zeros((nnod,3), dtype=numpy.float64)
-        elemConnect = numpy.zeros((nele,nnpe), dtype=int)
-        
-        #
-        # obtain node information/data
-        #
-        for i,n in enumerate( myInstance.nodes ):
-            nodes[i,0]       = n.label
-            nodesCoords[i,:] = n.coordinates
-        
-        #
-        # obtain element information/data
-        #
-        for i,e in enumerate( myInstance.elements ):
-            elements[i,0]    = e.label
-            elemConnect[i,:] = e.connectivity
+        try:
+            mesh = read_instance_mesh(myInstance, bulk)
+        finally:
+            close_odb(odb, self.session)
         
         #
         # save to object attributes:
         #
-        self._nodes       = nodes
-        self._nodesCoords = nodesCoords
-        self._elements    = elements
-        self._elemConnect = elemConnect
-        self._elemType    = elemType
-        odb.close()
+        self._nodes          = mesh['nodes']
+        self._nodesCoords    = mesh['nodesCoords']
+        self._elements       = mesh['elements']
+        self._connectOffsets = mesh['connectOffsets']
+        self._connectNodes   = mesh['connectNodes']
+        self._elemTypeCodes  = mesh['elemTypeCodes']
+        self._elemTypes      = mesh['elemTypes']
+        self._setConnectivity()
+        
+        if cacheKey is not None:
+            self.cache.store(cacheKey, dict([(name, getattr(self, name))
+                                             for name in resultNames]),
+                             compress=False)
         return
 
+
+    def typeBlock(self, elemType):
+        """
+        returns [elements, elemConnect] of the elements of one type
+        (e.g. 'C3D6'), in instance order, where elemConnect is the
+        (nele,nnpe) array of their connectivity. both are copies, taken
+        from the mesh through the positions of the elements of that type.
+        """
+        if (self._elemTypes is None) or (elemType not in self._elemTypes):
+            raise KeyError('there are no %s elements in instance %s !'
+                           % (elemType, self.instanceName))
+        code = self._elemTypes.index(elemType)
+        index = numpy.nonzero(self._elemTypeCodes == code)[0]
+        starts = self._connectOffsets[index]
+        lengths = self._connectOffsets[index+1] - starts
+        nnpe = lengths[0]
+        if numpy.any(lengths != nnpe):
+            raise ValueError('the %s elements of instance %s do not all have '
+                             'the same number of nodes!' % (elemType, self.instanceName))
+        connect = self._connectNodes[starts[:,numpy.newaxis] + numpy.arange(nnpe)]
+        return [self._elements[index], connect]
+
+    def typeBlocks(self):
+        """
+        returns list of [elemType, elements, elemConnect] of every
+        element type (see typeBlock)
+        """
+        return [[elemType] + self.typeBlock(elemType) for elemType in self._elemTypes]
+
         
-    def saveCSV(self, saveDir=None):
-        """ saves CSV files to the requested directory """
+    def saveCSV(self, saveDir=None, compress=False):
+        """
+        saves CSV files to the requested directory.
+        If compress is True, the files are gzip compressed.
+        """
         #
         # determine save directory
         #
@@ -215,39 +304,73 @@ class InstanceMesh(object):
         odbName = os.path.basename(self.odbPath)
         odbName = os.path.splitext(odbName)[0]
         
-        # create file handles
-        dummy = saveDir + odbName + '_' + self.instanceName + '_nodesCoords.csv'
-        nodeFile = open(dummy,'w')
-        
-        dummy = saveDir + odbName + '_' + self.instanceName + '_elemConnect.csv'
-        elemFile = open(dummy,'w')
-        
-        # save to CSV
-        self.__saveArrayCSV(nodeFile, self.nodesCoords)
-        self.__saveArrayCSV(elemFile, self.elemConnect)
-        
-        # close file handles
-        nodeFile.close()
-        elemFile.close()
+        # save to CSV. rows are prepended with their # (i.e. node # or element #)
+        arrays = [('nodesCoords', self.nodesCoords, None)]
+        if self.elemConnect is not None:
+            arrays.append(('elemConnect', self.elemConnect, None))
+        else:
+            # one file per element type, with rows prepended by element label
+            for elemType,elements,elemConnect in self.typeBlocks():
+                arrays.append(('elemConnect_' + elemType, elemConnect, elements[:,0]))
+        for arrayName,array,rowLabels in arrays:
+            if rowLabels is None:
+                rowLabels = numpy.arange(1, len(array)+1)
+            dummy = saveDir + odbName + '_' + self.instanceName + '_' + arrayName + '.csv'
+            saveFile = open_csv(dummy, compress, verbose=False)
+            write_csv_rows(saveFile, array, rowLabels)
+            saveFile.close()
         return
-        
-    def __saveArrayCSV(self, fhandle, array):
-        """ 
-        writes array to CSV, given a file handle 
-        written for node and elemConnect arrays...
-        because CSV rows are prepended with their # (i.e. node # or element #)
+
+    #
+    # Private Methods
+    #
+    def _setConnectivity(self):
         """
-        
-        #determine shape of array
-        nrow,ncol = array.shape
-        
-        for row in range(0,nrow):
-            #start a new line
-            line = str(row+1)
-            for col in range(0,ncol):
-                line += ', ' + str(array[row,col])
-            #end of line, write to file
-            line += '\n'
-            fhandle.write(line)
-        
-        return
\ No newline at end of file
+        sets elemConnect, as a (nele,nnpe) view of connectNodes,
+        if every element has the same number of nodes
+        """
+        self._elemConnect = None
+        lengths = numpy.diff(self._connectOffsets)
+        if len(lengths) == 0:
+            self._elemConnect = self._connectNodes.reshape((0,0))
+        elif numpy.all(lengths == lengths[0]):
+            self._elemConnect = self._connectNodes.reshape((len(lengths), lengths[0]))
+        return
+
+
+#
+# Functions
+#
+
+def fetch_instance_meshes(odbPath, instanceNames=None, exactKey=True, bulk=True,
+                          session=None, cache=None):
+    """
+    fetches the meshes of several instances, with one ODB open.
+    
+    input:
+        odbPath       = string name of ODB file/location
+        instanceNames = (optional) sequence of instance names (see
+                        InstanceMesh). Default is every instance of the assembly.
+        exactKey, bulk, session, cache = (optional) see InstanceMesh
+    
+    returns a dict of fetched InstanceMesh objects, keyed by instanceName
+    """
+    # one ODB open for all of the instances (the session only opens it
+    # if an instance is not in the cache)
+    if session is None:
+        with OdbSession(odbPath) as session:
+            return fetch_instance_meshes(odbPath, instanceNames, exactKey, bulk,
+                                         session, cache)
+    
+    if instanceNames is None and session.useMetadata:
+        # from the sidecar metadata, without opening the ODB
+        instanceNames = session.metadata.instanceNames
+    elif instanceNames is None:
+        instanceNames = session.odb.rootAssembly.instances.keys()
+    
+    meshes = {}
+    for instanceName in instanceNames:
+        mesh = InstanceMesh(odbPath, instanceName, exactKey, session, cache)
+        mesh.fetchMesh(bulk)
+        meshes[mesh.instanceName] = mesh
+    return meshes
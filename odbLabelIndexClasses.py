@@ -0,0 +1,175 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for mapping the (node or element) labels of a set to dense
+positions 0...n-1.
+
+Abaqus labels are numbered per instance, and are not necessarily
+contiguous (or start at 1). Rather than scattering each frame into a
+scratch array sized to the largest label of the instance (and indexing
+it with label-1), the labels of a frame are located in the sorted set
+labels with a binary search. The memory and work per frame then only
+depend on the size of the set.
+
+Since labels are only unique within an instance, every entry is keyed
+by (instance name, label), so a set may span several instances.
+"""
+
+#
+# Import Modules
+#
+import numpy
+
+#
+# Classes
+#
+
+class LabelIndex(object):
+    """
+    maps (instance, label) keys to their position in the sorted (unique)
+    keys of a set. Keys are sorted by instance name, then by label.
+
+    Attributes:
+        labels        = numpy int array of the label of each position
+        instances     = tuple of the instance name of each position
+        instanceNames = tuple of the (sorted) unique instance names
+
+    Methods:
+        fromSetMembers() (classmethod)
+        find()
+        index()
+    """
+
+    def __init__(self, labels, instances):
+        """
+        create index of labels (any order, duplicates are ignored).
+        instances is the instance name of each label, or a single
+        instance name for all of the labels.
+        """
+        labels = numpy.asarray(labels, dtype=numpy.int64)
+        if isinstance(instances, str):
+            instances = [instances]*len(labels)
+        if len(instances) != len(labels):
+            raise ValueError('every label must have an instance!')
+
+        self._instanceNames = tuple(sorted(set(instances)))
+        # labels are combined with the instance number into one int64 key.
+        # the labels are offset by the smallest label, so that negative
+        # labels (e.g. -1 of a reduced result) are supported
+        self._offset = numpy.int64(0)
+        self._base   = numpy.int64(1)
+        if len(labels) > 0:
+            self._offset = numpy.int64(labels.min())
+            self._base   = numpy.int64(labels.max()) - self._offset + 1
+        codes = self._instanceCodes(instances)
+        keys  = numpy.unique(codes*self._base + (labels - self._offset))
+
+        self._keys      = keys
+        self._labels    = (keys % self._base + self._offset).astype(int)
+        self._instances = tuple([self._instanceNames[c] for c in (keys // self._base)])
+        return
+
+    @classmethod
+    def fromSetMembers(cls, members):
+        """
+        create index from the nodes (or elements) of an Abaqus set,
+        i.e. mySet.nodes or mySet.elements, which contain a sequence
+        of nodes (or elements) for each instance of the set.
+        """
+        labels    = []
+        instances = []
+        for instanceMembers in members:
+            for m in instanceMembers:
+                labels.append(m.label)
+                instances.append(m.instanceName)
+        return cls(labels, instances)
+
+    #
+    # Getters
+    #
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def instances(self):
+        return self._instances
+
+    @property
+    def instanceNames(self):
+        return self._instanceNames
+
+    #
+    # Methods
+    #
+    def __len__(self):
+        return len(self._keys)
+
+    def find(self, labels, instances=None):
+        """
+        locates (instance, label) keys in the index. instances is a
+        sequence of the instance name of each label; it may be omitted
+        if the index only contains one instance.
+
+        returns [positions, found]
+            positions = numpy int array of the position of each key
+                        (only meaningful where found is True)
+            found     = numpy bool array, True if the key is in the index
+        """
+        labels = numpy.asarray(labels, dtype=numpy.int64)
+        if len(self._keys) == 0:
+            return numpy.zeros(len(labels), dtype=int), numpy.zeros(len(labels), dtype=bool)
+
+        if len(self._instanceNames) == 1:
+            # every key has the same instance, no need to look it up
+            codes = numpy.zeros(len(labels), dtype=numpy.int64)
+            valid = numpy.ones(len(labels), dtype=bool)
+        elif instances is None:
+            raise ValueError('instances are required for a multi-instance index!')
+        else:
+            codes,valid = self._findInstances(instances)
+
+        # labels beyond the key range would alias another instance
+        labels = labels - self._offset
+        valid &= (labels >= 0) & (labels < self._base)
+        keys = codes*self._base + labels
+
+        positions = numpy.searchsorted(self._keys, keys)
+        # keys past the end of the index are not found
+        positions[positions == len(self._keys)] = 0
+        found = valid & (self._keys[positions] == keys)
+        return positions, found
+
+    def index(self, labels, instances=None):
+        """
+        returns numpy int array of the position of each (instance, label).
+        raises KeyError if any key is not in the index.
+        """
+        positions,found = self.find(labels, instances)
+        if not found.all():
+            missing = numpy.asarray(labels, dtype=int)[~found]
+            raise KeyError('label %i is not in the index!' % missing[0])
+        return positions
+
+    #
+    # Private Methods
+    #
+    def _instanceCodes(self, instances):
+        """ returns the instance number of each of the (known) instances """
+        codes,valid = self._findInstances(instances)
+        return codes
+
+    def _findInstances(self, instances):
+        """ returns [instance number, found] of each instance name """
+        names = numpy.array(self._instanceNames)
+        instances = numpy.asarray(instances)
+        if len(instances) == 0:
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=bool)
+        codes = numpy.searchsorted(names, instances)
+        codes[codes == len(names)] = 0
+        return codes.astype(numpy.int64), (names[codes] == instances)
@@ -0,0 +1,393 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for an index of the metadata of an Abaqus ODB.
+
+Checking that a set (or field output) exists, or counting the frames of
+an analysis, requires opening the ODB and walking its steps and frames.
+OdbMetadata scans an ODB once, and writes what it finds to a small
+sidecar file next to the ODB (e.g. example_metadata.json):
+    * the steps, and the time of each frame
+    * the field outputs of each frame, with their positions and
+      component labels
+    * the assembly node and element sets, with their instances and sizes
+    * the number of nodes and elements of each instance
+The sidecar is keyed by the size and modification time of the ODB, so
+it is scanned again (only) when the ODB changes. Quantities which are
+expensive to determine, such as the number of integration points of a
+set, are added to the sidecar when they are first determined.
+
+Example:
+    metadata = OdbMetadata.forOdb('example.odb')
+    print metadata.stepNames, metadata.numFrames()
+    print metadata.hasSet('ELEMENT', 'MYSET'), metadata.setSize('ELEMENT', 'MYSET')
+
+A session can use the sidecar for set and field validation, and for the
+frame timeline, with OdbSession('example.odb', useMetadata=True).
+"""
+
+#
+# Import Modules
+#
+from odbAccess import *
+from abaqusConstants import *
+import os
+import json
+from odbTimelineClasses import *
+from myFileOperations import *
+
+#
+# Constants
+#
+
+# appended to the ODB name (without .odb) to name the sidecar file
+METADATA_SUFFIX = '_metadata.json'
+
+# version of the sidecar format. sidecars of other versions are rescanned
+METADATA_VERSION = 2
+
+#
+# Classes
+#
+
+class OdbMetadata(object):
+    """
+    the metadata of an ODB, see the module doc string
+
+    Attributes:
+        odbPath       = string of the ODB file path name
+        fileName      = string name of the sidecar file (or None, if the
+                        metadata has not been saved)
+        stepNames     = tuple of the step names, in analysis order
+        instanceNames = tuple of the instance names
+        fieldNames    = tuple of the names of every field output (of any frame)
+
+    Methods:
+        forOdb() (classmethod)
+        fromOdb() (classmethod)
+        load() (classmethod)
+        save()
+        isCurrent()
+        frames()
+        timeline()
+        numFrames()
+        frameFields()
+        hasField()
+        fieldInfo()
+        hasSet()
+        setSize()
+        setInstances()
+        instanceSize()
+        intPoints()
+        recordIntPoints()
+    """
+
+    def __init__(self, info, fileName=None):
+        """ create from the (JSON) dict of a scan, see fromOdb() """
+        self._info     = info
+        self._fileName = fileName
+        return
+
+    @classmethod
+    def forOdb(cls, odbPath, session=None, rebuild=False):
+        """
+        returns the metadata of an ODB, from its sidecar file if it is
+        current. Otherwise, the ODB is scanned (using the open ODB of
+        session, if given) and the sidecar is (re)written. If the sidecar
+        cannot be written (e.g. a read-only folder), the metadata is
+        still returned.
+
+        rebuild is an optional input (default False). If True, the ODB
+        is always scanned again.
+        """
+        fileName = metadata_file(odbPath)
+        if (not rebuild) and os.path.isfile(fileName):
+            try:
+                metadata = cls.load(fileName)
+                if metadata.isCurrent(odbPath):
+                    return metadata
+            except (IOError, ValueError, KeyError):
+                # incomplete or corrupt sidecar. rescan
+                pass
+
+        if session is not None:
+            metadata = cls.fromOdb(session.odb, odbPath)
+        else:
+            odb = openOdb(odb_file_path(odbPath), readOnly=True)
+            try:
+                metadata = cls.fromOdb(odb, odbPath)
+            finally:
+                odb.close()
+        try:
+            metadata.save(fileName)
+        except (IOError, OSError):
+            pass
+        return metadata
+
+    @classmethod
+    def fromOdb(cls, odb, odbPath):
+        """ scans an open odb (of the file odbPath), and returns its metadata """
+        odbFile = odb_file_path(odbPath)
+        stat = os.stat(odbFile)
+        info = {'version'      : METADATA_VERSION,
+                'odbFile'      : os.path.abspath(odbFile),
+                'size'         : stat.st_size,
+                'mtime'        : stat.st_mtime,
+                'steps'        : [],
+                'fieldSets'    : [],
+                'fieldOutputs' : {},
+                'sets'         : {'NODE' : {}, 'ELEMENT' : {}},
+                'instances'    : {},
+                'intPoints'    : {}}
+
+        #
+        # steps and frames. the field outputs of each frame are stored
+        # as an index into the list of unique sets of field names
+        #
+        fieldSets = {}
+        for stepName in odb.steps.keys():
+            step = odb.steps[stepName]
+            frameValues = []
+            frameFields = []
+            for frame in step.frames:
+                names = tuple(sorted(frame.fieldOutputs.keys()))
+                if names not in fieldSets:
+                    fieldSets[names] = len(info['fieldSets'])
+                    info['fieldSets'].append(list(names))
+                for name in names:
+                    if name not in info['fieldOutputs']:
+                        info['fieldOutputs'][name] = \
+                            _field_info(frame.fieldOutputs[name])
+                frameValues.append(frame.frameValue)
+                frameFields.append(fieldSets[names])
+            info['steps'].append({'name'        : stepName,
+                                  'totalTime'   : step.totalTime,
+                                  'frameValues' : frameValues,
+                                  'fieldSets'   : frameFields})
+
+        #
+        # assembly sets and instances
+        #
+        assembly = odb.rootAssembly
+        for setType,sets in (('NODE', assembly.nodeSets),
+                             ('ELEMENT', assembly.elementSets)):
+            for setName in sets.keys():
+                mySet = sets[setName]
+                if setType == 'NODE':
+                    members = mySet.nodes
+                else:
+                    members = mySet.elements
+                if members is None:
+                    members = ()
+                info['sets'][setType][setName] = \
+                    {'instances' : [str(name) for name in mySet.instanceNames],
+                     'sizes'     : [len(m) for m in members]}
+        for instanceName in assembly.instances.keys():
+            instance = assembly.instances[instanceName]
+            info['instances'][instanceName] = {'nodes'    : len(instance.nodes),
+                                               'elements' : len(instance.elements)}
+        return cls(info)
+
+    @classmethod
+    def load(cls, fileName):
+        """ returns the metadata saved in a sidecar file """
+        f = open(fileName, 'r')
+        try:
+            info = _from_unicode(json.load(f))
+        finally:
+            f.close()
+        if info.get('version') != METADATA_VERSION:
+            raise ValueError('%s is not a current metadata file!' % fileName)
+        return cls(info, fileName)
+
+    #
+    # Getters
+    #
+    @property
+    def odbPath(self):
+        return self._info['odbFile']
+
+    @property
+    def fileName(self):
+        return self._fileName
+
+    @property
+    def stepNames(self):
+        return tuple([step['name'] for step in self._info['steps']])
+
+    @property
+    def instanceNames(self):
+        return tuple(sorted(self._info['instances'].keys()))
+
+    @property
+    def fieldNames(self):
+        return tuple(sorted(self._info['fieldOutputs'].keys()))
+
+    #
+    # Methods
+    #
+    def save(self, fileName=None):
+        """ writes the sidecar file (by default, next to the ODB) """
+        if fileName is None:
+            fileName = metadata_file(self.odbPath)
+        f = open(fileName, 'w')
+        try:
+            json.dump(self._info, f, sort_keys=True)
+        finally:
+            f.close()
+        self._fileName = fileName
+        return
+
+    def isCurrent(self, odbPath=None):
+        """ True if the ODB file has not changed since it was scanned """
+        if odbPath is None:
+            odbPath = self.odbPath
+        try:
+            stat = os.stat(odb_file_path(odbPath))
+        except OSError:
+            return False
+        return (stat.st_size == self._info['size'] and
+                stat.st_mtime == self._info['mtime'])
+
+    def frames(self):
+        """ returns list of (stepName, frameIndex, totalTime) of every frame """
+        frames = []
+        for step in self._info['steps']:
+            for i,frameValue in enumerate(step['frameValues']):
+                frames.append((step['name'], i, step['totalTime'] + frameValue))
+        return frames
+
+    def timeline(self, tolerance=DEFAULT_TIME_TOLERANCE):
+        """
+        returns the FrameTimeline of the unique frames (the same as
+        FrameTimeline.fromOdb, without walking the frames of the ODB)
+        """
+        return FrameTimeline.fromFrames(self.frames(), tolerance)
+
+    def numFrames(self, stepName=None):
+        """ number of frames of a step (or of all steps, including duplicates) """
+        return sum([len(step['frameValues']) for step in self._info['steps']
+                    if (stepName is None) or (step['name'] == stepName)])
+
+    def frameFields(self, stepName=None, frameIndex=-1):
+        """
+        returns tuple of the field output names of a frame. by default,
+        the last frame of the last step.
+        """
+        step = self._step(stepName)
+        return tuple(self._info['fieldSets'][step['fieldSets'][frameIndex]])
+
+    def hasField(self, keyName, stepName=None, frameIndex=-1):
+        """ True if keyName is a field output of a frame (see frameFields) """
+        return keyName in self.frameFields(stepName, frameIndex)
+
+    def fieldInfo(self, keyName):
+        """
+        returns dict of a field output, with 'description', 'positions'
+        (e.g. ['INTEGRATION_POINT']), and 'componentLabels'
+        """
+        return self._info['fieldOutputs'][keyName]
+
+    def hasSet(self, setType, setName):
+        """ True if the assembly set (setType 'NODE' or 'ELEMENT') exists """
+        return setName in self._info['sets'][setType.upper()]
+
+    def setSize(self, setType, setName):
+        """ number of nodes (or elements) of an assembly set, over all instances """
+        return sum(self._set(setType, setName)['sizes'])
+
+    def setInstances(self, setType, setName):
+        """ tuple of the instance names of an assembly set """
+        return tuple(self._set(setType, setName)['instances'])
+
+    def instanceSize(self, instanceName):
+        """ returns [number of nodes, number of elements] of an instance """
+        instance = self._info['instances'][instanceName]
+        return [instance['nodes'], instance['elements']]
+
+    def intPoints(self, keyName, setName, elemTypes):
+        """
+        number of integration point values of keyName in an element set
+        of the element types elemTypes (a sequence of names, e.g. 'C3D8R'),
+        or None if it has not been recorded (see recordIntPoints)
+        """
+        return self._info['intPoints'].get(_int_points_key(keyName, setName, elemTypes))
+
+    def recordIntPoints(self, keyName, setName, elemTypes, numips):
+        """
+        records the number of integration point values of keyName in an
+        element set of the element types elemTypes, and updates the
+        sidecar file (if there is one)
+        """
+        self._info['intPoints'][_int_points_key(keyName, setName, elemTypes)] = int(numips)
+        if self._fileName is not None:
+            try:
+                self.save(self._fileName)
+            except (IOError, OSError):
+                pass
+        return
+
+    #
+    # Private Methods
+    #
+    def _step(self, stepName=None):
+        """ returns the dict of a step (the last step, by default) """
+        if stepName is None:
+            return self._info['steps'][-1]
+        for step in self._info['steps']:
+            if step['name'] == stepName:
+                return step
+        raise KeyError('step %s is not in the ODB!' % stepName)
+
+    def _set(self, setType, setName):
+        """ returns the dict of an assembly set """
+        try:
+            return self._info['sets'][setType.upper()][setName]
+        except KeyError:
+            raise KeyError('Assembly level %s set named %s does not exist '
+                           'in the output database %s !'
+                           % (setType, setName, self.odbPath))
+
+
+#
+# Functions
+#
+
+def metadata_file(odbPath):
+    """ returns the name of the sidecar metadata file of an ODB """
+    return os.path.splitext(odb_file_path(odbPath))[0] + METADATA_SUFFIX
+
+
+#
+# Private Functions
+#
+
+def _field_info(fieldOutput):
+    """ returns the (JSON) dict of the definition of a field output """
+    return {'description'     : str(getattr(fieldOutput, 'description', '')),
+            'positions'       : [str(location.position)
+                                 for location in fieldOutput.locations],
+            'componentLabels' : [str(label) for label in fieldOutput.componentLabels]}
+
+def _int_points_key(keyName, setName, elemTypes):
+    """
+    key of the number of integration point values of keyName in an
+    element set. the element types are part of the key, since the
+    number of integration points depends on them.
+    """
+    return '|'.join([keyName, setName] + sorted(set([str(t) for t in elemTypes])))
+
+def _from_unicode(value):
+    """ converts the unicode strings of a JSON object to str """
+    if isinstance(value, dict):
+        return dict([(_from_unicode(k), _from_unicode(v)) for k,v in value.items()])
+    if isinstance(value, list):
+        return [_from_unicode(v) for v in value]
+    if isinstance(value, unicode):
+        return str(value)
+    return value
@@ -0,0 +1,249 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Functions for fetching the frames of a field variable in parallel.
+
+The frames of an ODB are independent, so the (selected) frame timeline
+is split into contiguous blocks, and each block is fetched by a worker
+process which opens its own read-only copy of the ODB. The blocks are
+then stitched back together in time order. Every frame is computed by
+the same code as the serial fetch methods, so the results are identical.
+
+Example:
+    mises = IntPtVariable('example.odb', 'MISES', 'MYSET')
+    fetch_parallel(mises, 'fetchNodalAverage', numWorkers=8)
+    # mises.resultData is now the same as after mises.fetchNodalAverage()
+
+Be aware that on Windows, multiprocessing starts new python processes;
+run the calling script with "abaqus python" so that the workers can
+import odbAccess, and protect the script with if __name__ == '__main__'
+"""
+
+#
+# Import Modules
+#
+import multiprocessing
+import inspect
+import time
+import numpy
+from odbSessionClasses import *
+from odbTimelineClasses import *
+
+#
+# Constants
+#
+
+# inputs of every fetch method, which are not (fetch method specific) options
+FETCH_INPUTS = ('bulk', 'steps', 'timeRange', 'stride', 'frames', 'incremental')
+
+#
+# Functions
+#
+
+def fetch_parallel(variable, method, numWorkers=None, bulk=True, steps=None,
+                   timeRange=None, stride=1, frames=None, **options):
+    """
+    fetches a field variable using a pool of worker processes.
+    the attributes of variable are set exactly as if
+    getattr(variable, method)(bulk, steps, ..., **options) had been called,
+    and the FieldResult of the fetch is returned (see fieldVariable.result).
+
+    input:
+        variable   = IntPtVariable, NodalVariable, or ElementVariable
+        method     = string name of the fetch method (e.g. 'fetchIntPtData')
+        numWorkers = (optional) number of worker processes.
+                     Default is the number of CPUs.
+        bulk, steps, timeRange, stride, frames = (optional) same as the
+                     inputs of the fetch method
+        options    = (optional) other keyword inputs of the fetch method
+                     (e.g. weighting and statistics of fetchElementAverage),
+                     which are passed to every worker
+    """
+    selection = FrameSelection(steps, timeRange, stride, frames)
+    options   = _fetch_options(variable, method, options)
+
+    # results in the cache are loaded without opening the ODB
+    cacheKey = variable._cacheKey(method, selection, options)
+    if variable._loadCache(cacheKey):
+        return variable.result
+
+    # determine the selected frames, as indices into the full timeline
+    timeTolerance = DEFAULT_TIME_TOLERANCE
+    useMetadata   = False
+    if variable.session is not None:
+        timeTolerance = variable.session.timeTolerance
+        # the workers read the sidecar metadata written by this session
+        useMetadata   = variable.session.useMetadata
+    odb = open_odb(variable.odbPath, variable.session)
+    try:
+        timeline = variable._timeline(odb)
+    finally:
+        close_odb(odb, variable.session)
+    indices = selection.indices(timeline)
+    if len(indices) == 0:
+        raise ValueError(variable._noFramesMessage(selection))
+
+    # split the frames into contiguous blocks, one per worker
+    if numWorkers is None:
+        numWorkers = multiprocessing.cpu_count()
+    numWorkers = max(1, min(int(numWorkers), len(indices)))
+    tasks = [(variable.__class__, variable.odbPath, variable.dataName,
+              variable.setName, variable.float32, timeTolerance, useMetadata,
+              method, bulk, options, tuple(block))
+             for block in numpy.array_split(indices, numWorkers)]
+
+    # fetch the blocks
+    if numWorkers == 1:
+        results = [_fetch_block(tasks[0])]
+    else:
+        pool = multiprocessing.Pool(numWorkers)
+        try:
+            results = pool.map(_fetch_block, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    # stitch the blocks together, in time order
+    numframes  = sum([len(r['_totalTime']) for r in results])
+    frameShape = results[0]['_resultData'].shape[1:]
+    resultData = variable._allocateResult((numframes,) + frameShape, method,
+                                          results[0]['_resultData'].dtype)
+    f = 0
+    for r in results:
+        n = len(r['_totalTime'])
+        resultData[f:f+n] = r['_resultData']
+        f += n
+    if isinstance(resultData, numpy.memmap):
+        resultData.flush()
+
+    # the statistics (if requested) are stitched together the same way
+    statisticData = None
+    if results[0]['_statisticData'] is not None:
+        statisticData = {}
+        for name,data in results[0]['_statisticData'].items():
+            statisticData[name] = variable._allocateResult((numframes,) + data.shape[1:],
+                                                           method + '_' + name, data.dtype)
+            f = 0
+            for r in results:
+                n = len(r['_totalTime'])
+                statisticData[name][f:f+n] = r['_statisticData'][name]
+                f += n
+            if isinstance(statisticData[name], numpy.memmap):
+                statisticData[name].flush()
+
+    # all other attributes (labels, etc.) are the same for every block
+    for name,value in results[0].items():
+        setattr(variable, name, value)
+    variable._totalTime  = tuple(numpy.concatenate([r['_totalTime'] for r in results]))
+    variable._resultData = resultData
+    variable._statisticData = statisticData
+    # the last frame is in the last block, so an incremental fetch continues from there
+    variable._lastFrame  = results[-1]['_lastFrame']
+    variable._fetchKey   = variable._queryKey(selection, options)
+    variable._storeCache(cacheKey)
+    return variable.result
+
+
+def benchmark_parallel(variable, method, workerCounts=(1,2,4,8), bulk=True,
+                       verbose=True, **inputs):
+    """
+    times fetch_parallel() of a field variable for each number of
+    workers in workerCounts, and checks that every result is identical
+    to the serial fetch method.
+
+    inputs are the (optional) frame selection inputs of the fetch method
+    (steps, timeRange, stride, frames), and any of its other options.
+    the ResultCache of the variable (if any) is not used by the timed
+    fetches, so every fetch reads the ODB.
+
+    returns a dict of {number of workers : (seconds, speedup)}, where
+    the speedup is relative to the serial fetch method
+    """
+    cache = variable.cache
+    variable.cache = None
+    try:
+        # serial reference
+        start = time.time()
+        getattr(variable, method)(bulk=bulk, **inputs)
+        serialTime = time.time() - start
+        reference  = numpy.array(variable.resultData)
+        referenceStatistics = dict([(name, numpy.array(data)) for name,data
+                                    in (variable.statisticData or {}).items()])
+
+        timing = {}
+        for numWorkers in workerCounts:
+            start = time.time()
+            fetch_parallel(variable, method, numWorkers, bulk, **inputs)
+            elapsed = time.time() - start
+
+            statistics = variable.statisticData or {}
+            if not (numpy.array_equal(reference, numpy.asarray(variable.resultData)) and
+                    sorted(statistics.keys()) == sorted(referenceStatistics.keys()) and
+                    all([numpy.array_equal(referenceStatistics[name],
+                                           numpy.asarray(statistics[name]))
+                         for name in statistics])):
+                raise Exception('parallel results with %i workers are not '
+                                'identical to the serial results!' % numWorkers)
+            timing[numWorkers] = (elapsed, serialTime/elapsed)
+    finally:
+        variable.cache = cache
+
+    if verbose:
+        print "\n%s.%s of %s (%s):" % (variable.__class__.__name__, method,
+                                       variable.dataName, variable.setName)
+        print "    serial    : %10.3f s" % (serialTime)
+        for numWorkers in workerCounts:
+            print "    %2i workers: %10.3f s, speedup %6.2fx" % \
+                  ((numWorkers,) + timing[numWorkers])
+    return timing
+
+
+#
+# Private Functions
+#
+
+def _fetch_block(task):
+    """
+    worker function for fetch_parallel(). fetches one block of frames
+    with its own ODB, and returns the (private) attributes of the variable.
+    """
+    (cls, odbPath, dataName, setName, float32, timeTolerance, useMetadata,
+     method, bulk, options, frames) = task
+    with OdbSession(odbPath, timeTolerance, useMetadata) as session:
+        variable = cls(odbPath, dataName, setName, session=session, float32=float32)
+        getattr(variable, method)(bulk=bulk, frames=frames, **(options or {}))
+
+    attributes = {}
+    for name,value in variable.__dict__.items():
+        if name in variable._definitionAttributes + variable._derivedAttributes:
+            # definition of the variable (or derived from it), not results
+            continue
+        attributes[name] = value
+    return attributes
+
+
+def _fetch_options(variable, method, options):
+    """
+    returns the options dict of a fetch method, with the default value
+    of every option which is not given (i.e. the same dict as the serial
+    fetch method, so that the cache and incremental fetches are shared),
+    or None if the method does not have any options.
+    """
+    spec = inspect.getargspec(getattr(variable, method))
+    defaults = dict(zip(spec.args[len(spec.args)-len(spec.defaults or ()):],
+                        spec.defaults or ()))
+    names = [name for name in defaults if name not in FETCH_INPUTS]
+    for name in options:
+        if name not in names:
+            raise TypeError('%s() got an unexpected keyword argument \'%s\''
+                            % (method, name))
+    if not names:
+        return None
+    fetchOptions = dict([(name, defaults[name]) for name in names])
+    fetchOptions.update(options)
+    return fetchOptions
@@ -0,0 +1,254 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Registry of the (integration point) quantities which can be fetched
+by name, i.e. the dataName of an IntPtVariable.
+
+A quantity is defined by the Abaqus field output it is obtained from
+(its keyName, e.g. 'S' or 'LE'), and either:
+    * the FieldValue attribute which holds it (e.g. 'data', 'mises'), or
+    * a function of the component array of the field output, which
+      returns the quantity of every value (e.g. the stress triaxiality).
+Derived quantities are calculated with numpy from the components of
+each frame, which are read in bulk (once for all of the quantities of
+the same field output, see fetch_intpt_variables).
+
+User-defined quantities can be registered without editing this module:
+    def max_shear(components, componentLabels):
+        principal = principal_values(components, componentLabels)
+        return 0.5*(principal[:,2] - principal[:,0])
+    register_quantity('MAXSHEAR', 'S', max_shear)
+    tau = IntPtVariable('example.odb', 'MAXSHEAR', 'MYSET')
+"""
+
+#
+# Import Modules
+#
+import numpy
+from odbBulkDataOperations import *
+
+#
+# Classes
+#
+
+class FieldQuantity(object):
+    """
+    definition of a quantity, see the module doc string
+
+    Attributes:
+        name      = string name of the quantity (upper-case), i.e. the dataName
+        keyName   = string name of the Abaqus field output (e.g. 'S')
+        abqAttrib = string name of the FieldValue attribute which is read
+                    (e.g. 'data' or 'mises'). Default 'data'
+        function  = (optional) function(components, componentLabels) which
+                    returns the numpy float64 vector of the quantity, given
+                    the (value, component) array of abqAttrib, and the
+                    component labels of the field output (e.g. 'S11','S22')
+
+    Methods:
+        evaluate()
+    """
+
+    def __init__(self, name, keyName, function=None, abqAttrib='data'):
+        """ define the quantity """
+        if (function is not None) and (not callable(function)):
+            raise TypeError('function must be callable (or None)!')
+        self._name      = name.upper()
+        self._keyName   = keyName
+        self._function  = function
+        self._abqAttrib = abqAttrib
+        return
+
+    #
+    # Getters
+    #
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def keyName(self):
+        return self._keyName
+
+    @property
+    def abqAttrib(self):
+        return self._abqAttrib
+
+    @property
+    def function(self):
+        return self._function
+
+    #
+    # Methods
+    #
+    def evaluate(self, data, componentLabels):
+        """
+        returns the quantity of each value, given the data of abqAttrib
+        (as returned by read_field_values) and the component labels
+        """
+        if self.function is None:
+            return data
+        values = self.function(data, componentLabels)
+        return numpy.asarray(values, dtype=numpy.float64).reshape(len(data))
+
+
+#
+# Functions
+#
+
+def register_quantity(name, keyName, function=None, abqAttrib='data', replace=False):
+    """
+    adds a quantity to the registry (see FieldQuantity for the inputs).
+    raises KeyError if the name is already registered, unless replace
+    is True. returns the FieldQuantity
+    """
+    quantity = FieldQuantity(name, keyName, function, abqAttrib)
+    if (quantity.name in _QUANTITIES) and (not replace):
+        raise KeyError('quantity %s is already registered!' % quantity.name)
+    _QUANTITIES[quantity.name] = quantity
+    return quantity
+
+
+def get_quantity(name):
+    """ returns the registered FieldQuantity of name """
+    try:
+        return _QUANTITIES[name.upper()]
+    except KeyError:
+        raise KeyError('dataName %s has not been programmed! (yet?) '
+                       'see register_quantity()' % name)
+
+
+def quantity_names():
+    """ returns the sorted names of the registered quantities """
+    return sorted(_QUANTITIES.keys())
+
+
+def tensor_component(label):
+    """
+    returns a function(components, componentLabels) of the tensor
+    component label (e.g. 'S12'). a component which is not in the
+    output (e.g. S13 of a plane strain element) is zero.
+    """
+    def component(components, componentLabels):
+        i = int(label[-2]) - 1
+        j = int(label[-1]) - 1
+        return full_tensor(components, componentLabels)[:,i,j]
+    return component
+
+
+def strain_tensor(components, componentLabels):
+    """
+    full 3x3 tensors of Abaqus strain components. Abaqus outputs the
+    engineering shear strains (e.g. LE12 = 2*eps12), which are halved.
+    """
+    T = full_tensor(components, componentLabels)
+    for i,j in ((0,1), (0,2), (1,2)):
+        T[:,i,j] *= 0.5
+        T[:,j,i] *= 0.5
+    return T
+
+
+def principal_values(components, componentLabels):
+    """ returns (value, 3) array of the principal values, in ascending order """
+    return numpy.linalg.eigvalsh(full_tensor(components, componentLabels))
+
+
+def triaxiality(components, componentLabels):
+    """ stress triaxiality, i.e. the mean stress over the Mises stress """
+    mean  = -stress_invariant(components, componentLabels, 'press')
+    mises = stress_invariant(components, componentLabels, 'mises')
+    return _divide(mean, mises)
+
+
+def lode_parameter(components, componentLabels):
+    """
+    Lode parameter (2*s2 - s1 - s3)/(s1 - s3), of the principal stresses
+    s1 >= s2 >= s3. ranges from -1 (axisymmetric tension) to +1
+    (axisymmetric compression), and is 0 for generalized shear.
+    """
+    principal = principal_values(components, componentLabels)
+    s3,s2,s1 = principal[:,0], principal[:,1], principal[:,2]
+    return _divide(2.0*s2 - s1 - s3, s1 - s3)
+
+
+def lode_angle_parameter(components, componentLabels):
+    """
+    normalized Lode angle parameter, 1 - 2/pi*arccos((r/q)**3), where q
+    is the Mises stress and r is the third invariant (inv3). ranges from
+    +1 (axisymmetric tension) to -1 (axisymmetric compression).
+    """
+    q = stress_invariant(components, componentLabels, 'mises')
+    r = stress_invariant(components, componentLabels, 'inv3')
+    xi = numpy.clip(_divide(r, q)**3, -1.0, 1.0)
+    return 1.0 - 2.0/numpy.pi*numpy.arccos(xi)
+
+
+def equivalent_strain(components, componentLabels):
+    """ (von Mises) equivalent strain, sqrt(2/3 e:e) of the strain deviator e """
+    T = strain_tensor(components, componentLabels)
+    trace = T[:,0,0] + T[:,1,1] + T[:,2,2]
+    for i in range(0,3):
+        T[:,i,i] -= trace/3.0
+    return numpy.sqrt( 2.0/3.0*(T*T).sum(axis=2).sum(axis=1) )
+
+
+#
+# Private Functions
+#
+
+def _divide(a, b):
+    """ a/b, which is zero where b is zero (e.g. an unstressed element) """
+    result = numpy.zeros(len(a), dtype=numpy.float64)
+    nonzero = (b != 0)
+    result[nonzero] = a[nonzero]/b[nonzero]
+    return result
+
+
+def _principal(k):
+    """ function of the k-th (ascending) principal value """
+    def principal(components, componentLabels):
+        return principal_values(components, componentLabels)[:,k]
+    return principal
+
+
+def _principal_strain(k):
+    """ function of the k-th (ascending) principal strain """
+    def principal(components, componentLabels):
+        return numpy.linalg.eigvalsh(strain_tensor(components, componentLabels))[:,k]
+    return principal
+
+
+#
+# Registry
+#
+
+_QUANTITIES = {}
+
+# quantities stored by Abaqus (FieldValue attributes)
+register_quantity('PEEQ',   'PEEQ')
+register_quantity('MISES',  'S', abqAttrib='mises')
+register_quantity('PRESS',  'S', abqAttrib='press')
+register_quantity('INV3',   'S', abqAttrib='inv3')
+register_quantity('TRESCA', 'S', abqAttrib='tresca')
+
+# stress quantities, derived from the components of S
+for _label in ('S11','S22','S33','S12','S13','S23'):
+    register_quantity(_label, 'S', tensor_component(_label))
+register_quantity('MAXPRINCIPAL', 'S', _principal(2))
+register_quantity('MIDPRINCIPAL', 'S', _principal(1))
+register_quantity('MINPRINCIPAL', 'S', _principal(0))
+register_quantity('TRIAXIALITY',  'S', triaxiality)
+register_quantity('LODE',         'S', lode_parameter)
+register_quantity('LODEANGLE',    'S', lode_angle_parameter)
+
+# logarithmic strain quantities, derived from the components of LE
+for _label in ('LE11','LE22','LE33','LE12','LE13','LE23'):
+    register_quantity(_label, 'LE', tensor_component(_label))
+register_quantity('LEMAXPRINCIPAL', 'LE', _principal_strain(2))
+register_quantity('LEMINPRINCIPAL', 'LE', _principal_strain(0))
+register_quantity('LEEQ',           'LE', equivalent_strain)
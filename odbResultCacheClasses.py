@@ -0,0 +1,209 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for a persistent, on-disk cache of fetched results.
+
+Extracting results from a large ODB can take many minutes, and is
+usually repeated every time a (plotting) script is re-run. A
+ResultCache stores the results of each fetch in a compressed .npz file,
+keyed by the identity of the ODB file (path, size, and modification
+time) and by the query (class, dataName, setName, fetch method, frame
+selection, etc.). If the ODB has not changed, a repeated fetch loads
+the results from the cache without opening the ODB.
+
+Example:
+    cache = ResultCache('C:\\temp\\odbCache')
+    mises = IntPtVariable('example.odb', 'MISES', 'MYSET', cache=cache)
+    mises.fetchNodalAverage()   # extracted, and stored in the cache
+    mises = IntPtVariable('example.odb', 'MISES', 'MYSET', cache=cache)
+    mises.fetchNodalAverage()   # loaded from the cache
+
+The least recently used entries are deleted when the cache grows beyond
+maxBytes. Entries can be explicitly removed with invalidate().
+"""
+
+#
+# Import Modules
+#
+import os
+import hashlib
+import numpy
+from odbResultFileOperations import *
+
+#
+# Constants
+#
+
+# default maximum size of the cache directory (bytes)
+DEFAULT_CACHE_SIZE = 2*1024**3
+
+#
+# Classes
+#
+
+class ResultCache(object):
+    """
+    directory of cached results.
+
+    Attributes:
+        cacheDir = string of the cache directory (created if needed)
+        maxBytes = (optional) maximum total size of the cached files.
+                   the least recently used files are deleted to stay
+                   below this size. Default is DEFAULT_CACHE_SIZE.
+
+    Dependent Attributes:
+        size = total size (bytes) of the cached files
+
+    Methods:
+        key()
+        load()
+        store()
+        invalidate()
+    """
+
+    def __init__(self, cacheDir, maxBytes=DEFAULT_CACHE_SIZE):
+        """ create cache in cacheDir """
+        self._cacheDir = os.path.abspath(cacheDir)
+        self.maxBytes  = maxBytes
+        if not os.path.isdir(self._cacheDir):
+            os.makedirs(self._cacheDir)
+        return
+
+    #
+    # Getters and Setters
+    #
+    @property
+    def cacheDir(self):
+        return self._cacheDir
+
+    @property
+    def maxBytes(self):
+        return self._maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, n):
+        if int(n) <= 0:
+            raise ValueError('maxBytes must be a positive integer!')
+        self._maxBytes = int(n)
+        return
+
+    @property
+    def size(self):
+        return sum([os.path.getsize(f) for f in self._entryFiles()])
+
+    #
+    # Methods
+    #
+    def key(self, odbPath, *query):
+        """
+        returns the (string) key of a query of an ODB. the key depends
+        on the ODB file path, size, and modification time, so results
+        of a changed (e.g. re-run) ODB are never returned.
+        query is any number of values with a stable repr(), e.g.
+        (class name, dataName, setName, method, selection key)
+        """
+        odbFile = os.path.normcase(os.path.abspath(odb_file_path(odbPath)))
+        stat = os.stat(odbFile)
+        odbId = '%s|%i|%r' % (odbFile, stat.st_size, stat.st_mtime)
+        queryId = repr(_hashable(query))
+        return _digest(odbFile) + '_' + _digest(odbId + '|' + queryId)
+
+    def load(self, key):
+        """
+        returns dict of the cached attributes of key,
+        or None if key is not in the cache
+        """
+        fileName = self._fileName(key)
+        if not os.path.isfile(fileName):
+            return None
+        try:
+            npz = numpy.load(fileName)
+            try:
+                arrays = dict([(name, npz[name]) for name in npz.files])
+            finally:
+                npz.close()
+        except Exception:
+            # incomplete or corrupt file. treat as a miss
+            return None
+
+        # mark as recently used
+        os.utime(fileName, None)
+        return decode_attributes(arrays)
+
+    def store(self, key, attributes, compress=True):
+        """
+        stores a dict of attributes under key. values may be numpy
+        arrays, tuples/lists, strings, numbers, None, or dicts of arrays.
+        
+        compress is an optional input (default True). If False, the
+        arrays are stored uncompressed, which is larger, but much
+        faster to load (e.g. for a mesh, which compresses poorly).
+        """
+        fileName = self._fileName(key)
+        tempName = fileName + '.tmp.npz'
+        if compress:
+            numpy.savez_compressed(tempName, **encode_attributes(attributes))
+        else:
+            numpy.savez(tempName, **encode_attributes(attributes))
+        if os.path.isfile(fileName):
+            os.remove(fileName)
+        os.rename(tempName, fileName)
+        self._evict()
+        return
+
+    def invalidate(self, odbPath=None):
+        """
+        deletes the cached results of odbPath (every query), or the
+        whole cache if odbPath is None. returns the number of entries deleted.
+        """
+        files = self._entryFiles()
+        if odbPath is not None:
+            odbFile = os.path.normcase(os.path.abspath(odb_file_path(odbPath)))
+            prefix  = _digest(odbFile) + '_'
+            files = [f for f in files if os.path.basename(f).startswith(prefix)]
+        for f in files:
+            os.remove(f)
+        return len(files)
+
+    #
+    # Private Methods
+    #
+    def _fileName(self, key):
+        return os.path.join(self.cacheDir, key + '.npz')
+
+    def _entryFiles(self):
+        return [os.path.join(self.cacheDir, f) for f in os.listdir(self.cacheDir)
+                if f.endswith('.npz') and not f.endswith('.tmp.npz')]
+
+    def _evict(self):
+        """ deletes the least recently used entries, until size <= maxBytes """
+        entries = [(os.path.getmtime(f), os.path.getsize(f), f) for f in self._entryFiles()]
+        entries.sort()
+        total = sum([e[1] for e in entries])
+        for mtime,size,f in entries:
+            if total <= self.maxBytes:
+                break
+            os.remove(f)
+            total -= size
+        return
+
+
+#
+# Private Functions
+#
+
+def _digest(s):
+    return hashlib.sha1(s).hexdigest()[:20]
+
+def _hashable(value):
+    """ converts lists (and dicts) to tuples, so that repr() is stable """
+    if isinstance(value, dict):
+        return tuple(sorted([(k, _hashable(v)) for k,v in value.items()]))
+    if isinstance(value, (list, tuple)):
+        return tuple([_hashable(v) for v in value])
+    return value
@@ -0,0 +1,178 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Functions for saving (and loading) fetched results as binary files.
+
+All of the results of an object are written to one file, as whole
+arrays: an .npz file (numpy), or an .h5 file (HDF5, if h5py is
+installed). Each attribute is stored under its own name (e.g.
+'totalTime', 'nodeLabels', 'resultData'), so the files can be read by
+other programs, and the type of each attribute is stored (as JSON)
+under '__kinds__', so that the object can be restored exactly.
+"""
+
+#
+# Import Modules
+#
+import os
+import json
+import numpy
+from myFileOperations import *
+
+# HDF5 is optional
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+#
+# Constants
+#
+
+# supported file formats, and their file extensions
+RESULT_FORMATS = {'npz' : '.npz', 'hdf5' : '.h5'}
+
+#
+# Functions
+#
+
+def save_results(fileName, attributes, format='npz', compress=False, verbose=True):
+    """
+    saves a dict of attributes to a binary file. values may be numpy
+    arrays, tuples/lists, strings, numbers, None, or dicts of arrays.
+
+    input:
+        fileName = name of the file. the extension of the format
+                   is appended, if it is not already there
+        format   = (optional) 'npz' (default) or 'hdf5'
+        compress = (optional) compress the arrays (smaller, but slower)
+        verbose  = (optional) print when files are saved or replaced
+
+    returns the name of the saved file
+    """
+    if format not in RESULT_FORMATS:
+        raise ValueError('format must be one of %s' % (sorted(RESULT_FORMATS.keys()),))
+    extension = RESULT_FORMATS[format]
+    if os.path.splitext(fileName)[1].lower() != extension:
+        fileName += extension
+
+    arrays = encode_attributes(attributes)
+    check_delete(fileName, verbose)
+    if format == 'npz':
+        if compress:
+            numpy.savez_compressed(fileName, **arrays)
+        else:
+            numpy.savez(fileName, **arrays)
+        return fileName
+
+    if h5py is None:
+        raise ImportError('h5py is required to save HDF5 files!')
+    h5File = h5py.File(fileName, 'w')
+    try:
+        for name,array in arrays.items():
+            if compress and array.ndim > 0:
+                h5File.create_dataset(name, data=array, compression='gzip')
+            else:
+                h5File.create_dataset(name, data=array)
+    finally:
+        h5File.close()
+    return fileName
+
+
+def load_results(fileName):
+    """
+    loads the dict of attributes of a file saved by save_results().
+    the format is determined by the file extension.
+    """
+    if os.path.splitext(fileName)[1].lower() in ('.h5', '.hdf5'):
+        if h5py is None:
+            raise ImportError('h5py is required to load HDF5 files!')
+        h5File = h5py.File(fileName, 'r')
+        try:
+            arrays = dict([(str(name), numpy.asarray(h5File[name][()]))
+                           for name in h5File.keys()])
+        finally:
+            h5File.close()
+    else:
+        npz = numpy.load(fileName)
+        try:
+            arrays = dict([(name, npz[name]) for name in npz.files])
+        finally:
+            npz.close()
+    return decode_attributes(arrays)
+
+
+def encode_attributes(attributes):
+    """
+    converts a dict of attributes to a dict of numpy arrays. the type
+    of each attribute is saved (as JSON) so that it can be restored.
+    """
+    arrays = {}
+    kinds  = {}
+    for name,value in attributes.items():
+        if value is None:
+            kinds[name] = 'none'
+        elif isinstance(value, dict):
+            kinds[name] = ['dict', sorted(value.keys())]
+            for k,v in value.items():
+                arrays[name + '.' + k] = numpy.asarray(v)
+        elif isinstance(value, (tuple, list)) and len(set([type(v) for v in value])) > 1:
+            # mixed types, e.g. (stepName, frameIndex)
+            kinds[name] = 'json'
+            arrays[name] = numpy.asarray(json.dumps(value))
+        elif isinstance(value, (tuple, list)):
+            kinds[name] = 'tuple'
+            arrays[name] = numpy.asarray(value)
+        elif isinstance(value, str):
+            kinds[name] = 'str'
+            arrays[name] = numpy.asarray(value)
+        elif isinstance(value, numpy.ndarray):
+            kinds[name] = 'array'
+            arrays[name] = numpy.asarray(value)
+        else:
+            # numbers
+            kinds[name] = 'scalar'
+            arrays[name] = numpy.asarray(value)
+    arrays['__kinds__'] = numpy.asarray(json.dumps(kinds))
+    return arrays
+
+
+def decode_attributes(arrays):
+    """ inverse of encode_attributes() """
+    kinds = json.loads(str(arrays['__kinds__']))
+    attributes = {}
+    for name,kind in kinds.items():
+        name = str(name)
+        if kind == 'none':
+            attributes[name] = None
+        elif isinstance(kind, list):
+            attributes[name] = dict([(str(k), arrays[name + '.' + k]) for k in kind[1]])
+        elif kind == 'tuple':
+            attributes[name] = tuple(arrays[name].tolist())
+        elif kind == 'json':
+            attributes[name] = _from_json(json.loads(str(arrays[name])))
+        elif kind == 'str':
+            attributes[name] = str(arrays[name])
+        elif kind == 'scalar':
+            attributes[name] = arrays[name].item()
+        else:
+            attributes[name] = arrays[name]
+    return attributes
+
+
+#
+# Private Functions
+#
+
+def _from_json(value):
+    """ converts JSON lists (and unicode strings) back to tuples (and str) """
+    if isinstance(value, list):
+        return tuple([_from_json(v) for v in value])
+    if isinstance(value, unicode):
+        return str(value)
+    return value
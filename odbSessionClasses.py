@@ -0,0 +1,220 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for sharing one open Abaqus ODB between many variables.
+
+Opening a large ODB (and walking all of its steps and frames)
+is expensive. An OdbSession owns one read-only ODB, and can be
+passed to any of the field variable, history variable, or mesh
+classes so that they use the same open database. The session also
+caches the frame timeline and the assembly set lookups.
+
+With useMetadata=True, the session uses the sidecar metadata of the ODB
+(see OdbMetadata): sets and field outputs are validated, and the frame
+timeline is built, without walking the ODB (and for a repeated run,
+before the ODB is opened).
+
+Example:
+    with OdbSession('example.odb') as session:
+        mises = IntPtVariable(session.odbPath, 'MISES', 'MYSET', session=session)
+        mises.fetchNodalAverage()
+        peeq  = IntPtVariable(session.odbPath, 'PEEQ', 'MYSET', session=session)
+        peeq.fetchNodalAverage()
+    # the ODB is closed here
+"""
+
+#
+# Import Modules
+#
+from odbAccess import *
+from abaqusConstants import *
+import os
+from odbMetadataClasses import *
+from odbTimelineClasses import *
+from myFileOperations import *
+
+#
+# Functions
+#
+
+def open_odb(odbPath, session=None):
+    """
+    returns an open (read-only) ODB for odbPath. If a session is
+    given (and is for the same file), the session ODB is returned.
+    Always release the ODB with close_odb().
+    """
+    if session is not None and session.isSessionFile(odbPath):
+        return session.odb
+    return openOdb(odb_file_path(odbPath), readOnly=True)
+
+def close_odb(odb, session=None):
+    """
+    closes an ODB obtained with open_odb(). An ODB owned by
+    a session is left open; the session will close it.
+    """
+    if session is not None and session.ownsOdb(odb):
+        return
+    odb.close()
+    return
+
+#
+# Classes
+#
+
+class OdbSession(object):
+    """
+    one open (read-only) output database, shared between variables.
+    can be used as a context manager, which closes the ODB on exit.
+    the ODB is only opened when it is first needed (e.g. not at all, if
+    every variable is loaded from a ResultCache).
+
+    Attributes:
+        odbPath       = string of ODB file path name
+        timeTolerance = (optional) relative tolerance for duplicate frames
+                        (see FrameTimeline)
+        useMetadata   = (optional) logical True/False (Default False). If
+                        True, the sidecar metadata of the ODB is used
+
+    Dependent Attributes:
+        odb      = the open Abaqus Odb object (opened on first access)
+        isOpen   = logical True/False if the ODB is currently open
+        metadata = the OdbMetadata of the ODB (loaded, or scanned, on first
+                   access), or None if useMetadata is False
+
+    Methods:
+        open()
+        close()
+        refresh()
+        getSet()
+        timeline()
+    """
+
+    def __init__(self, odbPath, timeTolerance=DEFAULT_TIME_TOLERANCE, useMetadata=False):
+        """ create session. the ODB is not opened until it is needed """
+        self._odbPath       = odb_file_path(odbPath)
+        self._odb           = None
+        self._timeTolerance = timeTolerance
+        self._useMetadata   = bool(useMetadata)
+        self._metadata      = None
+
+        # caches (only valid while the ODB is open)
+        self._sets     = {}
+        self._timeline = None
+        return
+
+    #
+    # context manager
+    #
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+
+    #
+    # Getters
+    #
+    @property
+    def odbPath(self):
+        return self._odbPath
+
+    @property
+    def odb(self):
+        if self._odb is None:
+            self.open()
+        return self._odb
+
+    @property
+    def timeTolerance(self):
+        return self._timeTolerance
+
+    @property
+    def isOpen(self):
+        return self._odb is not None
+
+    @property
+    def useMetadata(self):
+        return self._useMetadata
+
+    @property
+    def metadata(self):
+        if not self._useMetadata:
+            return None
+        if self._metadata is None:
+            self._metadata = OdbMetadata.forOdb(self.odbPath, self)
+        return self._metadata
+
+    #
+    # Methods
+    #
+    def open(self):
+        """ opens the ODB in read-only mode (if not open already) """
+        if self._odb is None:
+            self._odb = openOdb(self.odbPath, readOnly=True)
+        return
+
+    def close(self):
+        """ closes the ODB and clears the cached lookups """
+        if self._odb is not None:
+            self._odb.close()
+        self._odb      = None
+        self._sets     = {}
+        self._timeline = None
+        self._metadata = None
+        return
+
+    def refresh(self):
+        """
+        updates the open ODB with the steps and frames written (by a
+        running analysis) since it was opened, and clears the cached
+        timeline, sets, and metadata so that they are built again.
+        """
+        if self._odb is not None:
+            self._odb.update()
+        self._sets     = {}
+        self._timeline = None
+        self._metadata = None
+        return
+
+    def isSessionFile(self, odbPath):
+        """ True if odbPath refers to the ODB file of this session """
+        return ( os.path.normcase(os.path.abspath(odb_file_path(odbPath))) ==
+                 os.path.normcase(os.path.abspath(self.odbPath)) )
+
+    def ownsOdb(self, odb):
+        """ True if odb is the ODB object owned by this session """
+        return (self._odb is not None) and (odb is self._odb)
+
+    def getSet(self, setType, setName):
+        """
+        returns the assembly-level node or element set.
+        setType should be a string of 'NODE' or 'ELEMENT'
+        raises KeyError if the set does not exist
+        """
+        key = (setType.upper(), setName.upper())
+        if key not in self._sets:
+            if key[0] == 'NODE':
+                self._sets[key] = self.odb.rootAssembly.nodeSets[key[1]]
+            elif key[0] == 'ELEMENT':
+                self._sets[key] = self.odb.rootAssembly.elementSets[key[1]]
+            else:
+                raise ValueError('unknown setType %s' % setType)
+        return self._sets[key]
+
+    def timeline(self):
+        """
+        returns the FrameTimeline of the ODB (the unique frames of
+        the analysis). built once per session.
+        """
+        if self._timeline is None and self._useMetadata:
+            # from the sidecar, without walking the frames
+            self._timeline = self.metadata.timeline(self.timeTolerance)
+        elif self._timeline is None:
+            self._timeline = FrameTimeline.fromOdb(self.odb, self.timeTolerance)
+        return self._timeline
@@ -0,0 +1,286 @@
+"""
+Vincente Pericoli
+UC Davis
+
+for README, license, and other info, see:
+https://github.com/ucdavis-kanvinde-group/abaqus-odb-tools
+
+
+Class for the frame timeline of an Abaqus ODB.
+
+Abaqus repeats a frame at the start of each step (it has the same
+total time as the last frame of the previous step). The timeline is
+built once per ODB, and maps every unique frame to its (step, frame)
+location, so that the field variable classes do not each need to walk
+the steps and rediscover the duplicate frames.
+
+A FrameSelection picks a subset of the timeline (by step name, time
+window, stride, or explicit frame list), so that only the selected
+frames are read from the ODB.
+"""
+
+#
+# Import Modules
+#
+import bisect
+import numpy
+
+#
+# Constants
+#
+
+# default tolerance used to detect duplicate frames. relative to the
+# magnitude of the frame time. frameValue is stored in single precision,
+# so exact comparison of total times can fail on round-off.
+DEFAULT_TIME_TOLERANCE = 1.0e-6
+
+#
+# Classes
+#
+
+class FrameTimeline(object):
+    """
+    the unique frames of an analysis, in time order.
+
+    Attributes:
+        stepNames    = tuple of the step name of each frame
+        frameIndices = numpy int array of the index of each frame in
+                       odb.steps[stepName].frames
+        totalTime    = numpy float64 array of the total time of each frame
+        tolerance    = relative tolerance used to detect duplicate frames
+
+    Iterating the timeline yields (stepName, frameIndex, totalTime)
+    for each unique frame.
+
+    Methods:
+        fromOdb() (classmethod)
+        fromFrames() (classmethod)
+        getFrame()
+        subset()
+    """
+
+    def __init__(self, stepNames, frameIndices, totalTime,
+                 tolerance=DEFAULT_TIME_TOLERANCE):
+        """ create timeline from the (already unique) frame locations """
+        self._stepNames    = tuple(stepNames)
+        self._frameIndices = numpy.asarray(frameIndices, dtype=int)
+        self._totalTime    = numpy.asarray(totalTime, dtype=numpy.float64)
+        self._tolerance    = tolerance
+        return
+
+    @classmethod
+    def fromOdb(cls, odb, tolerance=DEFAULT_TIME_TOLERANCE):
+        """
+        walks the steps and frames of an open odb once, and returns
+        the timeline of its unique frames. A frame is a duplicate if its
+        total time is within tolerance of a frame that is already kept.
+        """
+        frames = []
+        for stepName in odb.steps.keys():
+            step = odb.steps[stepName]
+            for i,frame in enumerate(step.frames):
+                frames.append((stepName, i, step.totalTime + frame.frameValue))
+        return cls.fromFrames(frames, tolerance)
+
+    @classmethod
+    def fromFrames(cls, frames, tolerance=DEFAULT_TIME_TOLERANCE):
+        """
+        returns the timeline of the unique frames of a sequence of
+        (stepName, frameIndex, totalTime) of every frame, in analysis
+        order (e.g. as recorded by OdbMetadata). duplicates are
+        detected as in fromOdb().
+        """
+        stepNames    = []
+        frameIndices = []
+        totalTime    = []
+
+        # sorted copy of the kept times, for duplicate checks
+        keptTimes = []
+        for stepName,i,time in frames:
+            if _is_duplicate(keptTimes, time, tolerance):
+                continue
+            bisect.insort(keptTimes, time)
+            stepNames.append(stepName)
+            frameIndices.append(i)
+            totalTime.append(time)
+
+        return cls(stepNames, frameIndices, totalTime, tolerance)
+
+    #
+    # Getters
+    #
+    @property
+    def stepNames(self):
+        return self._stepNames
+
+    @property
+    def frameIndices(self):
+        return self._frameIndices
+
+    @property
+    def totalTime(self):
+        return self._totalTime
+
+    @property
+    def tolerance(self):
+        return self._tolerance
+
+    #
+    # Methods
+    #
+    def __len__(self):
+        return len(self._stepNames)
+
+    def __iter__(self):
+        for i in range(0,len(self)):
+            yield (self._stepNames[i], int(self._frameIndices[i]),
+                   float(self._totalTime[i]))
+
+    def getFrame(self, odb, i):
+        """ returns the Abaqus frame object of the i-th unique frame """
+        return odb.steps[self._stepNames[i]].frames[int(self._frameIndices[i])]
+
+    def subset(self, indices):
+        """ returns a new timeline of the frames at the given indices """
+        indices = numpy.asarray(indices, dtype=int)
+        return FrameTimeline([self._stepNames[i] for i in indices],
+                             self._frameIndices[indices],
+                             self._totalTime[indices],
+                             self._tolerance)
+
+
+class FrameSelection(object):
+    """
+    a selection of the frames of a FrameTimeline.
+    every attribute is optional; by default, all frames are selected.
+
+    Attributes:
+        steps     = step name, or sequence of step names, to select
+        timeRange = (start, end) total time window to select. either end
+                    can be None to leave the window open on that side.
+                    the ends are inclusive (within the timeline tolerance).
+        stride    = int, select every stride-th frame (e.g. 10 for every
+                    10th frame). applied after all of the other selections.
+        frames    = sequence of indices into the full timeline of unique
+                    frames (negative indices count from the end, so
+                    frames=[-1] selects only the last frame)
+
+    Methods:
+        apply()
+        indices()
+    """
+
+    def __init__(self, steps=None, timeRange=None, stride=1, frames=None):
+        """ define the selection """
+        if isinstance(steps, str):
+            steps = (steps,)
+        if steps is not None:
+            steps = tuple(steps)
+        if timeRange is not None:
+            if len(timeRange) != 2:
+                raise ValueError('timeRange must be (start, end)!')
+            timeRange = tuple(timeRange)
+        if int(stride) < 1:
+            raise ValueError('stride must be a positive integer!')
+        if frames is not None:
+            frames = tuple([int(i) for i in frames])
+
+        self._steps     = steps
+        self._timeRange = timeRange
+        self._stride    = int(stride)
+        self._frames    = frames
+        return
+
+    #
+    # Getters
+    #
+    @property
+    def steps(self):
+        return self._steps
+
+    @property
+    def timeRange(self):
+        return self._timeRange
+
+    @property
+    def stride(self):
+        return self._stride
+
+    @property
+    def frames(self):
+        return self._frames
+
+    @property
+    def isAll(self):
+        """ True if the selection does not exclude any frames """
+        return (self.steps is None and self.timeRange is None and
+                self.stride == 1 and self.frames is None)
+
+    @property
+    def key(self):
+        """ hashable description of the selection """
+        return (self.steps, self.timeRange, self.stride, self.frames)
+
+    def __str__(self):
+        """ readable description of the selection (e.g. for errors) """
+        if self.isAll:
+            return 'all frames'
+        return ('steps=%s, timeRange=%s, stride=%i, frames=%s'
+                % (self.steps, self.timeRange, self.stride, self.frames))
+
+    #
+    # Methods
+    #
+    def apply(self, timeline):
+        """ returns the FrameTimeline of the selected frames """
+        if self.isAll:
+            return timeline
+        return timeline.subset(self.indices(timeline))
+
+    def indices(self, timeline):
+        """ returns numpy int array of the selected indices of timeline """
+        numframes = len(timeline)
+        selected  = numpy.ones(numframes, dtype=bool)
+
+        if self.frames is not None:
+            # explicit frame list (indices into the full timeline)
+            picked = numpy.zeros(numframes, dtype=bool)
+            for i in self.frames:
+                if not -numframes <= i < numframes:
+                    raise IndexError('frame %i is not in the timeline!' % i)
+                picked[i] = True
+            selected &= picked
+
+        if self.steps is not None:
+            for name in self.steps:
+                if name not in timeline.stepNames:
+                    raise KeyError('step %s is not in the timeline!' % name)
+            selected &= numpy.array([name in self.steps
+                                     for name in timeline.stepNames], dtype=bool)
+
+        if self.timeRange is not None:
+            start,end = self.timeRange
+            time = timeline.totalTime
+            if start is not None:
+                tol = timeline.tolerance*max(abs(start), 1.0e-30)
+                selected &= (time >= start - tol)
+            if end is not None:
+                tol = timeline.tolerance*max(abs(end), 1.0e-30)
+                selected &= (time <= end + tol)
+
+        return numpy.nonzero(selected)[0][::self.stride]
+
+
+#
+# Private Functions
+#
+
+def _is_duplicate(keptTimes, time, tolerance):
+    """ True if time is within tolerance of a time in the sorted keptTimes """
+    k = bisect.bisect_left(keptTimes, time)
+    for j in (k-1, k):
+        if 0 <= j < len(keptTimes):
+            scale = max(abs(time), abs(keptTimes[j]))
+            if abs(time - keptTimes[j]) <= tolerance*scale:
+                return True
+    return False